@@ -0,0 +1,40 @@
+"""
+Production server configuration.
+
+Run from the repository root:
+    gunicorn -c backend/gunicorn.conf.py
+"""
+import multiprocessing
+import os
+from pathlib import Path
+
+current_file_path = Path(__file__).resolve()
+
+chdir = str(current_file_path.parent / "src")
+wsgi_app = "app:app"
+bind = os.getenv("FLOOD_API_BIND", "0.0.0.0:5000")
+
+# CPU-bound pandas/JSON work: one process per core plus one, a few threads each for I/O waits
+workers = int(os.getenv("FLOOD_API_WORKERS", multiprocessing.cpu_count() + 1))
+threads = int(os.getenv("FLOOD_API_THREADS", 4))
+worker_class = "gthread"
+timeout = 60
+keepalive = 5
+
+# Import the app (and its cached inputs) once in the master; workers inherit it copy-on-write
+preload_app = True
+
+accesslog = None
+errorlog = "-"
+loglevel = "info"
+
+def on_starting(server):
+    from app import preload_data
+    preload_data()
+
+def post_fork(server, worker):
+    from app import engine, start_log_listener
+    # Pooled SQLite connections must not be shared across processes
+    engine.dispose(close=False)
+    # The parent's log listener thread is not copied into the child
+    start_log_listener()
@@ -1,26 +1,278 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, g, has_request_context, jsonify, request
 from flask_cors import CORS
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 import pandas as pd
 import json
 import os
 from pathlib import Path
+import atexit
+import sys
 import logging
+import queue
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, filename='app.log', filemode='a',
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+from metrics import registry as metrics
+from result_cache import LRUCache
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+# Configure logging: request threads only enqueue records, a listener thread writes app.log
+log_file_handler = logging.FileHandler('app.log', mode='a')
+log_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_queue_handler = QueueHandler(queue.Queue(-1))
+log_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Timestamp/level added by the file handler
+logging.basicConfig(level=logging.INFO, handlers=[log_queue_handler])
+log_listener = None
+
+def start_log_listener():
+    """
+    Start the thread that drains the log queue into app.log.
+    Threads do not survive fork, so forked workers call this again (see gunicorn.conf.py)
+    and get a fresh queue rather than the parent's copy.
+    """
+    global log_listener
+    log_queue_handler.queue = queue.Queue(-1)
+    log_listener = QueueListener(log_queue_handler.queue, log_file_handler)
+    log_listener.start()
+
+def stop_log_listener():
+    """Flush queued records and stop the listener thread."""
+    if log_listener is not None:
+        log_listener.stop()
+
+start_log_listener()
+atexit.register(stop_log_listener)
 
 current_file_path = Path(__file__).resolve()
 parent_path = current_file_path.parents[2]
 
+sys.path.insert(0, str(parent_path / "scripts"))
+from common import forecast_store, grid_store, landuse_store, locations, spatialite, transforms  # noqa: E402
+
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
 
 db_path = parent_path / "data/processed/flood_data.db"
-geojson_path = parent_path / "data/geospatial/lagos_landuse_cleaned_valid.geojson"
+transform_path = parent_path / transforms.TRANSFORM_PATH
+surface_path = parent_path / grid_store.SURFACE_PATH
+landuse_dir = parent_path / landuse_store.STORE_DIR
+DEFAULT_LANDUSE_STATE = "lagos"
+SPATIAL_FEATURE_LIMIT = 5000
+# Byte budgets and lifetimes of the in-process caches, per worker
+LAYER_CACHE_BYTES = int(os.getenv("FLOOD_API_LAYER_CACHE_MB", 512)) * 1024 * 1024
+LAYER_CACHE_TTL = float(os.getenv("FLOOD_API_LAYER_CACHE_TTL", 3600))
+QUERY_CACHE_BYTES = int(os.getenv("FLOOD_API_QUERY_CACHE_MB", 64)) * 1024 * 1024
+QUERY_CACHE_TTL = float(os.getenv("FLOOD_API_QUERY_CACHE_TTL", 300))
 engine = create_engine(f"sqlite:///{db_path}")
 
+# Queries shared by the per-dataset endpoints and the dashboard bootstrap
+SOCIOECONOMIC_QUERY = "SELECT state, landuse_type, area_sqm FROM socioeconomic;"
+SENTINEL_QUERY = "SELECT region, week_start_date, image_count FROM sentinel_features;"
+WEATHER_QUERY = "SELECT city, window_start_date, avg_precipitation_7d, avg_temperature_7d, avg_humidity_7d, avg_precipitation_30d FROM weather_features;"
+# Latest reading per city; both the MAX and the join are lookups on the (city, timestamp) index
+LATEST_WEATHER_QUERY = """
+    SELECT w.city, w.timestamp, w.temperature, w.humidity, w.precipitation
+    FROM weather w
+    JOIN (SELECT city, MAX(timestamp) AS timestamp FROM weather GROUP BY city) latest
+        ON w.city = latest.city AND w.timestamp = latest.timestamp
+    ORDER BY w.city;
+"""
+
+@contextmanager
+def record_phase(phase):
+    """
+    Accumulate time spent in a request phase ("db" or "serialize") for the metrics hooks.
+    No-op outside a request, e.g. during preload or from app_async.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context():
+            key = f"{phase}_seconds"
+            setattr(g, key, g.get(key, 0.0) + time.perf_counter() - start)
+
+def record_cache(cache_name, hit):
+    """Count a cache lookup as a hit or miss."""
+    metrics.cache.inc(cache=cache_name, result="hit" if hit else "miss")
+
+def record_eviction(cache_name, reason):
+    """Count a cache entry dropped for size, age or a data version change."""
+    metrics.cache_evictions.inc(cache=cache_name, reason=reason)
+
+# Parsed inputs (land use layers, the weather transform, the risk surface), versioned by file mtime
+layer_cache = LRUCache(LAYER_CACHE_BYTES, LAYER_CACHE_TTL, on_lookup=record_cache, on_evict=record_eviction)
+# Query result frames, versioned by the database's modification time
+query_cache = LRUCache(QUERY_CACHE_BYTES, QUERY_CACHE_TTL, on_lookup=record_cache, on_evict=record_eviction)
+for _name, _cache in [("layers", layer_cache), ("queries", query_cache)]:
+    metrics.cache_bytes.set_function(lambda cache=_cache: cache.current_bytes, cache=_name)
+    metrics.cache_entries.set_function(lambda cache=_cache: len(cache), cache=_name)
+
+def data_version():
+    """
+    Modification times of the database and its write-ahead log; any committed
+    write changes one of them.
+    """
+    wal_path = f"{db_path}-wal"
+    return (os.path.getmtime(db_path) if os.path.exists(db_path) else None,
+            os.path.getmtime(wal_path) if os.path.exists(wal_path) else None)
+
+def query_df(query):
+    """
+    Run a read query, timing it as database work. Results are cached until the
+    database changes; the returned frame is shared and must not be modified.
+    """
+    def load():
+        with record_phase("db"):
+            return pd.read_sql(query, engine)
+    return query_cache.get_or_load(("query", query), data_version(), load)
+
+def records_response(df):
+    """Serialize a DataFrame as a list of row objects, timing it as serialization."""
+    with record_phase("serialize"):
+        return jsonify(df.to_dict(orient='records'))
+
+def to_columnar(df):
+    """
+    Convert a DataFrame to a column-oriented dict.
+    Args:
+        df (pd.DataFrame): Query result.
+    Returns:
+        dict: {"columns": [...], "data": {col: [...]}} with NaN mapped to None.
+    """
+    df = df.astype(object).where(df.notna(), None)
+    return {
+        "columns": df.columns.tolist(),
+        "data": {col: df[col].tolist() for col in df.columns}
+    }
+
+def encode_json(payload):
+    """Serialize payload with orjson when available, else the standard json module."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=str).encode('utf-8')
+
+def json_response(payload, status=200):
+    with record_phase("serialize"):
+        body = encode_json(payload)
+    return Response(body, status=status, mimetype='application/json')
+
+def parse_bbox(value):
+    """
+    Parse a "minx,miny,maxx,maxy" query parameter.
+    Raises:
+        ValueError: If the value is not four numbers with min <= max.
+    """
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4 or parts[0] > parts[2] or parts[1] > parts[3]:
+        raise ValueError("bbox must be minx,miny,maxx,maxy")
+    return tuple(parts)
+
+def load_landuse_geojson(state=DEFAULT_LANDUSE_STATE, bbox=None):
+    """
+    Load a state's land use layer from the GeoParquet store as a GeoJSON FeatureCollection.
+    Full layers and bbox windows are cached until the store file changes.
+    Args:
+        state (str): State name.
+        bbox (tuple): Optional (minx, miny, maxx, maxy) filter in EPSG:4326.
+    Returns:
+        dict: GeoJSON FeatureCollection.
+    Raises:
+        FileNotFoundError: If the state is not in the store.
+    """
+    state = state.lower()
+    path = landuse_store.state_path(state, landuse_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Land use layer not found: {path}")
+    def load():
+        with record_phase("db"):
+            gdf = landuse_store.read_state(state, bbox=bbox, store_dir=landuse_dir)
+        return gdf.to_geo_dict(drop_id=True)
+    kind = "landuse_geojson" if bbox is None else "landuse_bbox"
+    return layer_cache.get_or_load((kind, state, bbox), os.path.getmtime(path), load)
+
+def load_weather_transform():
+    """
+    Load the weather transform fitted by preprocess_data.py on the training split.
+    Returns:
+        transforms.WeatherTransform: Cached until the file changes.
+    Raises:
+        FileNotFoundError: If preprocess_data.py has not saved a transform.
+    """
+    return layer_cache.get_or_load(("weather_transform",), os.path.getmtime(transform_path),
+                                   lambda: transforms.WeatherTransform.load(transform_path))
+
+def load_risk_surface():
+    """
+    Load the grid risk surface written by build_risk_surface.py.
+    Returns:
+        dict: grid_store surface arrays, cached until the file changes.
+    Raises:
+        FileNotFoundError: If no surface has been built.
+    """
+    def load():
+        with record_phase("db"):
+            return grid_store.read_surface(surface_path)
+    return layer_cache.get_or_load(("risk_surface",), os.path.getmtime(surface_path), load)
+
+def to_raster(surface, values, rows=slice(None), cols=slice(None)):
+    """
+    A window of a grid layer as a raster dict: bounds, cell size and row-major
+    values (north row first) rounded to 4 decimals, None outside Nigeria.
+    """
+    west, north, resolution = surface["origin"].tolist()
+    window = values[rows, cols].astype(float)
+    row_start, row_stop, _ = rows.indices(values.shape[0])
+    col_start, col_stop, _ = cols.indices(values.shape[1])
+    return {
+        "bounds": [round(west + col_start * resolution, 6), round(north - row_stop * resolution, 6),
+                   round(west + col_stop * resolution, 6), round(north - row_start * resolution, 6)],
+        "resolution": resolution,
+        "width": window.shape[1],
+        "height": window.shape[0],
+        "values": [[None if value != value else value for value in row] for row in window.round(4).tolist()]
+    }
+
+def preload_data():
+    """
+    Load static inputs before workers fork so they are shared copy-on-write.
+    Missing files are logged and loaded lazily on first request instead.
+    """
+    for state in landuse_store.available_states(landuse_dir):
+        try:
+            load_landuse_geojson(state)
+            logging.info(f"Preloaded land use layer for {state}")
+        except Exception as e:
+            logging.warning(f"Land use layer for {state} not preloaded: {str(e)}")
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    if route == '/api/metrics':
+        return response
+    elapsed = time.perf_counter() - g.get("request_start", time.perf_counter())
+    metrics.requests.inc(route=route, status=response.status_code)
+    metrics.request_seconds.observe(elapsed, route=route)
+    metrics.db_seconds.observe(g.get("db_seconds", 0.0), route=route)
+    metrics.serialize_seconds.observe(g.get("serialize_seconds", 0.0), route=route)
+    if response.content_length is not None:
+        metrics.response_bytes.observe(response.content_length, route=route)
+    return response
+
+@app.route('/api/metrics')
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health')
 def health():
     logging.info("Health check requested")
@@ -29,9 +281,9 @@ def health():
 @app.route('/api/socioeconomic')
 def get_socioeconomic():
     try:
-        df = pd.read_sql("SELECT state, landuse_type, area_sqm FROM socioeconomic;", engine)
+        df = query_df(SOCIOECONOMIC_QUERY)
         logging.info("Socioeconomic data fetched successfully")
-        return jsonify(df.to_dict(orient='records'))
+        return records_response(df)
     except Exception as e:
         logging.error(f"Socioeconomic fetch error: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -39,9 +291,9 @@ def get_socioeconomic():
 @app.route('/api/sentinel_features')
 def get_sentinel():
     try:
-        df = pd.read_sql("SELECT region, week_start_date, image_count FROM sentinel_features;", engine)
+        df = query_df(SENTINEL_QUERY)
         logging.info("Sentinel data fetched successfully")
-        return jsonify(df.to_dict(orient='records'))
+        return records_response(df)
     except Exception as e:
         logging.error(f"Sentinel fetch error: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -49,34 +301,213 @@ def get_sentinel():
 @app.route('/api/weather_features')
 def get_weather():
     try:
-        df = pd.read_sql("SELECT city, window_start_date, avg_precipitation_7d, avg_temperature_7d, avg_humidity_7d, avg_precipitation_30d FROM weather_features;", engine)
+        df = query_df(WEATHER_QUERY)
         logging.info("Weather data fetched successfully")
-        return jsonify(df.to_dict(orient='records'))
+        return records_response(df)
     except Exception as e:
         logging.error(f"Weather fetch error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/landuse/lagos')
-def get_landuse():
-    try:
-        if not os.path.exists(geojson_path):
-            logging.error(f"GeoJSON file not found: {geojson_path}")
-            return jsonify({"error": "GeoJSON file not found"}), 404
-        with open(geojson_path, 'r') as f:
-            data = json.load(f)
-        logging.info(f"GeoJSON data loaded successfully from {geojson_path}")
-        # Validate GeoJSON structure
-        if not isinstance(data, dict) or data.get('type') != 'FeatureCollection':
-            logging.error("Invalid GeoJSON: Not a FeatureCollection")
-            return jsonify({"error": "Invalid GeoJSON format"}), 400
-        return data  # Return dict directly to avoid double jsonify
-    except json.JSONDecodeError as e:
-        logging.error(f"GeoJSON decode error: {str(e)}")
-        return jsonify({"error": f"Invalid GeoJSON: {str(e)}"}), 400
+@app.route('/api/weather/latest')
+def get_latest_weather():
+    """Latest reading per city, raw and scaled with the training transform (scaled_* columns)."""
+    try:
+        transform = load_weather_transform()
+    except FileNotFoundError as e:
+        logging.error(f"Weather transform unavailable: {str(e)}")
+        return jsonify({"error": "Weather transform not found; run preprocess_data.py"}), 503
+    try:
+        df = query_df(LATEST_WEATHER_QUERY)
+        scaled = transform.transform(df)[transform.columns].add_prefix("scaled_")
+        logging.info("Latest weather fetched successfully")
+        return records_response(pd.concat([df, scaled], axis=1))
+    except Exception as e:
+        logging.error(f"Latest weather fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/forecasts')
+def get_forecasts():
+    """Latest issued 1/3/7-day flood forecasts, one row per state and horizon."""
+    try:
+        df = query_df(forecast_store.LATEST_FORECASTS_QUERY)
+        logging.info("Forecasts fetched successfully")
+        return records_response(df)
+    except (OperationalError, pd.errors.DatabaseError) as e:  # No forecasts table yet
+        logging.error(f"Forecasts unavailable: {str(e)}")
+        return jsonify({"error": "Forecasts not found; run forecast_floods.py"}), 503
+    except Exception as e:
+        logging.error(f"Forecasts fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/risk/grid')
+def get_risk_grid():
+    """
+    Flood probability on the 0.1 degree grid as a raster, or a cell feature with
+    ?layer=<feature name>; ?bbox=minx,miny,maxx,maxy returns only that window.
+    """
+    try:
+        bbox = parse_bbox(request.args['bbox']) if 'bbox' in request.args else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid bbox: {str(e)}"}), 400
+    try:
+        surface = load_risk_surface()
+    except FileNotFoundError as e:
+        logging.error(f"Risk surface unavailable: {str(e)}")
+        return jsonify({"error": "Risk surface not found; run build_risk_surface.py"}), 503
+    try:
+        layer = request.args.get('layer', 'probability')
+        feature_names = surface["feature_names"].tolist()
+        if layer == 'probability':
+            values = surface["probability"]
+        elif layer in feature_names:
+            values = surface["features"][feature_names.index(layer)]
+        else:
+            return jsonify({"error": f"Unknown layer {layer}", "layers": ["probability"] + feature_names}), 400
+        rows, cols = grid_store.crop(surface, bbox) if bbox else (slice(None), slice(None))
+        payload = {"layer": layer, **to_raster(surface, values, rows, cols)}
+        logging.info(f"Risk grid {layer} fetched successfully")
+        return json_response(payload)
+    except Exception as e:
+        logging.error(f"Risk grid fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/risk/states')
+def get_risk_states():
+    """Cells, mean and max grid flood probability per state."""
+    try:
+        surface = load_risk_surface()
+    except FileNotFoundError as e:
+        logging.error(f"Risk surface unavailable: {str(e)}")
+        return jsonify({"error": "Risk surface not found; run build_risk_surface.py"}), 503
+    try:
+        df = grid_store.state_summary(surface)
+        logging.info("Risk by state fetched successfully")
+        return records_response(df.astype(object).where(df.notna(), None))
+    except Exception as e:
+        logging.error(f"Risk by state fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/landuse/<state>')
+def get_landuse(state):
+    try:
+        bbox = parse_bbox(request.args['bbox']) if 'bbox' in request.args else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid bbox: {str(e)}"}), 400
+    try:
+        data = load_landuse_geojson(state, bbox)
+        logging.info(f"Land use data loaded successfully for {state}")
+        with record_phase("serialize"):
+            return jsonify(data)
+    except FileNotFoundError as e:
+        logging.error(str(e))
+        return jsonify({"error": "GeoJSON file not found"}), 404
     except Exception as e:
         logging.error(f"Land use fetch error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def parse_state(value):
+    """
+    Canonical registry name of an optional ?state= filter (name, alias or slug).
+    Raises:
+        KeyError: If the state is not in the location registry.
+    """
+    return None if value is None else locations.get(value)["name"]
+
+def spatial_query(func, *args, **kwargs):
+    """
+    Run a land_use query on a Spatialite connection, timed as database work.
+    Results are cached per query and arguments until the database changes.
+    """
+    def load():
+        with record_phase("db"):
+            conn = spatialite.connect(db_path)
+            try:
+                return func(conn, *args, **kwargs)
+            finally:
+                conn.close()
+    key = ("spatial", func.__name__, args, tuple(sorted(kwargs.items())))
+    return query_cache.get_or_load(key, data_version(), load)
+
+@app.route('/api/spatial/areas')
+def get_spatial_areas():
+    try:
+        state = parse_state(request.args.get('state'))
+    except KeyError as e:
+        return jsonify({"error": f"Invalid query: {e.args[0]}"}), 400
+    try:
+        df = spatial_query(spatialite.area_by_landuse, state)
+        logging.info("Spatial land use areas fetched successfully")
+        return records_response(df)
+    except spatialite.SpatialiteUnavailable as e:
+        logging.error(str(e))
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logging.error(f"Spatial areas fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/spatial/features')
+def get_spatial_features():
+    try:
+        bbox = parse_bbox(request.args.get('bbox', ''))
+        limit = int(request.args.get('limit', SPATIAL_FEATURE_LIMIT))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query: bbox=minx,miny,maxx,maxy is required ({str(e)})"}), 400
+    try:
+        state = parse_state(request.args.get('state'))
+    except KeyError as e:
+        return jsonify({"error": f"Invalid query: {e.args[0]}"}), 400
+    try:
+        df = spatial_query(spatialite.features_in_bbox, bbox, state, limit)
+        logging.info(f"Spatial features fetched successfully for bbox {bbox}")
+        with record_phase("serialize"):
+            return jsonify(spatialite.to_feature_collection(df))
+    except spatialite.SpatialiteUnavailable as e:
+        logging.error(str(e))
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logging.error(f"Spatial features fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/spatial/point')
+def get_spatial_point():
+    try:
+        lon = float(request.args.get('lon', ''))
+        lat = float(request.args.get('lat', ''))
+        radius_m = float(request.args.get('radius_m', 0))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query: lon and lat are required ({str(e)})"}), 400
+    try:
+        df = spatial_query(spatialite.features_near_point, lon, lat, radius_m)
+        logging.info(f"Spatial point query fetched successfully for ({lon}, {lat})")
+        return records_response(df)
+    except spatialite.SpatialiteUnavailable as e:
+        logging.error(str(e))
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logging.error(f"Spatial point fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/dashboard')
+def get_dashboard():
+    """Return every dashboard dataset in one response, tables in columnar layout."""
+    try:
+        payload = {
+            "socioeconomic": to_columnar(query_df(SOCIOECONOMIC_QUERY)),
+            "sentinel_features": to_columnar(query_df(SENTINEL_QUERY)),
+            "weather_features": to_columnar(query_df(WEATHER_QUERY)),
+            "landuse": None
+        }
+        try:
+            payload["landuse"] = load_landuse_geojson()
+        except FileNotFoundError as e:
+            logging.error(f"Dashboard land use unavailable: {str(e)}")
+        logging.info("Dashboard data fetched successfully")
+        return json_response(payload)
+    except Exception as e:
+        logging.error(f"Dashboard fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn (backend/gunicorn.conf.py)
     logging.info("Starting Flask server")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Async variant of the API in app.py, served by an ASGI server:
+    hypercorn app_async:app --bind 0.0.0.0:5000    (run from backend/src)
+
+Routes and response bodies match app.py so the frontend works against either.
+SQLite and land use store reads run in a bounded thread pool and land use
+GeoJSON is streamed in feature batches, so one slow request does not stall
+the event loop.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, Response, jsonify, request
+from quart_cors import cors
+
+from app import (
+    SENTINEL_QUERY,
+    SOCIOECONOMIC_QUERY,
+    WEATHER_QUERY,
+    encode_json,
+    load_landuse_geojson,
+    parse_bbox,
+    query_df,
+    to_columnar,
+)
+
+# SQLite allows one writer and the pandas work holds the GIL, so a few threads are enough
+DB_POOL_SIZE = int(os.getenv("FLOOD_API_DB_THREADS", 4))
+STREAM_BATCH_FEATURES = 1000
+
+app = Quart(__name__)
+app = cors(app, allow_origin="http://localhost:5173")
+db_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="flood-db")
+
+async def run_blocking(func, *args):
+    """Run a blocking callable on the bounded DB thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, func, *args)
+
+async def read_sql(query):
+    """Run a read query (through app.py's query result cache) on the thread pool."""
+    return await run_blocking(query_df, query)
+
+async def stream_feature_collection(data):
+    """Yield a FeatureCollection as JSON, encoding features in batches on the thread pool."""
+    features = data["features"]
+    yield b'{"type":"FeatureCollection","features":['
+    for start in range(0, len(features), STREAM_BATCH_FEATURES):
+        batch = await run_blocking(encode_json, features[start:start + STREAM_BATCH_FEATURES])
+        # Strip the list brackets so batches join into one array
+        yield (b',' if start else b'') + batch[1:-1]
+    yield b']}'
+
+@app.route('/api/health')
+async def health():
+    logging.info("Health check requested")
+    return jsonify({"status": "healthy"})
+
+@app.route('/api/socioeconomic')
+async def get_socioeconomic():
+    try:
+        df = await read_sql(SOCIOECONOMIC_QUERY)
+        logging.info("Socioeconomic data fetched successfully")
+        return jsonify(df.to_dict(orient='records'))
+    except Exception as e:
+        logging.error(f"Socioeconomic fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/sentinel_features')
+async def get_sentinel():
+    try:
+        df = await read_sql(SENTINEL_QUERY)
+        logging.info("Sentinel data fetched successfully")
+        return jsonify(df.to_dict(orient='records'))
+    except Exception as e:
+        logging.error(f"Sentinel fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/weather_features')
+async def get_weather():
+    try:
+        df = await read_sql(WEATHER_QUERY)
+        logging.info("Weather data fetched successfully")
+        return jsonify(df.to_dict(orient='records'))
+    except Exception as e:
+        logging.error(f"Weather fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/landuse/<state>')
+async def get_landuse(state):
+    try:
+        bbox = parse_bbox(request.args['bbox']) if 'bbox' in request.args else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid bbox: {str(e)}"}), 400
+    try:
+        data = await run_blocking(load_landuse_geojson, state, bbox)
+        logging.info(f"Streaming land use data for {state}")
+        return Response(stream_feature_collection(data), mimetype='application/json')
+    except FileNotFoundError as e:
+        logging.error(str(e))
+        return jsonify({"error": "GeoJSON file not found"}), 404
+    except Exception as e:
+        logging.error(f"Land use fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/dashboard')
+async def get_dashboard():
+    try:
+        socio, sentinel, weather = await asyncio.gather(
+            read_sql(SOCIOECONOMIC_QUERY),
+            read_sql(SENTINEL_QUERY),
+            read_sql(WEATHER_QUERY)
+        )
+        payload = {
+            "socioeconomic": to_columnar(socio),
+            "sentinel_features": to_columnar(sentinel),
+            "weather_features": to_columnar(weather),
+            "landuse": None
+        }
+        try:
+            payload["landuse"] = await run_blocking(load_landuse_geojson)
+        except FileNotFoundError as e:
+            logging.error(f"Dashboard land use unavailable: {str(e)}")
+        logging.info("Dashboard data fetched successfully")
+        return Response(encode_json(payload), mimetype='application/json')
+    except Exception as e:
+        logging.error(f"Dashboard fetch error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+if __name__ == '__main__':
+    logging.info("Starting Quart server")
+    app.run(host='0.0.0.0', port=5000)
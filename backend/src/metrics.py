@@ -0,0 +1,133 @@
+"""
+In-process request metrics rendered in the Prometheus text exposition format.
+
+Kept dependency-free so the API does not need prometheus_client. Each worker
+process keeps its own counters; scrape every worker (or sum them) when running
+under gunicorn.
+"""
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds, size buckets in bytes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label pairs."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label pairs."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+class Gauge:
+    """Point-in-time value keyed by a tuple of label pairs, read from a callback at render time."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._functions = {}
+        self._lock = threading.Lock()
+
+    def set_function(self, func, **labels):
+        with self._lock:
+            self._functions[tuple(sorted(labels.items()))] = func
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, func in sorted(self._functions.items(), key=lambda item: item[0]):
+                lines.append(f"{self.name}{_format_labels(key)} {func()}")
+        return lines
+
+class MetricsRegistry:
+    """Holds every metric the API exports."""
+
+    def __init__(self):
+        self.requests = Counter("flood_api_requests_total", "Requests handled, by route and status.")
+        self.request_seconds = Histogram("flood_api_request_duration_seconds",
+                                         "Total handler time per route.", LATENCY_BUCKETS)
+        self.db_seconds = Histogram("flood_api_db_duration_seconds",
+                                    "Time spent in database queries per request.", LATENCY_BUCKETS)
+        self.serialize_seconds = Histogram("flood_api_serialize_duration_seconds",
+                                           "Time spent encoding the response body per request.", LATENCY_BUCKETS)
+        self.response_bytes = Histogram("flood_api_response_bytes",
+                                        "Response body size per route.", SIZE_BUCKETS)
+        self.cache = Counter("flood_api_cache_requests_total", "Cache lookups, by cache and result (hit/miss).")
+        self.cache_evictions = Counter("flood_api_cache_evictions_total",
+                                       "Cache entries dropped, by cache and reason (size/ttl/version/invalidated).")
+        self.cache_bytes = Gauge("flood_api_cache_bytes", "Approximate bytes held by each in-process cache.")
+        self.cache_entries = Gauge("flood_api_cache_entries", "Entries held by each in-process cache.")
+
+    def all_metrics(self):
+        return [self.requests, self.request_seconds, self.db_seconds,
+                self.serialize_seconds, self.response_bytes, self.cache,
+                self.cache_evictions, self.cache_bytes, self.cache_entries]
+
+    def render(self):
+        """Return all metrics in Prometheus text format."""
+        lines = []
+        for metric in self.all_metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
@@ -0,0 +1,138 @@
+"""
+Size-bounded in-process LRU cache for parsed inputs and query results.
+
+Entries are stored with the data version they were computed from (a file
+mtime, the database's modification time, ...). A lookup with a different
+version drops the entry, so a pipeline rerun invalidates exactly what it
+rewrote. Entries also expire after ttl_seconds, and the least recently used
+entries are evicted once the cached values exceed max_bytes. Each worker
+process keeps its own cache.
+
+Keys are tuples whose first item names the kind of entry ("landuse_geojson",
+"query", ...); hits and misses are counted per kind through on_lookup.
+
+Cached values are shared between requests: callers must not modify them.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_ITEMS = 256  # Items walked per long list; the rest are extrapolated
+
+def sizeof(value, _seen=None):
+    """
+    Approximate bytes held by a value: DataFrames and arrays by their buffers,
+    containers and objects by walking what they reference. Long lists and
+    tuples (GeoJSON features, coordinate rings) are sized from an evenly
+    spaced sample of SAMPLE_ITEMS items, so sizing stays cheap next to parsing.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    total = sys.getsizeof(value)
+    if isinstance(value, dict):
+        total += sum(sizeof(key, seen) + sizeof(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple)) and len(value) > SAMPLE_ITEMS:
+        step = len(value) / SAMPLE_ITEMS
+        sample = [value[int(i * step)] for i in range(SAMPLE_ITEMS)]
+        total += int(sum(sizeof(item, seen) for item in sample) * step)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        total += sum(sizeof(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        total += sizeof(vars(value), seen)
+    return total
+
+class LRUCache:
+    """Thread-safe LRU cache with a byte budget, a TTL and per-entry data versions."""
+
+    def __init__(self, max_bytes, ttl_seconds=None, on_lookup=None, on_evict=None):
+        """
+        Args:
+            max_bytes (int): Budget for the cached values; values larger than this are not cached.
+            ttl_seconds (float): Entry lifetime; None keeps entries until evicted or invalidated.
+            on_lookup (callable): Called as on_lookup(kind, hit) for every lookup.
+            on_evict (callable): Called as on_evict(kind, reason) with reason "size", "ttl", "version"
+                or "invalidated".
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.on_lookup = on_lookup
+        self.on_evict = on_evict
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key, reason):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry["nbytes"]
+        if self.on_evict is not None:
+            self.on_evict(key[0], reason)
+
+    def get(self, key, version=None):
+        """
+        Return the cached value, or None if it is missing, expired or from another version.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["version"] != version:
+                self._drop(key, "version")
+                entry = None
+            elif entry is not None and entry["expires"] is not None and entry["expires"] <= time.monotonic():
+                self._drop(key, "ttl")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if self.on_lookup is not None:
+            self.on_lookup(key[0], entry is not None)
+        return entry["value"] if entry is not None else None
+
+    def put(self, key, value, version=None, nbytes=None):
+        """
+        Store a value, evicting least recently used entries to stay within max_bytes.
+        Returns:
+            bool: False if the value alone exceeds max_bytes and was not stored.
+        """
+        nbytes = sizeof(value) if nbytes is None else nbytes
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key, "version")
+            if nbytes > self.max_bytes:
+                return False
+            while self.current_bytes + nbytes > self.max_bytes:
+                self._drop(next(iter(self._entries)), "size")
+            self._entries[key] = {"value": value, "version": version, "nbytes": nbytes, "expires": expires}
+            self.current_bytes += nbytes
+        return True
+
+    def get_or_load(self, key, version, loader):
+        """Return the cached value for key and version, calling loader() and caching its result on a miss."""
+        value = self.get(key, version)
+        if value is None:
+            value = loader()
+            self.put(key, value, version)
+        return value
+
+    def invalidate(self, kind=None):
+        """Drop every entry, or only the entries whose key starts with kind."""
+        with self._lock:
+            for key in [key for key in self._entries if kind is None or key[0] == kind]:
+                self._drop(key, "invalidated")
+
+    def clear(self):
+        """Drop every entry without counting evictions."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
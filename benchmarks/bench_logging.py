@@ -0,0 +1,69 @@
+"""
+Runtime cost of verbose logging in the pipeline stages.
+
+Runs the same stages on one synthetic workspace at --log-level DEBUG (every
+per-window message and DataFrame preview, i.e. what the scripts used to print
+unconditionally) and at INFO (summary lines only), and reports the difference.
+Log output goes to /dev/null, so the numbers measure formatting and preview
+computation rather than terminal speed. Every third fortnight of weather is
+removed so extract_weather_features has empty windows to report.
+
+Run from the repository root:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --scale medium --only extract_weather_features
+"""
+import argparse
+import dataclasses
+import os
+import sqlite3
+import tempfile
+
+from run_benchmarks import BENCHMARKS, Workspace, synthetic
+
+from common import log
+
+STAGES = ["extract_weather_features", "extract_sentinel_features", "merge_features", "process_gfm"]
+LEVELS = ["DEBUG", "INFO"]
+
+def drop_weather_gaps(db_path, every=3):
+    """Delete every n-th 14-day block of weather; each gap contains at least one whole 7-day window."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM weather WHERE CAST(julianday(timestamp) / 14 AS INTEGER) % ? = 0;", (every,))
+    conn.commit()
+    conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare stage runtimes at DEBUG and INFO log levels.")
+    parser.add_argument("--scale", choices=sorted(synthetic.SCALES), default="large")
+    parser.add_argument("--readings-per-day", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=STAGES, help="Run only these stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scale = dataclasses.replace(synthetic.SCALES[args.scale], readings_per_day=args.readings_per_day)
+    stages = args.only or STAGES
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="flood_bench_") as root, open(os.devnull, "w") as sink:
+        workspace = Workspace(root, scale)
+        workspace.build()
+        drop_weather_gaps(workspace.db_path)
+        print(f"Built {args.scale} workspace ({dataclasses.asdict(scale)})")
+
+        os.chdir(root)
+        try:
+            for level in LEVELS:
+                log.configure(level, stream=sink)
+                for name in stages:
+                    results[(name, level)] = BENCHMARKS[name](workspace, args.repeat)["median_s"]
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'stage':<30}{'DEBUG s':>10}{'INFO s':>10}{'saved':>10}")
+    for name in stages:
+        debug, info = results[(name, "DEBUG")], results[(name, "INFO")]
+        saved = (debug - info) / debug if debug else 0.0
+        print(f"{name:<30}{debug:>10.3f}{info:>10.3f}{saved:>10.1%}")
+    total_debug = sum(results[(name, "DEBUG")] for name in stages)
+    total_info = sum(results[(name, "INFO")] for name in stages)
+    print(f"{'total':<30}{total_debug:>10.3f}{total_info:>10.3f}{(total_debug - total_info) / total_debug:>10.1%}")
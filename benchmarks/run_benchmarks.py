@@ -0,0 +1,309 @@
+"""
+Benchmark suite for the data pipeline and the API.
+
+Builds synthetic inputs at the chosen scale in a scratch workspace, times the
+feature extraction stages, merge_features, process_gfm, the risk surface and every Flask
+endpoint, and stores the results under benchmarks/results/ keyed by commit.
+Each run is compared with the most recent earlier run at the same scale, and
+steps that got slower than --threshold are reported as regressions.
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py --scale small
+    python benchmarks/run_benchmarks.py --scale medium --only merge_features api
+    python benchmarks/run_benchmarks.py --cities 8 --years 5 --fail-on-regression
+"""
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import synthetic
+
+current_file_path = Path(__file__).resolve()
+parent_path = current_file_path.parents[1]
+RESULTS_DIR = current_file_path.parent / "results"
+
+sys.path.insert(0, str(parent_path / "scripts"))
+sys.path.insert(0, str(parent_path / "scripts/feature_extraction"))
+sys.path.insert(0, str(parent_path / "scripts/preprocessing"))
+sys.path.insert(0, str(parent_path / "scripts/forecasting"))
+sys.path.insert(0, str(parent_path / "backend/src"))
+
+API_ENDPOINTS = [
+    "/api/health",
+    "/api/metrics",
+    "/api/socioeconomic",
+    "/api/sentinel_features",
+    "/api/weather_features",
+    "/api/weather/latest",
+    "/api/forecasts",
+    "/api/risk/grid",
+    "/api/risk/grid?bbox=3.2,6.4,3.5,6.6",
+    "/api/risk/states",
+    "/api/landuse/lagos",
+    "/api/landuse/lagos?bbox=3.2,6.4,3.3,6.5",
+    "/api/spatial/areas",
+    "/api/spatial/features?bbox=3.2,6.4,3.3,6.5",
+    "/api/spatial/point?lon=3.3&lat=6.5&radius_m=500",
+    "/api/dashboard"
+]
+
+def timed(func, repeat):
+    """
+    Call func repeat times with its output silenced.
+    Returns:
+        dict: median_s, min_s and runs (seconds).
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        runs.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(runs), "min_s": min(runs), "runs": runs}
+
+class Workspace:
+    """Scratch directory with synthetic inputs laid out like the repository's data/ directory."""
+
+    def __init__(self, root, scale):
+        self.root = Path(root)
+        self.scale = scale
+        self.data = self.root / "data"
+        self.db_path = self.data / "flood_data.db"
+        self.surface_path = self.data / "grid/risk_surface.npz"
+        self.landuse_dir = self.data / "geospatial/landuse"
+
+    def build(self):
+        from common import landuse_store, transforms
+
+        (self.data / "processed").mkdir(parents=True)
+        synthetic.build_database(self.db_path, self.scale)
+
+        # Train/test splits in the shape preprocess_data.py writes
+        floods = synthetic.historical_floods(self.scale)
+        split = int(len(floods) * 0.8)
+        floods.iloc[:split].to_csv(self.data / "train_data.csv", index=False)
+        floods.iloc[split:].to_csv(self.data / "test_data.csv", index=False)
+        self.transform_path = self.data / "models/weather_transform.json"
+        transforms.WeatherTransform().fit(synthetic.weather(self.scale)).save(self.transform_path)
+
+        # Stores are relative to the working directory; the benchmarks run from the workspace root
+        landuse_store.write_state(synthetic.landuse(self.scale), "lagos", store_dir=self.landuse_dir)
+
+        # process_gfm.py inputs
+        gfm, geonames, states = synthetic.gfm_inputs(self.scale)
+        gfm.to_csv(self.data / "global_flood_monitor.csv", index=False)
+        geonames.to_csv(self.data / "geonames_ng.txt", sep="\t", header=False, index=False)
+        states.to_file(self.data / "nigeria_states.geojson", driver="GeoJSON")
+
+def bench_extract_weather_features(workspace, repeat):
+    from extract_weather_features import extract_weather_features
+    return timed(lambda: extract_weather_features(str(workspace.db_path)), repeat)
+
+def bench_extract_sentinel_features(workspace, repeat):
+    from extract_sentinel_features import extract_sentinel_features
+    return timed(lambda: extract_sentinel_features(str(workspace.db_path)), repeat)
+
+def bench_merge_features(workspace, repeat):
+    from merge_features import merge_features
+    ensure_feature_tables(workspace)
+    data = workspace.data
+    return timed(lambda: merge_features(str(workspace.db_path), str(data / "train_data.csv"),
+                                        str(data / "test_data.csv")), repeat)
+
+def bench_process_gfm(workspace, repeat):
+    from process_gfm import process_gfm
+    return timed(lambda: process_gfm("data/global_flood_monitor.csv", "data/geonames_ng.txt",
+                                     "data/nigeria_states.geojson", "data/gfm_floods.csv"), repeat)
+
+def bench_build_risk_surface(workspace, repeat):
+    """Grid scoring and write from in-memory ERA5 days; the NetCDF read needs xarray and is not timed."""
+    import geopandas as gpd
+    from build_risk_surface import build_surface
+    from common import grid_store, landuse_store, risk_model, transforms
+    daily = synthetic.era5_daily(workspace.scale)
+    states = gpd.read_file(workspace.data / "nigeria_states.geojson")
+    layers = [landuse_store.read_state(state, columns=["landuse"]) for state in landuse_store.available_states()]
+    model = risk_model.fit(synthetic.training_events(workspace.scale))
+    transform = transforms.WeatherTransform.load(workspace.transform_path)
+    return timed(lambda: grid_store.write_surface(build_surface(daily, states, model, transform, layers),
+                                                  workspace.surface_path), repeat)
+
+def bench_api(workspace, repeat, requests_per_endpoint=20):
+    """Time each endpoint through Flask's test client against the workspace database."""
+    from sqlalchemy import create_engine
+    ensure_feature_tables(workspace)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as api
+    api.db_path = workspace.db_path
+    api.transform_path = workspace.transform_path
+    api.surface_path = workspace.surface_path
+    api.landuse_dir = workspace.landuse_dir
+    api.engine = create_engine(f"sqlite:///{workspace.db_path}")
+    api.layer_cache.clear()
+    api.query_cache.clear()
+    client = api.app.test_client()
+
+    results = {}
+    for path in API_ENDPOINTS:
+        response = client.get(path)  # Warm-up (and cache fill)
+        status, size = response.status_code, len(response.data)
+        latencies = []
+        for _ in range(max(repeat, 1) * requests_per_endpoint):
+            start = time.perf_counter()
+            client.get(path).data
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        results[f"api {path}"] = {
+            "median_s": statistics.median(latencies),
+            "min_s": latencies[0],
+            "p95_s": latencies[int(len(latencies) * 0.95) - 1],
+            "status": status,
+            "bytes": size
+        }
+    return results
+
+def ensure_feature_tables(workspace):
+    """Run the extraction stages once if their tables are missing."""
+    import sqlite3
+    conn = sqlite3.connect(workspace.db_path)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+    conn.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if "weather_features" not in tables:
+            from extract_weather_features import extract_weather_features
+            extract_weather_features(str(workspace.db_path))
+        if "sentinel_features" not in tables:
+            from extract_sentinel_features import extract_sentinel_features
+            extract_sentinel_features(str(workspace.db_path))
+    if "forecasts" not in tables:
+        from common import forecast_store
+        conn = sqlite3.connect(workspace.db_path)
+        forecast_store.create_forecast_table(conn)
+        forecast_store.write_forecasts(conn, synthetic.forecasts(workspace.scale))
+        conn.close()
+
+BENCHMARKS = {
+    "extract_weather_features": bench_extract_weather_features,
+    "extract_sentinel_features": bench_extract_sentinel_features,
+    "merge_features": bench_merge_features,
+    "process_gfm": bench_process_gfm,
+    "build_risk_surface": bench_build_risk_surface,
+    "api": bench_api
+}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=parent_path,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def previous_result(scale_name, scale):
+    """Most recent stored run at the same scale, or None."""
+    if not RESULTS_DIR.exists():
+        return None
+    for path in sorted(RESULTS_DIR.glob("*.json"), reverse=True):
+        with open(path, "r") as f:
+            result = json.load(f)
+        if result.get("scale_name") == scale_name and result.get("scale") == dataclasses.asdict(scale):
+            return result
+    return None
+
+def print_report(results, previous, threshold):
+    """
+    Print timings next to the previous run's.
+    Returns:
+        list: Names of steps slower than the previous run by more than threshold.
+    """
+    regressions = []
+    baseline = previous["results"] if previous else {}
+    if previous:
+        print(f"Compared with {previous['commit']} ({previous['timestamp']})")
+    print(f"{'benchmark':<52}{'median ms':>12}{'previous':>12}{'change':>10}")
+    for name, result in results.items():
+        median_ms = result["median_s"] * 1000
+        line = f"{name:<52}{median_ms:>12.2f}"
+        if name in baseline:
+            previous_ms = baseline[name]["median_s"] * 1000
+            change = (median_ms - previous_ms) / previous_ms if previous_ms else 0.0
+            flag = ""
+            # Ignore sub-millisecond jitter on fast endpoints
+            if change > threshold and median_ms - previous_ms > 1.0:
+                regressions.append(name)
+                flag = "  REGRESSION"
+            line += f"{previous_ms:>12.2f}{change:>+10.1%}{flag}"
+        if "status" in result and result["status"] != 200:
+            line += f"  (HTTP {result['status']})"
+        print(line)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline and API benchmarks on synthetic data.")
+    parser.add_argument("--scale", choices=sorted(synthetic.SCALES), default="small")
+    parser.add_argument("--cities", type=int, help="Override the scale's city count")
+    parser.add_argument("--years", type=int, help="Override the scale's year count")
+    parser.add_argument("--readings-per-day", type=int, help="Override weather readings per city per day")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="Do not store this run's results")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    scale = synthetic.SCALES[args.scale]
+    overrides = {"cities": args.cities, "years": args.years, "readings_per_day": args.readings_per_day}
+    scale = dataclasses.replace(scale, **{key: value for key, value in overrides.items() if value is not None})
+    scale_name = args.scale if not any(overrides.values()) else "custom"
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="flood_bench_") as root:
+        workspace = Workspace(root, scale)
+        start = time.perf_counter()
+        workspace.build()
+        print(f"Built {scale_name} workspace ({dataclasses.asdict(scale)}) in {time.perf_counter() - start:.2f}s")
+
+        # Scripts use paths relative to the repository root; the workspace stands in for it
+        os.chdir(root)
+        results = {}
+        try:
+            for name in args.only or list(BENCHMARKS):
+                result = BENCHMARKS[name](workspace, args.repeat)
+                results.update(result if name == "api" else {name: result})
+        finally:
+            os.chdir(cwd)
+
+    previous = previous_result(scale_name, scale)
+    regressions = print_report(results, previous, args.threshold)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        run = {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale_name": scale_name,
+            "scale": dataclasses.asdict(scale),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "results": results
+        }
+        path = RESULTS_DIR / f"{datetime.now():%Y%m%dT%H%M%S}_{run['commit']}_{scale_name}.json"
+        with open(path, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Results saved to {path}")
+
+    if regressions and args.fail_on_regression:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
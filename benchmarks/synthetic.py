@@ -0,0 +1,229 @@
+"""
+Synthetic inputs for the benchmark suite, at configurable scale.
+
+Scale is cities x years x readings per day. Every generator is seeded, so two
+runs at the same scale produce identical inputs and their timings compare.
+"""
+import sqlite3
+from dataclasses import dataclass
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+# Real state capitals first; further cities are spread around them
+BASE_CITIES = [
+    ("Lagos", 6.5244, 3.3792, "05"),
+    ("Rivers", 4.8156, 7.0498, "50"),
+    ("Benue", 7.7322, 8.5391, "26"),
+    ("Bayelsa", 4.9211, 6.2642, "52")
+]
+LANDUSE_CLASSES = ["residential", "farmland", "forest", "industrial", "commercial", "grass", "meadow"]
+START_YEAR = 2014
+
+@dataclass
+class Scale:
+    cities: int = 4
+    years: int = 10
+    readings_per_day: int = 1
+    floods_per_city_year: int = 8
+    images_per_city_week: int = 3
+    landuse_polygons: int = 20000
+    gfm_events: int = 20000
+
+    @property
+    def start(self):
+        return pd.Timestamp(f"{START_YEAR}-01-01")
+
+    @property
+    def end(self):
+        return pd.Timestamp(f"{START_YEAR + self.years}-01-01")
+
+SCALES = {
+    "small": Scale(cities=4, years=2, landuse_polygons=5000, gfm_events=5000),
+    "medium": Scale(),
+    "large": Scale(cities=16, years=10, readings_per_day=4, landuse_polygons=100000, gfm_events=100000)
+}
+
+def cities(scale):
+    """
+    City names, coordinates and admin1 codes.
+    Returns:
+        pd.DataFrame: name, lat, lon, admin1_code.
+    """
+    rows = []
+    for i in range(scale.cities):
+        name, lat, lon, code = BASE_CITIES[i % len(BASE_CITIES)]
+        if i >= len(BASE_CITIES):
+            name, lat, lon = f"{name}{i // len(BASE_CITIES)}", lat + 0.05 * i, lon + 0.05 * i
+        rows.append({"name": name, "lat": lat, "lon": lon, "admin1_code": code})
+    return pd.DataFrame(rows)
+
+def weather(scale, seed=0):
+    """Rows for the weather table: city, timestamp, temperature, humidity, precipitation."""
+    rng = np.random.default_rng(seed)
+    freq = pd.Timedelta(days=1) / scale.readings_per_day
+    timestamps = pd.date_range(scale.start, scale.end, freq=freq, inclusive="left")
+    names = cities(scale)["name"].to_numpy()
+    n = len(timestamps) * len(names)
+    day_of_year = np.tile(timestamps.dayofyear.to_numpy(), len(names))
+    wet_season = np.sin(2 * np.pi * (day_of_year - 90) / 365).clip(0)
+    return pd.DataFrame({
+        "city": np.repeat(names, len(timestamps)),
+        "timestamp": np.tile(timestamps.strftime("%Y-%m-%d %H:%M:%S"), len(names)),
+        "temperature": rng.normal(27, 2, n).round(1),
+        "humidity": rng.normal(75, 10, n).clip(0, 100).round(),
+        "precipitation": (rng.gamma(0.6, 8, n) * wet_season).round(1)
+    })
+
+def historical_floods(scale, seed=1):
+    """Rows for the historical_floods table and the train/test splits: date, location, severity, country."""
+    rng = np.random.default_rng(seed)
+    names = cities(scale)["name"].to_numpy()
+    n = scale.cities * scale.years * scale.floods_per_city_year
+    days = rng.integers(0, (scale.end - scale.start).days, n)
+    return pd.DataFrame({
+        "date": (scale.start + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d"),
+        "location": rng.choice(names, n),
+        "severity": rng.choice(["High", "Moderate"], n, p=[0.3, 0.7]),
+        "country": "Nigeria"
+    })
+
+def sentinel_metadata(scale, seed=2):
+    """Rows for the sentinel_metadata table: image_id, date (ms), region."""
+    rng = np.random.default_rng(seed)
+    names = cities(scale)["name"].to_numpy()
+    weeks = scale.years * 52
+    n = scale.cities * weeks * scale.images_per_city_week
+    seconds = rng.integers(0, int((scale.end - scale.start).total_seconds()), n)
+    times = scale.start + pd.to_timedelta(seconds, unit="s")
+    return pd.DataFrame({
+        "image_id": [f"COPERNICUS/S1_GRD/S1A_IW_{i:08d}" for i in range(n)],
+        "date": (times.asi8 // 10**6).astype("int64"),
+        "region": rng.choice(names, n)
+    })
+
+def socioeconomic(scale, seed=3):
+    """Rows for the socioeconomic table: state, landuse_type, area_sqm."""
+    rng = np.random.default_rng(seed)
+    names = cities(scale)["name"]
+    rows = [(name, landuse, float(rng.uniform(1e5, 1e8))) for name in names for landuse in LANDUSE_CLASSES]
+    return pd.DataFrame(rows, columns=["state", "landuse_type", "area_sqm"])
+
+def forecasts(scale, issues=365, horizons=(1, 3, 7), seed=6):
+    """Rows for the forecasts table: the last `issues` daily issues per city and horizon."""
+    rng = np.random.default_rng(seed)
+    names = cities(scale)["name"].to_numpy()
+    issue_dates = scale.end - pd.to_timedelta(np.arange(issues, 0, -1), unit="D")
+    grid = pd.MultiIndex.from_product([issue_dates, names, horizons], names=["issue", "state", "horizon_days"])
+    df = grid.to_frame(index=False)
+    n = len(df)
+    probabilities = rng.random(n)
+    return pd.DataFrame({
+        "issue_date": df["issue"].dt.strftime("%Y-%m-%d"),
+        "state": df["state"],
+        "horizon_days": df["horizon_days"],
+        "target_date": (df["issue"] + pd.to_timedelta(df["horizon_days"], unit="D")).dt.strftime("%Y-%m-%d"),
+        "flood_probability": probabilities,
+        "risk_level": np.select([probabilities >= 0.7, probabilities >= 0.4], ["High", "Medium"], default="Low"),
+        "temperature": rng.normal(27, 2, n),
+        "humidity": rng.uniform(60, 100, n),
+        "precipitation": rng.exponential(5, n),
+        "avg_precipitation_7d": rng.exponential(5, n),
+        "avg_precipitation_30d": rng.exponential(5, n),
+        "weather_source": "openweathermap"
+    })
+
+def era5_daily(scale, bounds=(2.5, 4.0, 15.0, 14.0), resolution=0.25, days=30, seed=7):
+    """Daily weather on an ERA5-like grid, shaped like build_risk_surface.load_era5_daily output."""
+    rng = np.random.default_rng(seed)
+    west, south, east, north = bounds
+    lat = np.arange(north, south - resolution / 2, -resolution)
+    lon = np.arange(west, east + resolution / 2, resolution)
+    shape = (days, len(lat), len(lon))
+    return {
+        "lat": lat,
+        "lon": lon,
+        "end_date": scale.end - pd.Timedelta(days=1),
+        "temperature": rng.normal(27, 2, shape),
+        "humidity": rng.uniform(50, 100, shape),
+        "precipitation": rng.exponential(3, shape)
+    }
+
+def training_events(scale, seed=8):
+    """Feature-store training events with the risk model's columns and a flood_risk label."""
+    rng = np.random.default_rng(seed)
+    n = scale.cities * scale.years * scale.floods_per_city_year * 2
+    flood_risk = rng.integers(0, 2, n)
+    return pd.DataFrame({
+        "location": rng.choice(cities(scale)["name"], n),
+        "temperature": rng.random(n),
+        "humidity": rng.random(n),
+        "precipitation": rng.random(n) * (1 + flood_risk),
+        "avg_precipitation_7d": rng.exponential(3, n) * (1 + flood_risk),
+        "avg_temperature_7d": rng.normal(27, 2, n),
+        "avg_humidity_7d": rng.uniform(50, 100, n),
+        "avg_precipitation_30d": rng.exponential(3, n),
+        "flood_risk": flood_risk
+    })
+
+def landuse(scale, bounds=(3.0, 6.3, 3.6, 6.8), seed=4):
+    """Land use polygons (~100 m squares) in EPSG:4326 with a landuse column."""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = bounds
+    xs = rng.uniform(minx, maxx, scale.landuse_polygons)
+    ys = rng.uniform(miny, maxy, scale.landuse_polygons)
+    return gpd.GeoDataFrame(
+        {"landuse": rng.choice(LANDUSE_CLASSES, scale.landuse_polygons)},
+        geometry=shapely.box(xs, ys, xs + 0.001, ys + 0.001),
+        crs="EPSG:4326"
+    )
+
+def gfm_inputs(scale, seed=5):
+    """
+    Inputs of process_gfm.py.
+    Returns:
+        tuple: (GFM events DataFrame, GeoNames DataFrame in file column order, states GeoDataFrame).
+    """
+    rng = np.random.default_rng(seed)
+    city_df = cities(scale)
+    n_places = 2000
+    place_city = rng.integers(0, len(city_df), n_places)
+    # A tenth of the places carry no admin1 code so the spatial-join fallback runs too
+    codes = city_df["admin1_code"].to_numpy()[place_city].astype(object)
+    codes[rng.random(n_places) < 0.1] = "99"
+    geonames = pd.DataFrame({
+        0: np.arange(n_places) + 2300000,
+        1: [f"Place {i}" for i in range(n_places)],
+        2: "", 3: "",
+        4: city_df["lat"].to_numpy()[place_city] + rng.normal(0, 0.05, n_places),
+        5: city_df["lon"].to_numpy()[place_city] + rng.normal(0, 0.05, n_places),
+        6: "P", 7: "PPL", 8: "NG", 9: "",
+        10: codes
+    })
+    start_days = rng.integers(-365, (scale.end - scale.start).days + 365, scale.gfm_events)
+    starts = scale.start + pd.to_timedelta(start_days, unit="D")
+    gfm = pd.DataFrame({
+        "location_ID": [f"g-{i}" for i in rng.choice(geonames[0], scale.gfm_events)],
+        "start": starts.strftime("%Y-%m-%d"),
+        "end": (starts + pd.to_timedelta(rng.integers(1, 15, scale.gfm_events), unit="D")).strftime("%Y-%m-%d")
+    })
+    states = gpd.GeoDataFrame(
+        {"NAME_1": city_df["name"]},
+        geometry=shapely.box(city_df["lon"] - 0.3, city_df["lat"] - 0.3, city_df["lon"] + 0.3, city_df["lat"] + 0.3),
+        crs="EPSG:4326"
+    )
+    return gfm, geonames, states
+
+def build_database(db_path, scale):
+    """Write the weather, historical_floods, sentinel_metadata and socioeconomic tables."""
+    conn = sqlite3.connect(db_path)
+    try:
+        weather(scale).to_sql("weather", conn, if_exists="replace", index=False)
+        historical_floods(scale).to_sql("historical_floods", conn, if_exists="replace", index=False)
+        sentinel_metadata(scale).to_sql("sentinel_metadata", conn, if_exists="replace", index=False)
+        socioeconomic(scale).to_sql("socioeconomic", conn, if_exists="replace", index=False)
+        conn.commit()
+    finally:
+        conn.close()
@@ -4,6 +4,14 @@ import { MapContainer, TileLayer, GeoJSON } from 'react-leaflet';
 import { BarChart, Bar, LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import 'leaflet/dist/leaflet.css';
 
+// Expand {columns, data: {col: [...]}} into an array of row objects
+const columnarToRows = ({ columns, data }) => {
+  const length = columns.length > 0 ? data[columns[0]].length : 0;
+  return Array.from({ length }, (_, i) =>
+    Object.fromEntries(columns.map(col => [col, data[col][i]]))
+  );
+};
+
 const FloodDashboard = () => {
   const [landUseData, setLandUseData] = useState(null);
   const [socioData, setSocioData] = useState([]);
@@ -15,44 +23,16 @@ const FloodDashboard = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        // Fetch land use GeoJSON for map
-        try {
-          const landUseRes = await axios.get('http://localhost:5000/api/landuse/lagos');
-          setLandUseData(landUseRes.data);
-        } catch (err) {
-          console.error('Land Use fetch error:', err.message);
+        // Fetch every dataset in one columnar response
+        const dashboardRes = await axios.get('http://localhost:5000/api/dashboard');
+        const { landuse, socioeconomic, sentinel_features, weather_features } = dashboardRes.data;
+        if (!landuse) {
           throw new Error('Failed to load land use data');
         }
-        
-        // Fetch socioeconomic features
-        try {
-          const socioRes = await axios.get('http://localhost:5000/api/socioeconomic');
-          console.log('Socioeconomic Data:', socioRes.data.slice(0, 5));
-          setSocioData(socioRes.data);
-        } catch (err) {
-          console.error('Socioeconomic fetch error:', err.message);
-          throw new Error('Failed to load socioeconomic data');
-        }
-        
-        // Fetch sentinel features
-        try {
-          const sentinelRes = await axios.get('http://localhost:5000/api/sentinel_features');
-          console.log('Sentinel Data:', sentinelRes.data);
-          setSentinelData(sentinelRes.data);
-        } catch (err) {
-          console.error('Sentinel fetch error:', err.message);
-          throw new Error('Failed to load Sentinel data');
-        }
-        
-        // Fetch weather features
-        try {
-          const weatherRes = await axios.get('http://localhost:5000/api/weather_features');
-          console.log('Weather Data:', weatherRes.data.slice(0, 5));
-          setWeatherData(weatherRes.data);
-        } catch (err) {
-          console.error('Weather fetch error:', err.message);
-          throw new Error('Failed to load weather data');
-        }
+        setLandUseData(landuse);
+        setSocioData(columnarToRows(socioeconomic));
+        setSentinelData(columnarToRows(sentinel_features));
+        setWeatherData(columnarToRows(weather_features));
       } catch (err) {
         console.error('Fetch error:', err);
         setError(err.message || 'Failed to load data. Please check the backend server.');
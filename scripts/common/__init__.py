@@ -0,0 +1 @@
+"""Helpers shared by the pipeline scripts and the backend."""
@@ -0,0 +1,91 @@
+"""
+Feature store for the training and inference matrix.
+
+Per-state static features (land use areas) are stored once in
+data/features/state_static.parquet, one row per location. Event rows
+(data/features/{split}_events.parquet) keep only their own columns plus the
+date-dependent weather and Sentinel features, and are joined to the static
+table by location when a model needs the full matrix. Paths are relative to
+the working directory, like the other stage outputs.
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+STORE_DIR = Path("data/features")
+STATIC_PATH = STORE_DIR / "state_static.parquet"
+KEY = "location"
+
+def events_path(split):
+    """Path of a split's event rows ("train" or "test")."""
+    return STORE_DIR / f"{split}_events.parquet"
+
+def _write(df, path):
+    """Write a parquet file atomically (tmp file, then rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+def write_static(static):
+    """
+    Write (or replace) the per-location static feature table.
+    Args:
+        static (pd.DataFrame): One row per location, with a location column.
+    Returns:
+        Path: File written.
+    """
+    if static[KEY].duplicated().any():
+        raise ValueError(f"Static features must have one row per {KEY}.")
+    return _write(static, STATIC_PATH)
+
+def write_events(events, split):
+    """
+    Write (or replace) a split's event rows.
+    Args:
+        events (pd.DataFrame): Event rows with a location column.
+        split (str): "train" or "test".
+    Returns:
+        Path: File written.
+    """
+    return _write(events, events_path(split))
+
+def read_static(columns=None):
+    """Read the static feature table; columns limits the features read (location is always included)."""
+    if columns is not None:
+        columns = [KEY] + [col for col in columns if col != KEY]
+    return pd.read_parquet(STATIC_PATH, columns=columns)
+
+def read_events(split, columns=None):
+    """Read a split's event rows."""
+    return pd.read_parquet(events_path(split), columns=columns)
+
+def join_static(events, static=None):
+    """
+    Attach static features to event rows by location.
+    Locations missing from the static table get 0 for every static feature.
+    Args:
+        events (pd.DataFrame): Event rows with a location column.
+        static (pd.DataFrame): Static table; read from the store if None.
+    Returns:
+        pd.DataFrame: Event columns followed by static feature columns, in event order.
+    """
+    if static is None:
+        static = read_static()
+    feature_columns = [col for col in static.columns if col != KEY]
+    matrix = events.merge(static, on=KEY, how="left", validate="many_to_one")
+    matrix[feature_columns] = matrix[feature_columns].fillna(0)
+    return matrix
+
+def load_matrix(split, static_columns=None):
+    """
+    Full feature matrix for a split: event rows joined with static features.
+    Args:
+        split (str): "train" or "test".
+        static_columns (list): Optional subset of static features.
+    Returns:
+        pd.DataFrame: Materialized matrix.
+    """
+    return join_static(read_events(split), read_static(static_columns))
@@ -0,0 +1,66 @@
+"""
+Reads and writes of the forecasts table.
+
+One row per (issue_date, state, horizon_days): the flood probability for
+issue_date + horizon_days and the weather features it was scored from. A
+rerun on the same issue date replaces that day's rows, earlier issues are kept.
+The primary key index serves the latest issue as a single indexed read:
+
+    SELECT ... FROM forecasts WHERE issue_date = (SELECT MAX(issue_date) FROM forecasts)
+"""
+FORECAST_TABLE = "forecasts"
+HORIZONS = (1, 3, 7)
+FORECAST_COLUMNS = [
+    "issue_date", "state", "horizon_days", "target_date", "flood_probability", "risk_level",
+    "temperature", "humidity", "precipitation", "avg_precipitation_7d", "avg_precipitation_30d",
+    "weather_source"
+]
+
+# Both the MAX and the row lookup use the (issue_date, state, horizon_days) primary key
+LATEST_FORECASTS_QUERY = f"""
+    SELECT {", ".join(FORECAST_COLUMNS)}
+    FROM {FORECAST_TABLE}
+    WHERE issue_date = (SELECT MAX(issue_date) FROM {FORECAST_TABLE})
+    ORDER BY state, horizon_days;
+"""
+
+def create_forecast_table(conn):
+    """Create the forecasts table if missing."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {FORECAST_TABLE} (
+            issue_date TEXT NOT NULL,
+            state TEXT NOT NULL,
+            horizon_days INTEGER NOT NULL,
+            target_date TEXT NOT NULL,
+            flood_probability REAL,
+            risk_level TEXT,
+            temperature REAL,
+            humidity REAL,
+            precipitation REAL,
+            avg_precipitation_7d REAL,
+            avg_precipitation_30d REAL,
+            weather_source TEXT,
+            PRIMARY KEY (issue_date, state, horizon_days)
+        );
+    """)
+    conn.commit()
+
+def write_forecasts(conn, df):
+    """
+    Insert forecasts, replacing rows of the same (issue_date, state, horizon_days).
+    Args:
+        conn: sqlite3 connection.
+        df (pd.DataFrame): FORECAST_COLUMNS, dates as YYYY-MM-DD text.
+    Returns:
+        int: Rows written.
+    """
+    if df.empty:
+        return 0
+    rows = df[FORECAST_COLUMNS].astype(object).where(df[FORECAST_COLUMNS].notna(), None)
+    placeholders = ", ".join("?" for _ in FORECAST_COLUMNS)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {FORECAST_TABLE} ({', '.join(FORECAST_COLUMNS)}) VALUES ({placeholders});",
+        rows.itertuples(index=False, name=None)
+    )
+    conn.commit()
+    return len(rows)
@@ -0,0 +1,147 @@
+"""
+Regular lon/lat grid over Nigeria and the risk surface stored on it.
+
+Cells are RESOLUTION degrees wide, laid out like a raster: row 0 is the
+northernmost row, column 0 the westernmost column. The surface is one
+compressed .npz file holding
+
+    features      float32 (n_features, height, width)  cell features, NaN outside Nigeria
+    feature_names str     (n_features,)
+    probability   float32 (height, width)               flood probability, NaN outside Nigeria
+    state_index   int16   (height, width)               index into state_names, -1 outside Nigeria
+    state_names   str     (n_states,)
+    origin        float64 (3,)                           west, north, resolution
+
+so a map layer or a per-state summary needs no geometry at read time.
+SURFACE_PATH is relative to the working directory, like the other stage
+outputs; the backend anchors it to the repository.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import shapely
+
+SURFACE_PATH = Path("data/grid/risk_surface.npz")
+NIGERIA_BOUNDS = (2.6, 4.2, 14.7, 13.9)  # west, south, east, north
+RESOLUTION = 0.1
+NO_STATE = -1
+
+def grid_shape(bounds=NIGERIA_BOUNDS, resolution=RESOLUTION):
+    """(height, width) of the grid covering bounds."""
+    west, south, east, north = bounds
+    return int(np.ceil(round((north - south) / resolution, 6))), int(np.ceil(round((east - west) / resolution, 6)))
+
+def cell_centers(bounds=NIGERIA_BOUNDS, resolution=RESOLUTION):
+    """
+    Cell center coordinates.
+    Returns:
+        tuple: (lon per column, lat per row), north to south.
+    """
+    west, _, _, north = bounds
+    height, width = grid_shape(bounds, resolution)
+    lon = west + (np.arange(width) + 0.5) * resolution
+    lat = north - (np.arange(height) + 0.5) * resolution
+    return lon, lat
+
+def state_index(states, bounds=NIGERIA_BOUNDS, resolution=RESOLUTION, name_column="NAME_1"):
+    """
+    Assign every cell to the state polygon containing its center.
+    Args:
+        states (gpd.GeoDataFrame): State polygons.
+        bounds (tuple): Grid bounds.
+        resolution (float): Cell size in degrees.
+        name_column (str): Column with the state name.
+    Returns:
+        tuple: (int16 index array (height, width), -1 outside every state; state names).
+    """
+    states = states.to_crs(epsg=4326)
+    lon, lat = cell_centers(bounds, resolution)
+    lon_grid, lat_grid = np.meshgrid(lon, lat)
+    index = np.full(lon_grid.shape, NO_STATE, dtype=np.int16)
+    for position, geometry in enumerate(states.geometry):
+        # Only test the cells inside the state's bounding box
+        minx, miny, maxx, maxy = geometry.bounds
+        rows = (lat >= miny) & (lat <= maxy)
+        cols = (lon >= minx) & (lon <= maxx)
+        if not rows.any() or not cols.any():
+            continue
+        window = np.ix_(rows, cols)
+        inside = shapely.contains_xy(geometry, lon_grid[window], lat_grid[window]) & (index[window] == NO_STATE)
+        index[window] = np.where(inside, position, index[window])
+    return index, states[name_column].astype(str).to_numpy(dtype=str)
+
+def cell_of(lon, lat, bounds=NIGERIA_BOUNDS, resolution=RESOLUTION):
+    """
+    Row and column of the cell containing each point.
+    Returns:
+        tuple: (rows, cols, inside) arrays; rows and cols are only valid where inside.
+    """
+    west, _, _, north = bounds
+    height, width = grid_shape(bounds, resolution)
+    rows = np.floor((north - np.asarray(lat)) / resolution).astype(np.int64)
+    cols = np.floor((np.asarray(lon) - west) / resolution).astype(np.int64)
+    inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    return rows, cols, inside
+
+def write_surface(surface, path=SURFACE_PATH):
+    """Write a surface dict (see module docstring) atomically (tmp file, then rename)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp_path, **surface)
+    os.replace(tmp_path, path)
+    return path
+
+def read_surface(path=SURFACE_PATH):
+    """
+    Load a stored surface.
+    Returns:
+        dict: Arrays by name.
+    Raises:
+        FileNotFoundError: If no surface has been written at path.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+def surface_bounds(surface):
+    """(west, south, east, north) of a stored surface."""
+    west, north, resolution = surface["origin"]
+    height, width = surface["probability"].shape
+    return west, north - height * resolution, west + width * resolution, north
+
+def crop(surface, bbox):
+    """
+    Rows and columns of the cells intersecting bbox.
+    Args:
+        surface (dict): Stored surface.
+        bbox (tuple): (minx, miny, maxx, maxy) in EPSG:4326.
+    Returns:
+        tuple: (row slice, column slice), possibly empty.
+    """
+    west, north, resolution = surface["origin"]
+    height, width = surface["probability"].shape
+    minx, miny, maxx, maxy = bbox
+    row_start = int(np.clip(np.floor((north - maxy) / resolution), 0, height))
+    row_stop = int(np.clip(np.ceil((north - miny) / resolution), 0, height))
+    col_start = int(np.clip(np.floor((minx - west) / resolution), 0, width))
+    col_stop = int(np.clip(np.ceil((maxx - west) / resolution), 0, width))
+    return slice(row_start, row_stop), slice(col_start, col_stop)
+
+def state_summary(surface):
+    """Cells, mean and max probability per state from the grid-to-state index."""
+    index = surface["state_index"].ravel()
+    probability = surface["probability"].ravel()
+    inside = index != NO_STATE
+    n_states = len(surface["state_names"])
+    cells = np.bincount(index[inside], minlength=n_states)
+    totals = np.bincount(index[inside], weights=probability[inside], minlength=n_states)
+    maxima = np.full(n_states, np.nan)
+    np.fmax.at(maxima, index[inside], probability[inside])
+    return pd.DataFrame({
+        "state": surface["state_names"],
+        "cells": cells,
+        "mean_probability": np.divide(totals, cells, out=np.full(n_states, np.nan), where=cells > 0),
+        "max_probability": maxima
+    })
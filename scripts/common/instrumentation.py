@@ -0,0 +1,149 @@
+"""
+Timing and profiling for the pipeline scripts.
+
+Each stage script adds the shared flags to its parser and runs its main work
+through run():
+
+    parser = argparse.ArgumentParser(...)
+    instrumentation.add_profile_args(parser)
+    args = parser.parse_args()
+    instrumentation.run(lambda: merge_features(...), args, "merge_features", output="data/features")
+
+Phases inside the script are timed with named spans:
+
+    with instrumentation.span("load") as s:
+        df = pd.read_sql(...)
+        s["rows"] = len(df)
+
+run() writes a JSON summary next to the output (<output>.profile.json, or
+data/profiles/<name>.profile.json when the output is a table): total time,
+exit status and spans, plus the top cProfile functions and a .prof file with
+--profile, and the tracemalloc peak with --profile-memory.
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_DIR = "data/profiles"
+TOP_FUNCTIONS = 25
+
+logger = logging.getLogger("instrumentation")
+
+_spans = {}
+_spans_lock = threading.Lock()
+
+def add_profile_args(parser):
+    """Add --profile and --profile-memory to an argparse parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile and include the top functions in the JSON summary")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Track peak Python memory with tracemalloc (slows the run)")
+    return parser
+
+@contextmanager
+def span(name):
+    """
+    Time a named phase. Repeated spans with the same name accumulate.
+    Yields a dict; keys set on it (e.g. rows) are summed into the span's summary.
+    """
+    extra = {}
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        elapsed = time.perf_counter() - start
+        with _spans_lock:
+            entry = _spans.setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += elapsed
+            entry["calls"] += 1
+            for key, value in extra.items():
+                entry[key] = entry.get(key, 0) + value
+
+def spans():
+    """Snapshot of the spans recorded so far."""
+    with _spans_lock:
+        return {name: dict(entry) for name, entry in _spans.items()}
+
+def summary_path(name, output=None):
+    """Where run() writes the summary for a script."""
+    if output and not str(output).startswith("db:"):
+        return f"{str(output).rstrip('/')}.profile.json"
+    return os.path.join(PROFILE_DIR, f"{name}.profile.json")
+
+def top_functions(profiler, limit=TOP_FUNCTIONS):
+    """The most expensive functions by cumulative time."""
+    stats = pstats.Stats(profiler)
+    cwd = os.getcwd() + os.sep
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename.removeprefix(cwd)}:{line}({function})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6)
+        })
+    return sorted(rows, key=lambda row: row["cumtime"], reverse=True)[:limit]
+
+def run(func, args, name, output=None):
+    """
+    Run a script's main work with timing, optional profiling and a JSON summary.
+    Args:
+        func (callable): Zero-argument callable doing the work.
+        args (argparse.Namespace): Parsed arguments including the profile flags.
+        name (str): Script name used in the summary.
+        output (str): The script's main output path (or "db:<table>"); the summary goes next to it.
+    Returns:
+        Whatever func returns.
+    """
+    with _spans_lock:
+        _spans.clear()
+    profiler = cProfile.Profile() if getattr(args, "profile", False) else None
+    track_memory = getattr(args, "profile_memory", False)
+    if track_memory:
+        tracemalloc.start()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        if profiler:
+            profiler.enable()
+        return func()
+    except SystemExit as e:
+        status = f"exit {e.code}"
+        raise
+    except BaseException as e:
+        status = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+        summary = {
+            "script": name,
+            "started_at": started_at,
+            "seconds": round(time.perf_counter() - start, 6),
+            "status": status,
+            "argv": sys.argv[1:],
+            "spans": spans()
+        }
+        if track_memory:
+            summary["peak_memory_mib"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+        path = summary_path(name, output)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if profiler:
+            profile_path = path.replace(".profile.json", ".prof")
+            profiler.dump_stats(profile_path)
+            summary["profile_file"] = profile_path
+            summary["top_functions"] = top_functions(profiler)
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        logger.info("%s: %.2fs (%s), summary written to %s", name, summary['seconds'], status, path,
+                    extra={"script": name, "seconds": summary["seconds"], "status": status, "summary": path})
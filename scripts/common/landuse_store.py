@@ -0,0 +1,77 @@
+"""
+GeoParquet store for cleaned land use layers.
+
+One file per state under data/geospatial/landuse/, in EPSG:4326. Rows are
+sorted along a Hilbert curve and written with GeoParquet 1.1 bbox covering
+columns, so bbox reads only decode the row groups that can intersect.
+STORE_DIR is relative to the working directory, like the other stage outputs;
+the backend passes its own store_dir anchored to the repository.
+"""
+import os
+from pathlib import Path
+
+import geopandas as gpd
+
+STORE_DIR = Path("data/geospatial/landuse")
+ROW_GROUP_SIZE = 10000
+
+def state_path(state, store_dir=None):
+    """Path of a state's layer in the store (store_dir, default STORE_DIR)."""
+    return Path(store_dir or STORE_DIR) / f"{state.lower()}.parquet"
+
+def available_states(store_dir=None):
+    """
+    List states present in the store.
+    Args:
+        store_dir (str): Store directory, default STORE_DIR.
+    Returns:
+        list: Lower-case state names, sorted.
+    """
+    store_dir = Path(store_dir or STORE_DIR)
+    if not store_dir.exists():
+        return []
+    return sorted(path.stem for path in store_dir.glob("*.parquet"))
+
+def write_state(gdf, state, store_dir=None):
+    """
+    Write (or replace) a state's layer.
+    Args:
+        gdf (gpd.GeoDataFrame): Cleaned land use polygons.
+        state (str): State name.
+        store_dir (str): Store directory, default STORE_DIR.
+    Returns:
+        Path: File written.
+    """
+    gdf = gdf.to_crs(epsg=4326)
+    if len(gdf) > 0:
+        # Spatially nearby features share row groups, which keeps bbox pruning effective
+        gdf = gdf.iloc[gdf.hilbert_distance().argsort()]
+    gdf = gdf.reset_index(drop=True)
+
+    path = state_path(state, store_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    gdf.to_parquet(tmp_path, write_covering_bbox=True, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+    return path
+
+def read_state(state, columns=None, bbox=None, store_dir=None):
+    """
+    Read a state's layer.
+    Args:
+        state (str): State name.
+        columns (list): Attribute columns to load (geometry is always loaded); None loads all.
+        bbox (tuple): Optional (minx, miny, maxx, maxy) in EPSG:4326; only features whose
+            bounding box intersects it are returned.
+        store_dir (str): Store directory, default STORE_DIR.
+    Returns:
+        gpd.GeoDataFrame: Land use polygons.
+    Raises:
+        FileNotFoundError: If the state is not in the store.
+    """
+    path = state_path(state, store_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"Land use layer for {state} not found: {path}")
+    if columns is not None:
+        columns = list(columns) + ["geometry"]
+    return gpd.read_parquet(path, columns=columns, bbox=bbox)
@@ -0,0 +1,125 @@
+"""
+Registry of the locations the pipeline tracks, read from data/geospatial/locations.json.
+
+Every stage takes its location list from here instead of hard-coding one.
+Each entry names a state the way the flood, weather and feature tables store it
+and carries what the stages need to reach it:
+
+    name          canonical state name (flood location, weather city, socioeconomic state)
+    polygon_name  the state's name in the registry's states_file (name_column)
+    admin1_code   GeoNames admin1 code, used by process_gfm.py
+    iso_code      ISO 3166-2 code
+    city          reference city for point weather and Sentinel-1 searches
+    aliases       other names the location was stored under (e.g. the city name);
+                  scripts/preprocessing/migrate_location_names.py rewrites them
+    weather_query OpenWeatherMap q= parameter
+    centroid      lat/lon of the reference city
+    bbox          Sentinel-1 search box [minx, miny, maxx, maxy] around the city
+    landuse_bbox  bounds that replace the state outline's extent when cleaning land use, or null
+
+Tracking another state is one more entry in the JSON file. The file is read
+once per process.
+"""
+import json
+from pathlib import Path
+
+current_file_path = Path(__file__).resolve()
+parent_path = current_file_path.parents[2]
+
+REGISTRY_PATH = parent_path / "data/geospatial/locations.json"
+
+_registry_cache = {}
+
+def load(path=REGISTRY_PATH):
+    """
+    Read the registry, once per path.
+    Returns:
+        dict: states_file, name_column and the list of locations.
+    """
+    path = Path(path)
+    if path not in _registry_cache:
+        with open(path, "r") as f:
+            registry = json.load(f)
+        names = [location["name"] for location in registry["locations"]]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate location names in {path}")
+        _registry_cache[path] = registry
+    return _registry_cache[path]
+
+def all_locations(path=REGISTRY_PATH):
+    """Location entries in registry order."""
+    return load(path)["locations"]
+
+def names(path=REGISTRY_PATH):
+    """Canonical location names in registry order."""
+    return [location["name"] for location in all_locations(path)]
+
+def slugs(path=REGISTRY_PATH):
+    """Lower-case location names, the keys of the land use store and the file patterns."""
+    return [name.lower() for name in names(path)]
+
+def get(name, path=REGISTRY_PATH):
+    """
+    Look up a location by name, alias or slug.
+    Raises:
+        KeyError: If nothing in the registry matches.
+    """
+    canonical_name = alias_map(path).get(str(name).lower())
+    if canonical_name is None:
+        raise KeyError(f"Unknown location {name}")
+    return next(location for location in all_locations(path) if location["name"] == canonical_name)
+
+def by_admin1(path=REGISTRY_PATH):
+    """GeoNames admin1 code -> canonical name."""
+    return {location["admin1_code"]: location["name"] for location in all_locations(path)}
+
+def alias_map(path=REGISTRY_PATH):
+    """Lower-case name, slug or alias -> canonical name."""
+    mapping = {}
+    for location in all_locations(path):
+        for alias in [location["name"], *location.get("aliases", [])]:
+            mapping[alias.lower()] = location["name"]
+    return mapping
+
+def canonicalize_table(conn, table, column, keys, path=REGISTRY_PATH):
+    """
+    Rewrite names stored in table.column under an alias (or in another case)
+    to the canonical name. A row whose keys already exist under the canonical
+    name is dropped instead, so the canonical row is kept.
+    Args:
+        conn: sqlite3 connection; the caller commits.
+        table (str): Table to rewrite.
+        column (str): Column holding the location name.
+        keys (list): Columns that identify a row together with column.
+    Returns:
+        tuple: (rows renamed, rows dropped).
+    """
+    same_key = " AND ".join(f"kept.{key} = {table}.{key}" for key in keys) or "1"
+    renamed = dropped = 0
+    for alias, name in alias_map(path).items():
+        renamed += conn.execute(f"""
+            UPDATE OR IGNORE {table} SET {column} = :name
+            WHERE lower({column}) = :alias AND {column} != :name
+            AND NOT EXISTS (SELECT 1 FROM {table} AS kept WHERE kept.{column} = :name AND {same_key});
+        """, {"alias": alias, "name": name}).rowcount
+        dropped += conn.execute(f"DELETE FROM {table} WHERE lower({column}) = :alias AND {column} != :name;",
+                                {"alias": alias, "name": name}).rowcount
+    return renamed, dropped
+
+def polygons(states_file=None, path=REGISTRY_PATH):
+    """
+    State outlines of the registered locations.
+    Args:
+        states_file (str): Override of the registry's states_file.
+    Returns:
+        gpd.GeoDataFrame: location (canonical name) and geometry, EPSG:4326.
+    """
+    import geopandas as gpd
+
+    registry = load(path)
+    states_file = states_file or parent_path / registry["states_file"]
+    outlines = gpd.read_file(states_file, columns=[registry["name_column"]]).to_crs(epsg=4326)
+    names_by_polygon = {location["polygon_name"]: location["name"] for location in registry["locations"]}
+    outlines["location"] = outlines[registry["name_column"]].map(names_by_polygon)
+    outlines = outlines.dropna(subset=["location"])
+    return outlines[["location", "geometry"]].reset_index(drop=True)
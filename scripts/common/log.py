@@ -0,0 +1,80 @@
+"""
+Logging for the pipeline scripts.
+
+Scripts log through a named logger and configure output from shared flags:
+
+    logger = logging.getLogger("merge_features")
+    ...
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+--log-level defaults to $FLOOD_LOG_LEVEL or INFO. --log-format json writes one
+JSON object per line, including any extra={...} fields passed to the call.
+
+Per-row or per-window detail belongs at DEBUG with lazy %-style arguments, so
+nothing is formatted unless DEBUG is enabled; loops count what they skip and
+log the total once. DataFrame previews go through preview(), which only
+renders the frame at DEBUG.
+"""
+import json
+import logging
+import os
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+PREVIEW_ROWS = 5
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and extra fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def add_log_args(parser):
+    """Add --log-level and --log-format to an argparse parser."""
+    parser.add_argument("--log-level", type=str.upper, choices=LEVELS,
+                        default=os.getenv("FLOOD_LOG_LEVEL", "INFO").upper(),
+                        help="Minimum level to log; DEBUG adds data previews and per-row detail")
+    parser.add_argument("--log-format", choices=["text", "json"], default="text")
+    return parser
+
+def configure(level="INFO", log_format="text", stream=None):
+    """
+    Send log records to stderr (or stream) at the given level, replacing existing handlers.
+    Args:
+        level (str): Level name.
+        log_format (str): "text" or "json".
+        stream: Optional file-like object instead of stderr.
+    """
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(LOG_FORMAT))
+    logging.basicConfig(level=level, handlers=[handler], force=True)
+
+def preview(logger, title, data, rows=PREVIEW_ROWS):
+    """
+    Log a preview of a DataFrame or Series at DEBUG.
+    Args:
+        logger (logging.Logger): Logger to use.
+        title (str): Heading for the preview.
+        data: A DataFrame/Series (its first rows are shown) or a zero-argument
+            callable returning what to show, e.g. lambda: df.describe().
+            Nothing is computed unless DEBUG is enabled.
+        rows (int): Rows shown for a DataFrame/Series.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    value = data() if callable(data) else data.head(rows)
+    logger.debug("%s:\n%s", title, value.to_string() if hasattr(value, "to_string") else value)
@@ -0,0 +1,57 @@
+"""
+Flood-risk model shared by the forecast and grid scoring stages.
+
+A logistic model over the weather features of the feature-store training
+events: same-day weather (scaled by the WeatherTransform) plus the 7-day and
+30-day window means. Anything that can produce those columns - a state's
+forecast horizon or a grid cell - is scored the same way, in batches:
+
+    model = risk_model.fit(feature_store.read_events("train", columns=risk_model.TRAINING_COLUMNS))
+    probabilities = risk_model.score(model, features, transforms.WeatherTransform.load())
+"""
+import numpy as np
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from common import transforms
+
+WINDOW_COLUMNS = ["avg_precipitation_7d", "avg_temperature_7d", "avg_humidity_7d", "avg_precipitation_30d"]
+MODEL_FEATURES = transforms.FEATURES + WINDOW_COLUMNS
+TRAINING_COLUMNS = MODEL_FEATURES + ["flood_risk"]
+RISK_LEVELS = [(0.7, "High"), (0.4, "Medium")]  # Lower probabilities are "Low"
+BATCH_SIZE = 100000
+
+def fit(events):
+    """
+    Fit the model on training events.
+    Args:
+        events (pd.DataFrame): TRAINING_COLUMNS, same-day weather already scaled.
+    Returns:
+        sklearn Pipeline with predict_proba.
+    """
+    model = make_pipeline(SimpleImputer(), StandardScaler(), LogisticRegression(max_iter=1000))
+    return model.fit(events[MODEL_FEATURES].to_numpy(dtype=float), events["flood_risk"].to_numpy())
+
+def score(model, features, transform, batch_size=BATCH_SIZE):
+    """
+    Flood probability per row, batch_size rows at a time.
+    Args:
+        model: Output of fit.
+        features (pd.DataFrame): MODEL_FEATURES with raw same-day weather.
+        transform (WeatherTransform): Fitted transform for the same-day columns.
+        batch_size (int): Rows scaled and scored per batch.
+    Returns:
+        np.ndarray: float64 probabilities.
+    """
+    probabilities = np.empty(len(features))
+    for start in range(0, len(features), batch_size):
+        batch = transform.transform(features.iloc[start:start + batch_size][MODEL_FEATURES])
+        probabilities[start:start + batch_size] = model.predict_proba(batch.to_numpy(dtype=float))[:, 1]
+    return probabilities
+
+def risk_levels(probabilities):
+    """"High", "Medium" or "Low" per probability."""
+    return np.select([probabilities >= threshold for threshold, _ in RISK_LEVELS],
+                     [level for _, level in RISK_LEVELS], default="Low")
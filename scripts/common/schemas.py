@@ -0,0 +1,141 @@
+"""
+Column dtypes for every table and file the pipeline loads.
+
+Repeated labels (city, location, region, severity, ...) load as categoricals,
+measurements as float32 and dates are parsed once at load with their known
+format, so later code does not re-parse strings. Columns a schema does not
+list keep pandas' default dtype. Coordinates and areas stay float64, as do
+the weather columns of the (small) event tables, which the fitted
+WeatherTransform bounds are computed from. Stages that write values derived
+from a float32 column back to SQL or to the feature store load that column
+with a float64 override (dtype=...), so stored numbers carry no float32
+rounding.
+
+    weather = schemas.read_sql("SELECT * FROM weather;", conn, "weather")
+    gfm = schemas.read_csv("data/global_flood_monitor.csv", "gfm")
+    df = schemas.apply(df, "flood_events")
+
+Dates are given as ("datetime", format) or ("epoch", unit). A value that
+does not match the format is retried with format="mixed" before it becomes
+NaT, so older rows written in another layout still load.
+"""
+import pandas as pd
+
+SCHEMAS = {
+    # SQLite tables
+    "weather": {
+        "city": "category",
+        "timestamp": ("datetime", "%Y-%m-%d %H:%M:%S"),
+        "temperature": "float32",
+        "humidity": "float32",
+        "precipitation": "float32"
+    },
+    "weather_features": {
+        "city": "category",
+        "window_start_date": ("datetime", "%Y-%m-%d"),
+        "avg_precipitation_7d": "float32",
+        "avg_temperature_7d": "float32",
+        "avg_humidity_7d": "float32",
+        "avg_precipitation_30d": "float32"
+    },
+    "sentinel_metadata": {
+        "date": ("epoch", "ms"),
+        "region": "category"
+    },
+    "socioeconomic": {
+        "state": "category",
+        "landuse_type": "category",
+        "area_sqm": "float64"
+    },
+    # Flood event tables and CSVs (historical_floods, *_floods.csv, train/test splits)
+    "flood_events": {
+        "date": ("datetime", "%Y-%m-%d"),
+        "location": "category",
+        "severity": "category",
+        "country": "category",
+        "latitude": "float64",
+        "longitude": "float64"
+    },
+    # Raw inputs
+    "gfm": {
+        "start": ("datetime", "%Y-%m-%d"),
+        "end": ("datetime", "%Y-%m-%d")
+    },
+    "geonames": {
+        "geonameid": "str",
+        "name": "str",
+        "latitude": "float64",
+        "longitude": "float64",
+        "admin1_code": "str"
+    },
+    "dartmouth": {
+        "Country": "category",
+        "long": "float64",
+        "lat": "float64"
+    }
+}
+
+def _is_date(spec):
+    return isinstance(spec, tuple)
+
+def parse_dates(values, spec):
+    """
+    Parse a column per a ("datetime", format) or ("epoch", unit) spec.
+    Returns:
+        pd.Series: datetime64 values, NaT where unparseable.
+    """
+    kind, arg = spec
+    if kind == "epoch":
+        return pd.to_datetime(pd.to_numeric(values, errors="coerce"), unit=arg)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    parsed = pd.to_datetime(values, format=arg, errors="coerce")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], format="mixed", errors="coerce")
+    return parsed
+
+def apply(df, name, dtype=None):
+    """
+    Cast the columns of df that SCHEMAS[name] lists, in place.
+    dtype ({column: spec}) overrides the schema for this call.
+    Returns:
+        pd.DataFrame: df.
+    """
+    for col, spec in {**SCHEMAS[name], **(dtype or {})}.items():
+        if col not in df.columns:
+            continue
+        if _is_date(spec):
+            df[col] = parse_dates(df[col], spec)
+        elif df[col].dtype != spec:
+            df[col] = df[col].astype(spec)
+    return df
+
+def map_labels(values, mapping, default):
+    """
+    Map a label column through mapping, unmapped and missing labels to default.
+    Works on categorical columns, whose fillna rejects values outside the categories.
+    """
+    mapped = values.map(mapping)
+    if isinstance(mapped.dtype, pd.CategoricalDtype) and default not in mapped.cat.categories:
+        mapped = mapped.cat.add_categories([default])
+    return mapped.fillna(default)
+
+def read_sql(query, con, name, dtype=None, **kwargs):
+    """pd.read_sql with the result cast to SCHEMAS[name] (dtype overrides it per column)."""
+    return apply(pd.read_sql(query, con, **kwargs), name, dtype)
+
+def read_csv(path, name, dtype=None, **kwargs):
+    """
+    pd.read_csv that parses straight into SCHEMAS[name] dtypes.
+    Non-date dtypes are passed to the parser; dates are parsed after reading.
+    dtype overrides the schema per column; extra kwargs (usecols, names, ...)
+    go to pd.read_csv.
+    """
+    dtype = dtype or {}
+    dtypes = {col: spec for col, spec in {**SCHEMAS[name], **dtype}.items() if not _is_date(spec)}
+    return apply(pd.read_csv(path, dtype=dtypes, **kwargs), name, dtype)
+
+def memory_mib(df):
+    """Deep memory usage of a DataFrame in MiB."""
+    return df.memory_usage(deep=True).sum() / 2**20
@@ -0,0 +1,170 @@
+"""
+Spatialite access for the land_use table.
+
+The table holds one row per cleaned land use polygon (EPSG:4326) with its
+state, landuse class and precomputed UTM area, plus an R*Tree spatial index
+(idx_land_use_geometry) so bbox and point queries run inside SQLite instead
+of loading geometries into Python.
+"""
+import json
+import math
+import sqlite3
+
+import pandas as pd
+
+LAND_USE_TABLE = "land_use"
+SRID = 4326
+METERS_PER_DEGREE = 111320.0
+
+class SpatialiteUnavailable(RuntimeError):
+    """Raised when the mod_spatialite extension cannot be loaded."""
+
+def connect(db_path):
+    """
+    Open a SQLite connection with mod_spatialite loaded.
+    Raises:
+        SpatialiteUnavailable: If extension loading is unsupported or the module is missing.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.enable_load_extension(True)
+        conn.load_extension("mod_spatialite")
+        conn.enable_load_extension(False)
+    except (AttributeError, sqlite3.OperationalError) as e:
+        conn.close()
+        raise SpatialiteUnavailable(f"mod_spatialite could not be loaded: {e}") from e
+    return conn
+
+def spatialite_available():
+    """True if mod_spatialite can be loaded in this environment."""
+    try:
+        connect(":memory:").close()
+        return True
+    except SpatialiteUnavailable:
+        return False
+
+def create_land_use_table(conn):
+    """Create spatial metadata, the land_use table and its R*Tree index if missing."""
+    has_metadata = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'geometry_columns';"
+    ).fetchone()
+    if not has_metadata:
+        conn.execute("SELECT InitSpatialMetadata(1);")
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (LAND_USE_TABLE,)
+    ).fetchone()
+    if exists:
+        return
+    conn.execute(f"""
+        CREATE TABLE {LAND_USE_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            state TEXT NOT NULL,
+            landuse TEXT,
+            area_sqm REAL
+        );
+    """)
+    conn.execute(f"CREATE INDEX idx_{LAND_USE_TABLE}_state ON {LAND_USE_TABLE} (state, landuse);")
+    conn.execute(f"SELECT AddGeometryColumn('{LAND_USE_TABLE}', 'geometry', {SRID}, 'MULTIPOLYGON', 'XY');")
+    conn.execute(f"SELECT CreateSpatialIndex('{LAND_USE_TABLE}', 'geometry');")
+
+def replace_state_features(conn, state, rows):
+    """
+    Replace a state's polygons.
+    Args:
+        conn: Spatialite connection.
+        state (str): Canonical state name from the location registry.
+        rows (iterable): (landuse, area_sqm, wkb) tuples; geometries in EPSG:4326.
+    Returns:
+        int: Rows inserted.
+    """
+    conn.execute(f"DELETE FROM {LAND_USE_TABLE} WHERE state = ?;", (state,))
+    cursor = conn.executemany(f"""
+        INSERT INTO {LAND_USE_TABLE} (state, landuse, area_sqm, geometry)
+        VALUES (?, ?, ?, CastToMultiPolygon(GeomFromWKB(?, {SRID})));
+    """, ((state, landuse, area, wkb) for landuse, area, wkb in rows))
+    return cursor.rowcount
+
+def _rtree_filter(minx, miny, maxx, maxy):
+    """SQL fragment and params selecting candidate rowids from the R*Tree."""
+    sql = (f"id IN (SELECT pkid FROM idx_{LAND_USE_TABLE}_geometry "
+           "WHERE xmin <= ? AND xmax >= ? AND ymin <= ? AND ymax >= ?)")
+    return sql, [maxx, minx, maxy, miny]
+
+def area_by_landuse(conn, state=None):
+    """
+    Total area per land use class, per state.
+    Returns:
+        pd.DataFrame: Columns state, landuse, area_sqm, feature_count.
+    """
+    where, params = "", []
+    if state is not None:
+        where, params = "WHERE state = ?", [state]
+    return pd.read_sql(f"""
+        SELECT state, landuse, SUM(area_sqm) AS area_sqm, COUNT(*) AS feature_count
+        FROM {LAND_USE_TABLE} {where}
+        GROUP BY state, landuse
+        ORDER BY state, area_sqm DESC;
+    """, conn, params=params)
+
+def features_in_bbox(conn, bbox, state=None, limit=None):
+    """
+    Polygons intersecting a bbox, geometry as GeoJSON text.
+    Args:
+        bbox (tuple): (minx, miny, maxx, maxy) in EPSG:4326.
+        state (str): Optional state filter.
+        limit (int): Optional row cap.
+    Returns:
+        pd.DataFrame: Columns id, state, landuse, area_sqm, geometry.
+    """
+    minx, miny, maxx, maxy = bbox
+    rtree_sql, params = _rtree_filter(minx, miny, maxx, maxy)
+    sql = f"""
+        SELECT id, state, landuse, area_sqm, AsGeoJSON(geometry) AS geometry
+        FROM {LAND_USE_TABLE}
+        WHERE {rtree_sql}
+          AND Intersects(geometry, BuildMbr(?, ?, ?, ?, {SRID}))
+    """
+    params += [minx, miny, maxx, maxy]
+    if state is not None:
+        sql += " AND state = ?"
+        params.append(state)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return pd.read_sql(sql, conn, params=params)
+
+def features_near_point(conn, lon, lat, radius_m=0.0):
+    """
+    Polygons containing a point, or within radius_m metres of it.
+    Returns:
+        pd.DataFrame: Columns id, state, landuse, area_sqm, distance_m.
+    """
+    # Degree half-widths that cover radius_m at this latitude, for the R*Tree prefilter
+    dy = radius_m / METERS_PER_DEGREE
+    dx = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    rtree_sql, params = _rtree_filter(lon - dx, lat - dy, lon + dx, lat + dy)
+    point_sql = f"MakePoint(?, ?, {SRID})"
+    if radius_m > 0:
+        predicate = f"PtDistWithin(geometry, {point_sql}, ?, 1)"
+        predicate_params = [lon, lat, radius_m]
+    else:
+        predicate = f"Intersects(geometry, {point_sql})"
+        predicate_params = [lon, lat]
+    return pd.read_sql(f"""
+        SELECT id, state, landuse, area_sqm, ST_Distance(geometry, {point_sql}, 1) AS distance_m
+        FROM {LAND_USE_TABLE}
+        WHERE {rtree_sql} AND {predicate}
+        ORDER BY distance_m;
+    """, conn, params=[lon, lat] + params + predicate_params)
+
+def to_feature_collection(df):
+    """Build a GeoJSON FeatureCollection from rows with a GeoJSON-text geometry column."""
+    properties = df.drop(columns=["geometry"]).to_dict(orient="records")
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": json.loads(geometry), "properties": props}
+            for geometry, props in zip(df["geometry"], properties)
+        ]
+    }
@@ -0,0 +1,113 @@
+"""
+Weather feature transform shared by preprocessing and the backend.
+
+WeatherTransform fills missing readings with fixed defaults and min-max scales
+them to [0, 1] with bounds fitted on the training split only, so training
+rows, test rows and readings scored later all go through the same transform.
+It is stored as JSON, so loading it needs neither scikit-learn nor pickle:
+
+    transform = WeatherTransform().fit(train)
+    transform.save()
+    ...
+    transform = WeatherTransform.load()
+    scaled = transform.transform(readings)
+"""
+import json
+import os
+
+import numpy as np
+
+TRANSFORM_PATH = "data/models/weather_transform.json"
+FEATURES = ["temperature", "humidity", "precipitation"]
+FILL_VALUES = {"temperature": 25.0, "humidity": 80.0, "precipitation": 0.0}  # Averages for Nigeria
+BATCH_SIZE = 100000
+
+class WeatherTransform:
+    """Impute-then-min-max-scale transform over the weather feature columns."""
+
+    def __init__(self, columns=FEATURES, fill_values=None, data_min=None, data_max=None):
+        self.columns = list(columns)
+        self.fill_values = {col: float((fill_values or FILL_VALUES)[col]) for col in self.columns}
+        self.data_min = data_min
+        self.data_max = data_max
+
+    @property
+    def fitted(self):
+        return self.data_min is not None and self.data_max is not None
+
+    def _values(self, df):
+        """Feature columns as a float array with missing values filled."""
+        values = df[self.columns].to_numpy(dtype=float, copy=True)
+        fill = np.array([self.fill_values[col] for col in self.columns])
+        missing = np.isnan(values)
+        values[missing] = np.broadcast_to(fill, values.shape)[missing]
+        return values
+
+    def fit(self, df):
+        """
+        Learn per-column bounds from df (the training split).
+        Returns:
+            WeatherTransform: self.
+        """
+        values = self._values(df)
+        self.data_min = dict(zip(self.columns, values.min(axis=0).tolist()))
+        self.data_max = dict(zip(self.columns, values.max(axis=0).tolist()))
+        return self
+
+    def transform(self, df, batch_size=BATCH_SIZE):
+        """
+        Impute and scale the feature columns, batch_size rows at a time.
+        Values outside the fitted bounds map outside [0, 1], as with MinMaxScaler.
+        Args:
+            df (pd.DataFrame): Frame containing the feature columns.
+            batch_size (int): Rows per batch.
+        Returns:
+            pd.DataFrame: Copy of df with the feature columns replaced.
+        Raises:
+            ValueError: If the transform has not been fitted.
+        """
+        if not self.fitted:
+            raise ValueError("WeatherTransform is not fitted; run preprocess_data.py first")
+        data_min = np.array([self.data_min[col] for col in self.columns])
+        span = np.array([self.data_max[col] - self.data_min[col] for col in self.columns])
+        scale = 1.0 / np.where(span == 0, 1.0, span)  # Constant columns map to 0, as with MinMaxScaler
+
+        values = self._values(df)
+        for start in range(0, len(values), batch_size):
+            batch = values[start:start + batch_size]
+            batch -= data_min
+            batch *= scale
+        out = df.copy()
+        out[self.columns] = values
+        return out
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def to_dict(self):
+        return {
+            "columns": self.columns,
+            "fill_values": self.fill_values,
+            "data_min": self.data_min,
+            "data_max": self.data_max
+        }
+
+    def save(self, path=TRANSFORM_PATH):
+        """Write the transform as JSON atomically (tmp file, then rename)."""
+        os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=TRANSFORM_PATH):
+        """
+        Load a saved transform.
+        Raises:
+            FileNotFoundError: If no transform has been saved at path.
+        """
+        with open(path, "r") as f:
+            params = json.load(f)
+        return cls(params["columns"], params["fill_values"], params["data_min"], params["data_max"])
@@ -0,0 +1,109 @@
+"""
+Writes into the weather table.
+
+Rows are unique on (city, timestamp). Writers upsert, so re-running a fetch
+overwrites the readings it already stored instead of duplicating them.
+Timestamps are stored as "%Y-%m-%d %H:%M:%S" text. Databases written before
+that (e.g. with date-only days) are brought to it once by migrate_timestamps,
+run by scripts/preprocessing/migrate_location_names.py, so writers only ever
+pay for CREATE ... IF NOT EXISTS.
+"""
+import pandas as pd
+
+WEATHER_TABLE = "weather"
+WEATHER_INDEX = f"idx_{WEATHER_TABLE}_city_timestamp"
+WEATHER_COLUMNS = ["city", "timestamp", "temperature", "humidity", "precipitation"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMESTAMP_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]"
+# PRAGMA user_version from which the stored timestamps are known to be normalized
+TIMESTAMPS_VERSION = 1
+
+def create_weather_table(conn):
+    """Create the weather table and its (city, timestamp) unique index if missing."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {WEATHER_TABLE} (
+            city TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            temperature REAL,
+            humidity REAL,
+            precipitation REAL
+        );
+    """)
+    conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {WEATHER_INDEX} ON {WEATHER_TABLE} (city, timestamp);")
+    conn.commit()
+
+def migrate_timestamps(conn):
+    """
+    One-time migration: rewrite timestamps not in TIMESTAMP_FORMAT, merge the
+    rows that then share (city, timestamp) into the most recently inserted one
+    (its NULLs filled from older rows, as an upsert would) and rebuild the
+    unique index. Recorded in PRAGMA user_version, so later calls return at once.
+    Returns:
+        int: Timestamps rewritten (0 if already migrated).
+    """
+    if conn.execute("PRAGMA user_version;").fetchone()[0] >= TIMESTAMPS_VERSION:
+        return 0
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (WEATHER_TABLE,)
+    ).fetchone()
+    rewritten = 0
+    if exists:
+        # Normalizing can make rows collide, so the index is rebuilt afterwards
+        conn.execute(f"DROP INDEX IF EXISTS {WEATHER_INDEX};")
+        rewritten = conn.execute(f"""
+            UPDATE {WEATHER_TABLE}
+            SET timestamp = COALESCE(strftime(?, timestamp), timestamp)
+            WHERE timestamp NOT GLOB ?;
+        """, (TIMESTAMP_FORMAT, TIMESTAMP_GLOB)).rowcount
+        merge_duplicates(conn)
+    create_weather_table(conn)
+    conn.execute(f"PRAGMA user_version = {TIMESTAMPS_VERSION};")
+    conn.commit()
+    return rewritten
+
+def merge_duplicates(conn):
+    """
+    Collapse rows sharing (city, timestamp) into the most recently inserted one,
+    taking each value from the newest row where it is not NULL.
+    """
+    latest = f"""
+        SELECT MAX(rowid) FROM {WEATHER_TABLE} GROUP BY city, timestamp HAVING COUNT(*) > 1
+    """
+    newest_value = """
+        (SELECT older.{col} FROM {table} older
+         WHERE older.city = {table}.city AND older.timestamp = {table}.timestamp AND older.{col} IS NOT NULL
+         ORDER BY older.rowid DESC LIMIT 1)
+    """
+    assignments = ", ".join(f"{col} = {newest_value.format(col=col, table=WEATHER_TABLE)}"
+                            for col in ["temperature", "humidity", "precipitation"])
+    conn.execute(f"UPDATE {WEATHER_TABLE} SET {assignments} WHERE rowid IN ({latest});")
+    conn.execute(f"""
+        DELETE FROM {WEATHER_TABLE}
+        WHERE rowid NOT IN (SELECT MAX(rowid) FROM {WEATHER_TABLE} GROUP BY city, timestamp);
+    """)
+
+def upsert_weather(conn, df):
+    """
+    Insert readings, replacing the values of any (city, timestamp) already stored.
+    Missing (NULL) values in the new row keep the stored value.
+    Args:
+        conn: sqlite3 connection.
+        df (pd.DataFrame): Columns city, timestamp and any of temperature, humidity, precipitation.
+    Returns:
+        int: Rows written.
+    """
+    if df.empty:
+        return 0
+    rows = df.reindex(columns=WEATHER_COLUMNS).copy()
+    rows["timestamp"] = pd.to_datetime(rows["timestamp"], format="ISO8601").dt.strftime(TIMESTAMP_FORMAT)
+    rows = rows.astype(object).where(rows.notna(), None)
+    conn.executemany(f"""
+        INSERT INTO {WEATHER_TABLE} (city, timestamp, temperature, humidity, precipitation)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (city, timestamp) DO UPDATE SET
+            temperature = COALESCE(excluded.temperature, temperature),
+            humidity = COALESCE(excluded.humidity, humidity),
+            precipitation = COALESCE(excluded.precipitation, precipitation);
+    """, rows.itertuples(index=False, name=None))
+    conn.commit()
+    return len(rows)
@@ -1,62 +1,24 @@
 import xarray as xr
 import pandas as pd
+import argparse
+import logging
 import os
-import traceback
 import numpy as np
+import sys
+from pathlib import Path
 
-# Define cities and coordinates
-cities = [
-    {"name": "Lagos", "lat": 6.5244, "lon": 3.3792},
-    {"name": "Rivers", "lat": 4.8156, "lon": 7.0498},
-    {"name": "Benue", "lat": 7.7322, "lon": 8.5391},
-    {"name": "Bayelsa", "lat": 4.9211, "lon": 6.2642}
-]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, locations, log  # noqa: E402
 
-# File paths
-accum_file = "data/data_stream-oper_stepType-accum.nc"
-instant_file = "data/data_stream-oper_stepType-instant.nc"
-
-# Validate files
-for file in [accum_file, instant_file]:
-    if not os.path.exists(file):
-        print(f"Error: {file} does not exist. Extract zip to data/")
-        exit(1)
-    file_size = os.path.getsize(file)
-    if file_size < 10 * 1024 * 1024:  # Less than 10 MB
-        print(f"Error: {file} is too small ({file_size / 1024 / 1024:.2f} MB), likely corrupted")
-        # exit(1)
-    print(f"File size for {file}: {file_size / 1024 / 1024:.2f} MB")
+logger = logging.getLogger("fetch_era5_weather")
 
-# Process NetCDF
-try:
-    for engine in ["netcdf4", "h5netcdf"]:
-        try:
-            ds_accum = xr.open_dataset(accum_file, engine=engine)
-            ds_instant = xr.open_dataset(instant_file, engine=engine)
-            print(f"Opened NetCDF files with {engine} backend")
-            break
-        except Exception as e:
-            print(f"Failed with {engine}: {e}")
-            if engine == "h5netcdf":
-                print(traceback.format_exc())
-                exit(1)
-except Exception as e:
-    print(f"Error opening NetCDF files: {e}")
-    print(traceback.format_exc())
-    exit(1)
+# Each registered state, at its reference city
+cities = [{"name": location["name"], **location["centroid"]} for location in locations.all_locations()]
 
-# Validate variables
-required_vars = {"accum": ["tp"], "instant": ["t2m", "d2m"]}
-try:
-    for var in required_vars["accum"]:
-        if var not in ds_accum.variables:
-            raise KeyError(f"Missing variable '{var}' in {accum_file}")
-    for var in required_vars["instant"]:
-        if var not in ds_instant.variables:
-            raise KeyError(f"Missing variable '{var}' in {instant_file}")
-except KeyError as e:
-    print(f"Error: {e}")
-    exit(1)
+# File paths
+ACCUM_FILE = "data/data_stream-oper_stepType-accum.nc"
+INSTANT_FILE = "data/data_stream-oper_stepType-instant.nc"
+OUTPUT_FILE = "data/raw_weather_historical.csv"
 
 # Calculate relative humidity from t2m and d2m
 def calculate_rh(t2m, d2m):
@@ -68,37 +30,102 @@ def calculate_rh(t2m, d2m):
     rh = 100 * (e / es)
     return np.clip(rh, 0, 100)
 
-try:
-    data = []
-    for city in cities:
-        accum_data = ds_accum.sel(
-            latitude=city["lat"],
-            longitude=city["lon"],
-            method="nearest"
-        )
-        instant_data = ds_instant.sel(
-            latitude=city["lat"],
-            longitude=city["lon"],
-            method="nearest"
-        )
-        # Ensure time alignment
-        time = instant_data["valid_time"].values
-        df = pd.DataFrame({
-            "city": city["name"],
-            "timestamp": time,
-            "temperature": instant_data["t2m"].values - 273.15,  # Kelvin to Celsius
-            "precipitation": accum_data["tp"].values * 1000,  # m to mm
-            "humidity": calculate_rh(instant_data["t2m"].values, instant_data["d2m"].values)
-        })
-        data.append(df)
-    ds_accum.close()
-    ds_instant.close()
-except Exception as e:
-    print(f"Error extracting city data: {e}")
-    print(traceback.format_exc())
-    exit(1)
+def open_datasets(accum_file, instant_file):
+    """
+    Validate the ERA5 downloads and open them with the first backend that works.
+    Returns:
+        tuple: (accumulated dataset, instantaneous dataset).
+    """
+    # Validate files
+    for file in [accum_file, instant_file]:
+        if not os.path.exists(file):
+            logger.error("%s does not exist. Extract zip to data/", file)
+            sys.exit(1)
+        file_size = os.path.getsize(file)
+        if file_size < 10 * 1024 * 1024:  # Less than 10 MB
+            logger.error("%s is too small (%.2f MB), likely corrupted", file, file_size / 1024 / 1024)
+            # sys.exit(1)
+        logger.info("File size for %s: %.2f MB", file, file_size / 1024 / 1024)
+
+    # Process NetCDF
+    try:
+        for engine in ["netcdf4", "h5netcdf"]:
+            try:
+                ds_accum = xr.open_dataset(accum_file, engine=engine)
+                ds_instant = xr.open_dataset(instant_file, engine=engine)
+                logger.info("Opened NetCDF files with %s backend", engine)
+                break
+            except Exception as e:
+                logger.warning("Failed with %s: %s", engine, e)
+                if engine == "h5netcdf":
+                    logger.exception("No NetCDF backend could open the files")
+                    sys.exit(1)
+    except Exception as e:
+        logger.exception("Error opening NetCDF files: %s", e)
+        sys.exit(1)
+
+    # Validate variables
+    required_vars = {"accum": ["tp"], "instant": ["t2m", "d2m"]}
+    try:
+        for var in required_vars["accum"]:
+            if var not in ds_accum.variables:
+                raise KeyError(f"Missing variable '{var}' in {accum_file}")
+        for var in required_vars["instant"]:
+            if var not in ds_instant.variables:
+                raise KeyError(f"Missing variable '{var}' in {instant_file}")
+    except KeyError as e:
+        logger.error("Error: %s", e)
+        sys.exit(1)
+    return ds_accum, ds_instant
+
+def fetch_era5_weather(accum_file=ACCUM_FILE, instant_file=INSTANT_FILE, output_file=OUTPUT_FILE):
+    """
+    Extract the ERA5 series at each registered city and save them to output_file.
+    """
+    with instrumentation.span("load"):
+        ds_accum, ds_instant = open_datasets(accum_file, instant_file)
+
+    try:
+        data = []
+        for city in cities:
+            accum_data = ds_accum.sel(
+                latitude=city["lat"],
+                longitude=city["lon"],
+                method="nearest"
+            )
+            instant_data = ds_instant.sel(
+                latitude=city["lat"],
+                longitude=city["lon"],
+                method="nearest"
+            )
+            # Ensure time alignment
+            time = instant_data["valid_time"].values
+            df = pd.DataFrame({
+                "city": city["name"],
+                "timestamp": time,
+                "temperature": instant_data["t2m"].values - 273.15,  # Kelvin to Celsius
+                "precipitation": accum_data["tp"].values * 1000,  # m to mm
+                "humidity": calculate_rh(instant_data["t2m"].values, instant_data["d2m"].values)
+            })
+            data.append(df)
+        ds_accum.close()
+        ds_instant.close()
+    except Exception as e:
+        logger.exception("Error extracting city data: %s", e)
+        sys.exit(1)
+
+    # Combine and save
+    with instrumentation.span("write") as span:
+        weather_df = pd.concat(data, ignore_index=True)
+        weather_df.to_csv(output_file, index=False)
+        span["rows"] = len(weather_df)
+    logger.info("Historical weather saved to %s: %d records", output_file, len(weather_df))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract ERA5 weather at each registered city to CSV.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
 
-# Combine and save
-weather_df = pd.concat(data, ignore_index=True)
-weather_df.to_csv("data/raw_weather_historical.csv", index=False)
-print(f"Historical weather saved to data/raw_weather_historical.csv: {len(weather_df)} records")
+    instrumentation.run(fetch_era5_weather, args, "fetch_era5_weather", output=OUTPUT_FILE)
@@ -1,70 +1,182 @@
 import pandas as pd
 from meteostat import Stations, Daily
 from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tenacity import retry, stop_after_attempt, wait_fixed
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from pathlib import Path
 
-# Define cities and coordinates
-cities = [
-    {"name": "Lagos", "lat": 6.5244, "lon": 3.3792},
-    {"name": "Rivers", "lat": 4.8156, "lon": 7.0498},  # Port Harcourt
-    {"name": "Benue", "lat": 7.7322, "lon": 8.5391},  # Makurdi
-    {"name": "Bayelsa", "lat": 4.9211, "lon": 6.2642}  # Yenagoa
-]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, locations, log, weather_store  # noqa: E402
 
-# Date range: 2014–2023
-start_date = datetime(2014, 1, 1)
-end_date = datetime(2023, 12, 31)
+logger = logging.getLogger("fetch_historical_weather")
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
-def fetch_station_data(station_id, city_name):
-    weather = Daily(station_id, start_date, end_date)
-    return weather.fetch()
+DB_PATH = "data/flood_data.db"
+CACHE_DIR = "data/cache/meteostat"
+STATIONS_CACHE = os.path.join(CACHE_DIR, "stations.json")
+CHECKPOINT_PATH = os.path.join(CACHE_DIR, "checkpoint.json")
+MAX_STATION_DISTANCE_M = 50000  # meteostat reports distance in metres
+CANDIDATE_STATIONS = 10
+
+# Each registered state, at its reference city
+cities = [{"name": location["name"], **location["centroid"]} for location in locations.all_locations()]
+
+# Year range: 2014–2023
+START_YEAR = 2014
+END_YEAR = 2023
 
-data = []
-used_stations = set()
-for city in cities:
-    # Find up to 10 nearby stations
-    stations = Stations()
-    stations = stations.nearby(city["lat"], city["lon"]).fetch(10)
-    if stations.empty:
-        print(f"No stations found for {city['name']}")
-        continue
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r") as f:
+        return json.load(f)
 
-    # Filter stations within 50 km
-    stations = stations[stations["distance"] <= 50]
-    if stations.empty:
-        print(f"No stations within 50 km for {city['name']}")
-        continue
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def candidate_stations(cities):
+    """
+    Stations within MAX_STATION_DISTANCE_M of each city, nearest first, cached on disk
+    by coordinates. Neighbouring cities can share candidates; fetch_year keeps a
+    station from serving two cities in the same year.
+    Returns:
+        dict: city name -> list of station ids.
+    """
+    cache = load_json(STATIONS_CACHE, {})
+    candidates = {}
+    for city in cities:
+        key = f"{city['lat']:.4f},{city['lon']:.4f}"
+        if key not in cache:
+            stations = Stations().nearby(city["lat"], city["lon"]).fetch(CANDIDATE_STATIONS)
+            stations = stations[stations["distance"] <= MAX_STATION_DISTANCE_M]
+            cache[key] = [str(station_id) for station_id in stations.index]
+            save_json(STATIONS_CACHE, cache)
+        candidates[city["name"]] = cache[key]
+        if not candidates[city["name"]]:
+            logger.warning("No stations within %.0f km for %s", MAX_STATION_DISTANCE_M / 1000, city["name"])
+    return candidates
+
+@retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
+def fetch_station_year(station_id, year):
+    return Daily(station_id, datetime(year, 1, 1), datetime(year, 12, 31)).fetch()
 
-    for station_id, station in stations.iterrows():
-        if station_id in used_stations:
-            print(f"Skipping station {station_id} for {city['name']} (already used)")
+def fetch_chunk(city_name, year, stations):
+    """
+    One year of daily weather for a city, from the nearest candidate station with data.
+    Returns:
+        tuple: (station id or None, DataFrame with weather_store columns).
+    """
+    for station_id in stations:
+        weather = fetch_station_year(station_id, year)
+        if weather.empty:
             continue
-        print(f"Trying station {station_id} for {city['name']} (distance: {station['distance']:.1f} km)")
+        available_cols = [col for col in ["tavg", "prcp", "rhum"] if col in weather.columns]
+        weather = weather[available_cols].rename(
+            columns={"tavg": "temperature", "prcp": "precipitation", "rhum": "humidity"}
+        )
+        weather["city"] = city_name
+        weather["timestamp"] = weather.index
+        return station_id, weather.reset_index(drop=True)
+    return None, pd.DataFrame(columns=weather_store.WEATHER_COLUMNS)
+
+def fetch_year(year, city_names, candidates, used_stations):
+    """
+    One year for several cities, in registry order. A station that served an
+    earlier city this year (here or in a checkpointed run) is skipped, so two
+    cities never store the same station's readings; a city that ends up with
+    no data or fails does not hold on to any station.
+    Args:
+        used_stations (set): Stations already used for this year.
+    Returns:
+        list: (city name, station id or None, DataFrame or None, exception or None) per city.
+    """
+    used_stations = set(used_stations)
+    results = []
+    for name in city_names:
+        stations = [station for station in candidates[name] if station not in used_stations]
         try:
-            weather = fetch_station_data(station_id, city["name"])
-            if not weather.empty:
-                weather["city"] = city["name"]
-                weather["timestamp"] = weather.index
-                available_cols = [col for col in ["tavg", "prcp", "rhum"] if col in weather.columns]
-                weather = weather[["city", "timestamp"] + available_cols]
-                weather.columns = ["city", "timestamp"] + [
-                    {"tavg": "temperature", "prcp": "precipitation", "rhum": "humidity"}[col] for col in available_cols
-                ]
-                data.append(weather)
-                used_stations.add(station_id)
-                print(f"Fetched {len(weather)} records for {city['name']} from station {station_id}")
-                break
-            else:
-                print(f"No data for {city['name']} from station {station_id}")
+            station_id, weather = fetch_chunk(name, year, stations)
         except Exception as e:
-            print(f"Error fetching data for {city['name']} from station {station_id}: {e}")
+            results.append((name, None, None, e))
+            continue
+        if station_id is not None:
+            used_stations.add(station_id)
+        results.append((name, station_id, weather, None))
+    return results
+
+def backfill(cities, start_year=START_YEAR, end_year=END_YEAR, workers=4, db_path=DB_PATH):
+    """
+    Fetch missing (city, year) chunks, one year per worker, and upsert each into
+    the weather table as it finishes. Chunks that returned data are checkpointed,
+    so an interrupted run resumes where it stopped and new cities only fetch their
+    own years; empty and failed chunks are tried again next run.
+    """
+    checkpoint = load_json(CHECKPOINT_PATH, {})
+    candidates = candidate_stations(cities)
+    current_year = datetime.now().year
+    tasks = {}
+    for year in range(start_year, end_year + 1):
+        missing = [city["name"] for city in cities
+                   if candidates[city["name"]] and f"{city['name']}|{year}" not in checkpoint]
+        if missing:
+            tasks[year] = missing
+    logger.info("Chunks to fetch: %d (%d already checkpointed)", sum(map(len, tasks.values())), len(checkpoint))
+
+    conn = sqlite3.connect(db_path)
+    weather_store.create_weather_table(conn)
+    written, failed, empty = 0, 0, 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for year, city_names in tasks.items():
+                used_stations = {entry["station"] for key, entry in checkpoint.items() if key.endswith(f"|{year}")}
+                futures[pool.submit(fetch_year, year, city_names, candidates, used_stations)] = year
+            for future in as_completed(futures):
+                year = futures[future]
+                for name, station_id, weather, error in future.result():
+                    if error is not None:
+                        failed += 1
+                        logger.error("Error fetching %s %d: %s", name, year, error)
+                        continue
+                    if station_id is None:
+                        empty += 1
+                        logger.warning("No station data for %s %d", name, year)
+                        continue
+                    with instrumentation.span("write") as span:
+                        rows = weather_store.upsert_weather(conn, weather)
+                        span["rows"] = rows
+                    written += rows
+                    # The current year is still growing; fetch it again next run
+                    if year < current_year:
+                        checkpoint[f"{name}|{year}"] = {"station": station_id, "rows": rows}
+                        save_json(CHECKPOINT_PATH, checkpoint)
+                    logger.debug("Fetched %d records for %s %d from station %s", rows, name, year, station_id)
+    finally:
+        conn.close()
+    logger.info("Historical weather: %d records written to weather, %d chunks empty, %d chunks failed",
+                written, empty, failed)
+    return failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill daily historical weather into the weather table.")
+    parser.add_argument("--start-year", type=int, default=START_YEAR)
+    parser.add_argument("--end-year", type=int, default=END_YEAR)
+    parser.add_argument("--workers", type=int, default=4)
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
 
-# Combine and save
-if data:
-    weather_df = pd.concat(data, ignore_index=True)
-    weather_df.to_csv("data/raw_weather_historical.csv", index=False)
-    print(f"Historical weather saved to flood-system/data/raw_weather_historical.csv: {len(weather_df)} records")
-else:
-    print("No historical weather data fetched")
\ No newline at end of file
+    failed = instrumentation.run(lambda: backfill(cities, args.start_year, args.end_year, args.workers),
+                                 args, "fetch_historical_weather", output="db:weather")
+    if failed:
+        sys.exit(1)
@@ -1,47 +1,114 @@
 import requests
 import pandas as pd
 from dotenv import load_dotenv
+import argparse
+import logging
 import os
-from datetime import datetime
+import sqlite3
+import sys
 import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, locations, log, weather_store  # noqa: E402
+
+logger = logging.getLogger("fetch_realtime_weather")
 
 load_dotenv()
-api_key = os.getenv("OPENWEATHERMAP_API_KEY")
-if not api_key:
-    print("Error: OPENWEATHERMAP_API_KEY not set in .env")
-    exit(1)
 
+DB_PATH = "data/flood_data.db"
+ARCHIVE_DIR = "data/archive/realtime_weather"
+
+# OpenWeatherMap query and stored state name of each registered state
 cities = [
-    {"api_name": "Lagos,NG", "db_name": "Lagos"},
-    {"api_name": "Port Harcourt,NG", "db_name": "Rivers"},
-    {"api_name": "Makurdi,NG", "db_name": "Benue"},
-    {"api_name": "Yenagoa,NG", "db_name": "Bayelsa"}
+    {"api_name": location["weather_query"], "db_name": location["name"]} for location in locations.all_locations()
 ]
 
-data = []
-for city in cities:
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city['api_name']}&appid={api_key}&units=metric"
+def fetch_current_weather(session, api_key, cities=cities):
+    """
+    Current conditions for each city.
+    The timestamp is the observation time reported by the API (UTC), so polling
+    twice before the next observation yields the same (city, timestamp) key.
+    Returns:
+        pd.DataFrame: weather_store columns.
+    """
+    data = []
+    for city in cities:
+        url = f"http://api.openweathermap.org/data/2.5/weather?q={city['api_name']}&appid={api_key}&units=metric"
+        try:
+            response = session.get(url, timeout=10)
+            response.raise_for_status()
+            json_data = response.json()
+            data.append({
+                "city": city["db_name"],
+                "timestamp": pd.Timestamp(json_data["dt"], unit="s"),
+                "temperature": json_data["main"]["temp"],
+                "humidity": json_data["main"]["humidity"],
+                "precipitation": json_data.get("rain", {}).get("1h", 0)
+            })
+            logger.debug("Fetched real-time data for %s", city["db_name"])
+        except requests.RequestException as e:
+            logger.error("Error fetching data for %s: %s", city['api_name'], e)
+        time.sleep(1)
+    return pd.DataFrame(data, columns=weather_store.WEATHER_COLUMNS)
+
+def archive_readings(df, archive_format, archive_dir=ARCHIVE_DIR):
+    """
+    Append readings to a monthly archive without reading what is already there.
+    CSV appends to {archive_dir}/YYYY-MM.csv; Parquet writes one part file per
+    poll under {archive_dir}/YYYY-MM/.
+    Returns:
+        str: Path written.
+    """
+    now = pd.Timestamp.now(tz="UTC")
+    if archive_format == "csv":
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{now:%Y-%m}.csv")
+        df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    else:
+        month_dir = os.path.join(archive_dir, f"{now:%Y-%m}")
+        os.makedirs(month_dir, exist_ok=True)
+        path = os.path.join(month_dir, f"part-{now:%Y%m%dT%H%M%S%f}.parquet")
+        df.to_parquet(path, index=False)
+    return path
+
+def ingest(df, db_path=DB_PATH):
+    """Upsert readings into the weather table. Returns rows written."""
+    conn = sqlite3.connect(db_path)
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        json_data = response.json()
-        data.append({
-            "city": city["db_name"],
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "temperature": json_data["main"]["temp"],
-            "humidity": json_data["main"]["humidity"],
-            "precipitation": json_data.get("rain", {}).get("1h", 0)
-        })
-        print(f"Fetched real-time data for {city['db_name']}")
-    except requests.RequestException as e:
-        print(f"Error fetching data for {city['api_name']}: {e}")
-    time.sleep(1)
-
-# Append to CSV
-weather_df = pd.DataFrame(data)
-output_file = "data/raw_weather_realtime.csv"
-if os.path.exists(output_file):
-    existing_df = pd.read_csv(output_file)
-    weather_df = pd.concat([existing_df, weather_df], ignore_index=True)
-weather_df.to_csv(output_file, index=False)
-print(f"Real-time weather appended to {output_file}: {len(weather_df)} records")
+        weather_store.create_weather_table(conn)
+        return weather_store.upsert_weather(conn, df)
+    finally:
+        conn.close()
+
+def poll(api_key, archive_format=None):
+    """Fetch one round of readings, upsert them and optionally archive them."""
+    with instrumentation.span("fetch") as span, requests.Session() as session:
+        weather_df = fetch_current_weather(session, api_key)
+        span["rows"] = len(weather_df)
+    if weather_df.empty:
+        logger.error("No real-time weather data fetched")
+        sys.exit(1)
+
+    with instrumentation.span("write") as span:
+        written = ingest(weather_df)
+        span["rows"] = written
+    logger.info("Real-time weather upserted into weather: %s records", written)
+    if archive_format:
+        logger.info("Archived to %s", archive_readings(weather_df, archive_format))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll current weather into the weather table.")
+    parser.add_argument("--archive", choices=["csv", "parquet"], default=None,
+                        help="Also append readings to a monthly archive under " + ARCHIVE_DIR)
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    api_key = os.getenv("OPENWEATHERMAP_API_KEY")
+    if not api_key:
+        logger.error("OPENWEATHERMAP_API_KEY not set in .env")
+        exit(1)
+
+    instrumentation.run(lambda: poll(api_key, args.archive), args, "fetch_realtime_weather", output="db:weather")
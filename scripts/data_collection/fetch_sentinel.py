@@ -1,51 +1,218 @@
 import ee
 import pandas as pd
 from datetime import datetime, timedelta
-from decouple import config
-
-# Initialize with project ID
-try:
-    ee.Initialize(project=config("GOOGLE_EARTH_ENGINE_PROJECT_ID"))  
-except Exception as e:
-    print(f"Earth Engine initialization error: {e}")
-    print("Run 'earthengine authenticate' if not authenticated.")
-    exit(1)
-
-# Define regions (bounding boxes for state capitals)
-regions = {
-    "Lagos": ee.Geometry.Rectangle([3.1, 6.4, 3.5, 6.7]),
-    "Port Harcourt": ee.Geometry.Rectangle([6.9, 4.7, 7.1, 4.9]),
-    "Makurdi": ee.Geometry.Rectangle([8.4, 7.6, 8.6, 7.8]),
-    "Yenagoa": ee.Geometry.Rectangle([6.2, 4.8, 6.4, 5.0])
-}
-
-# Fetch Sentinel-1 data (last 7 days)
-end_date = datetime.now()
-start_date = end_date - timedelta(days=7)
-data = []
-
-for region_name, region in regions.items():
+from concurrent.futures import ThreadPoolExecutor
+from tenacity import retry, stop_after_attempt, wait_fixed
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, locations, log  # noqa: E402
+
+logger = logging.getLogger("fetch_sentinel")
+
+DB_PATH = "data/flood_data.db"
+CSV_PATH = "data/sentinel_metadata.csv"
+CACHE_DIR = "data/cache/sentinel"
+CHUNK_DAYS = 90
+# One scene can cover several search boxes and is stored once per region
+IMAGE_KEY = ["image_id", "region"]
+
+# Search boxes around each registered state's reference city, keyed by state name
+REGIONS = {location["name"]: location["bbox"] for location in locations.all_locations()}
+
+def initialize():
+    """Initialize Earth Engine with the project ID from the environment."""
+    from decouple import config
+    ee.Initialize(project=config("GOOGLE_EARTH_ENGINE_PROJECT_ID"))
+
+def date_chunks(start_date, end_date, chunk_days=CHUNK_DAYS):
+    """
+    Split [start_date, end_date) into consecutive ranges of at most chunk_days.
+    Returns:
+        list: (start, end) datetime pairs.
+    """
+    chunks = []
+    chunk_start = start_date
+    while chunk_start < end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), end_date)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    return chunks
+
+def cache_path(region_name, start, end):
+    """Cache file for one (region, date range) response."""
+    slug = region_name.lower().replace(" ", "_")
+    return os.path.join(CACHE_DIR, f"{slug}_{start:%Y%m%d}_{end:%Y%m%d}.json")
+
+@retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
+def query_image_metadata(bbox, start, end):
+    """
+    All Sentinel-1 IW image ids and start times over bbox in [start, end), in one
+    server-side reduction and a single getInfo round trip.
+    Returns:
+        list: [image_id, time_start_ms] pairs.
+    """
+    collection = (ee.ImageCollection('COPERNICUS/S1_GRD')
+                  .filterBounds(ee.Geometry.Rectangle(bbox))
+                  .filterDate(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+                  .filter(ee.Filter.eq('instrumentMode', 'IW')))
+    reduced = collection.reduceColumns(ee.Reducer.toList(2), ["system:id", "system:time_start"])
+    return reduced.get("list").getInfo()
+
+def fetch_region_range(region_name, bbox, start, end, use_cache=True):
+    """
+    Image metadata for one region and date range, served from the disk cache when possible.
+    Only ranges that ended before today are cached, so recent ranges are always refetched.
+    Returns:
+        tuple: (list of metadata dicts, True if served from cache).
+    """
+    path = cache_path(region_name, start, end)
+    if use_cache and os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f), True
+
+    pairs = query_image_metadata(bbox, start, end)
+    records = [{"image_id": image_id, "date": time_start, "region": region_name} for image_id, time_start in pairs]
+    if use_cache and end.date() < datetime.now().date():
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(records, f)
+        os.replace(tmp_path, path)
+    return records, False
+
+def fetch_metadata(start_date, end_date, regions=REGIONS, workers=4, chunk_days=CHUNK_DAYS, use_cache=True):
+    """
+    Fetch image metadata for every region and date chunk concurrently.
+    Args:
+        start_date (datetime): Range start (inclusive).
+        end_date (datetime): Range end (exclusive).
+        regions (dict): Region name -> [minx, miny, maxx, maxy].
+        workers (int): Concurrent Earth Engine requests.
+        chunk_days (int): Days per request and cache entry.
+        use_cache (bool): Read and write the disk cache.
+    Returns:
+        pd.DataFrame: image_id, date (ms), region, deduplicated on (image_id, region);
+            a scene covering several search boxes is kept once per region.
+    """
+    tasks = [(name, bbox, start, end) for name, bbox in regions.items()
+             for start, end in date_chunks(start_date, end_date, chunk_days)]
+    records, cached, failed = [], 0, 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(task, pool.submit(fetch_region_range, *task, use_cache)) for task in tasks]
+        for (name, _, start, end), future in futures:
+            try:
+                chunk_records, from_cache = future.result()
+                records.extend(chunk_records)
+                cached += from_cache
+            except Exception as e:
+                failed += 1
+                logger.error("Error fetching Sentinel-1 data for %s %s..%s: %s",
+                             name, format(start, "%Y-%m-%d"), format(end, "%Y-%m-%d"), e)
+    logger.info("Requests: %s (%s cached, %s failed), images: %s", len(tasks), cached, failed, len(records))
+    df = pd.DataFrame(records, columns=["image_id", "date", "region"])
+    return df.drop_duplicates(subset=IMAGE_KEY, ignore_index=True)
+
+def create_sentinel_table(conn):
+    """
+    Create sentinel_metadata keyed on (image_id, region) if missing.
+    A table keyed on image_id alone, which would reject the second region of a
+    scene covering two search boxes, is rebuilt with the composite key.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sentinel_metadata (
+            image_id TEXT NOT NULL,
+            date INTEGER,
+            region TEXT NOT NULL,
+            PRIMARY KEY (image_id, region)
+        );
+    """)
+    key = [row[1] for row in sorted(conn.execute("PRAGMA table_info(sentinel_metadata);"), key=lambda row: row[5])
+           if row[5]]
+    if key == ["image_id"]:
+        conn.executescript("""
+            ALTER TABLE sentinel_metadata RENAME TO sentinel_metadata_old;
+            CREATE TABLE sentinel_metadata (
+                image_id TEXT NOT NULL,
+                date INTEGER,
+                region TEXT NOT NULL,
+                PRIMARY KEY (image_id, region)
+            );
+            INSERT INTO sentinel_metadata (image_id, date, region)
+                SELECT image_id, date, region FROM sentinel_metadata_old WHERE region IS NOT NULL;
+            DROP TABLE sentinel_metadata_old;
+        """)
+
+def append_new_images(df, db_path=DB_PATH, csv_path=CSV_PATH):
+    """
+    Append images whose (image_id, region) is not yet in sentinel_metadata to the table and CSV.
+    Returns:
+        int: Rows appended.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        create_sentinel_table(conn)
+        seen = set(conn.execute("SELECT image_id, region FROM sentinel_metadata;"))
+        new = df[~pd.MultiIndex.from_frame(df[IMAGE_KEY]).isin(seen)]
+        conn.executemany(
+            "INSERT INTO sentinel_metadata (image_id, date, region) VALUES (?, ?, ?);",
+            new[["image_id", "date", "region"]].itertuples(index=False, name=None)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    if not new.empty:
+        new.to_csv(csv_path, mode="a", header=not os.path.exists(csv_path), index=False)
+    return len(new)
+
+def fetch_and_append(start_date, end_date, workers=4, chunk_days=CHUNK_DAYS, use_cache=True):
+    """Fetch metadata for a date range and append the unseen images."""
+    with instrumentation.span("fetch") as span:
+        data = fetch_metadata(start_date, end_date, workers=workers, chunk_days=chunk_days, use_cache=use_cache)
+        span["rows"] = len(data)
+    if data.empty:
+        logger.warning("No Sentinel-1 data collected.")
+        return
+    with instrumentation.span("write") as span:
+        appended = append_new_images(data)
+        span["rows"] = appended
+    logger.info("Sentinel-1 metadata: %s images fetched, %s new appended to sentinel_metadata and %s",
+                len(data), appended, CSV_PATH)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch Sentinel-1 image metadata from Earth Engine.")
+    parser.add_argument("--backfill", action="store_true", help="Fetch --start..--end instead of the last 7 days")
+    parser.add_argument("--start", default="2015-01-01", help="Backfill start date (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="Backfill end date, exclusive (default: today)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-days", type=int, default=CHUNK_DAYS)
+    parser.add_argument("--no-cache", action="store_true")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    # Initialize with project ID
     try:
-        collection = (ee.ImageCollection('COPERNICUS/S1_GRD')
-                      .filterBounds(region)
-                      .filterDate(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                      .filter(ee.Filter.eq('instrumentMode', 'IW')))
-        image = collection.first()
-        if not image:
-            print(f"No Sentinel-1 images found for {region_name}")
-            continue
-        metadata = {
-            "image_id": image.get("system:id").getInfo(),
-            "date": image.get("system:time_start").getInfo(),
-            "region": region_name
-        }
-        data.append(metadata)
+        initialize()
     except Exception as e:
-        print(f"Error fetching Sentinel-1 data for {region_name}: {e}")
-
-# Save to CSV
-if data:
-    pd.DataFrame(data).to_csv("data/sentinel_metadata.csv", index=False)
-    print("Sentinel-1 metadata saved to flood-system/data/sentinel_metadata.csv")
-else:
-    print("No Sentinel-1 data collected.")
\ No newline at end of file
+        logger.error("Earth Engine initialization error: %s", e)
+        logger.error("Run 'earthengine authenticate' if not authenticated.")
+        exit(1)
+
+    end_date = datetime.strptime(args.end, "%Y-%m-%d") if args.end else datetime.now()
+    if args.backfill:
+        start_date = datetime.strptime(args.start, "%Y-%m-%d")
+    else:
+        start_date = end_date - timedelta(days=7)
+
+    instrumentation.run(lambda: fetch_and_append(start_date, end_date, args.workers, args.chunk_days,
+                                                 not args.no_cache),
+                        args, "fetch_sentinel", output="db:sentinel_metadata")
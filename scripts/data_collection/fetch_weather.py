@@ -1,30 +1,56 @@
 import requests
 import pandas as pd
 from dotenv import load_dotenv
+import argparse
+import logging
 import os
 from datetime import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, locations, log  # noqa: E402
+
+logger = logging.getLogger("fetch_weather")
 
 load_dotenv()
-api_key = os.getenv("OPENWEATHERMAP_API_KEY")
-cities = ["Lagos,NG", "Port Harcourt,NG", "Makurdi,NG", "Yenagoa,NG"]
-
-data = []
-for city in cities:
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        json_data = response.json()
-        data.append({
-            "city": city.split(",")[0],
-            "timestamp": datetime.now(),
-            "temperature": json_data["main"]["temp"],
-            "humidity": json_data["main"]["humidity"],
-            "precipitation": json_data.get("rain", {}).get("1h", 0)
-        })
-    except requests.RequestException as e:
-        print(f"Error fetching data for {city}: {e}")
-
-weather_df = pd.DataFrame(data)
-weather_df.to_csv("data/raw_weather.csv", index=False)
-print("Weather data saved to flood-system/data/raw_weather.csv")
\ No newline at end of file
+
+OUTPUT_FILE = "data/raw_weather.csv"
+
+def fetch_weather(api_key, output_file=OUTPUT_FILE):
+    """
+    Current weather for each registered location, saved to output_file.
+    """
+    data = []
+    with instrumentation.span("fetch") as span:
+        for city in locations.all_locations():
+            url = f"http://api.openweathermap.org/data/2.5/weather?q={city['weather_query']}&appid={api_key}&units=metric"
+            try:
+                response = requests.get(url)
+                response.raise_for_status()
+                json_data = response.json()
+                data.append({
+                    "city": city["name"],
+                    "timestamp": datetime.now(),
+                    "temperature": json_data["main"]["temp"],
+                    "humidity": json_data["main"]["humidity"],
+                    "precipitation": json_data.get("rain", {}).get("1h", 0)
+                })
+            except requests.RequestException as e:
+                logger.error("Error fetching data for %s: %s", city["weather_query"], e)
+        span["rows"] = len(data)
+
+    with instrumentation.span("write"):
+        weather_df = pd.DataFrame(data)
+        weather_df.to_csv(output_file, index=False)
+    logger.info("Weather data saved to %s: %d records", output_file, len(weather_df))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Save current weather for each registered location to CSV.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    instrumentation.run(lambda: fetch_weather(os.getenv("OPENWEATHERMAP_API_KEY")), args, "fetch_weather",
+                        output=OUTPUT_FILE)
@@ -0,0 +1,149 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, landuse_store, log, schemas  # noqa: E402
+
+logger = logging.getLogger("extract_flood_exposure")
+
+# One metric CRS for the whole country (UTM 32N, central meridian 9°E) so a single tree covers every state
+METRIC_CRS = "EPSG:32632"
+DEFAULT_BUFFER_M = 500.0
+EVENT_BATCH_SIZE = 5000
+
+def load_landuse_polygons(states=None):
+    """
+    Load land use polygons for several states from the store, projected to METRIC_CRS.
+    Args:
+        states (list): Lower-case state names; defaults to every state in the store.
+    Returns:
+        gpd.GeoDataFrame: Columns landuse, geometry.
+    """
+    if states is None:
+        states = landuse_store.available_states()
+    layers = [landuse_store.read_state(state, columns=["landuse"]) for state in states]
+    if not layers:
+        return gpd.GeoDataFrame({"landuse": []}, geometry=[], crs=METRIC_CRS)
+    gdf = pd.concat(layers, ignore_index=True)
+    return gpd.GeoDataFrame(gdf, geometry="geometry").to_crs(METRIC_CRS)
+
+def compute_exposure(longitudes, latitudes, landuse_gdf, buffer_m=DEFAULT_BUFFER_M, batch_size=EVENT_BATCH_SIZE):
+    """
+    Land use exposure of each flood point, computed in one vectorized STRtree pass.
+    For every event: the class of the polygon containing the point, and per class the
+    number of polygons and the polygon area within buffer_m metres.
+    Args:
+        longitudes (array-like): Event longitudes (EPSG:4326).
+        latitudes (array-like): Event latitudes (EPSG:4326).
+        landuse_gdf (gpd.GeoDataFrame): Polygons in METRIC_CRS with a landuse column.
+        buffer_m (float): Buffer radius in metres.
+        batch_size (int): Events per intersection batch.
+    Returns:
+        pd.DataFrame: One row per event (same order), columns landuse_at_point,
+            exposure_<class>_sqm and exposure_<class>_count for every class in
+            landuse_gdf (zero where no polygon of the class is within buffer_m).
+    """
+    n_events = len(longitudes)
+    points = gpd.GeoSeries(gpd.points_from_xy(longitudes, latitudes), crs="EPSG:4326").to_crs(METRIC_CRS).values
+    points = np.asarray(points)
+    polygons = np.asarray(landuse_gdf.geometry.values)
+    classes = landuse_gdf["landuse"].astype(str).to_numpy()
+    result = pd.DataFrame(index=pd.RangeIndex(n_events))
+    result["landuse_at_point"] = None
+    if n_events == 0 or len(polygons) == 0:
+        return result
+
+    tree = shapely.STRtree(polygons)
+    valid = ~shapely.is_missing(points) & ~shapely.is_empty(points)
+
+    # Containing polygon (first match wins where polygons overlap)
+    event_idx, poly_idx = tree.query(points[valid], predicate="intersects")
+    event_idx = np.flatnonzero(valid)[event_idx]
+    first = np.unique(event_idx, return_index=True)[1]
+    result.loc[event_idx[first], "landuse_at_point"] = classes[poly_idx[first]]
+
+    # Polygons within buffer_m, in event batches so intersection geometries stay bounded in memory.
+    # dwithin finds candidates without building buffers; each event is buffered once per batch.
+    valid_idx = np.flatnonzero(valid)
+    batches = []
+    for start in range(0, len(valid_idx), batch_size):
+        batch_events = valid_idx[start:start + batch_size]
+        local_idx, poly_idx = tree.query(points[batch_events], predicate="dwithin", distance=buffer_m)
+        buffers = shapely.buffer(points[batch_events], buffer_m, quad_segs=8)
+        areas = shapely.area(shapely.intersection(buffers[local_idx], polygons[poly_idx]))
+        batches.append(pd.DataFrame({"event": batch_events[local_idx], "landuse": classes[poly_idx], "area": areas}))
+    pairs = pd.concat(batches, ignore_index=True) if batches else pd.DataFrame(columns=["event", "landuse", "area"])
+
+    # One area and one count column per class in the layer, zero where no polygon is within buffer_m
+    layer_classes = np.unique(classes)
+    if pairs.empty:
+        area_sums = pd.DataFrame(0.0, index=result.index, columns=layer_classes)
+        counts = pd.DataFrame(0, index=result.index, columns=layer_classes)
+    else:
+        summary = pairs.groupby(["event", "landuse"])["area"].agg(["sum", "count"])
+        area_sums = summary["sum"].unstack("landuse", fill_value=0).reindex(
+            index=result.index, columns=layer_classes, fill_value=0)
+        counts = summary["count"].unstack("landuse", fill_value=0).reindex(
+            index=result.index, columns=layer_classes, fill_value=0)
+    area_cols = area_sums.add_prefix("exposure_").add_suffix("_sqm")
+    count_cols = counts.add_prefix("exposure_").add_suffix("_count")
+    exposure = pd.concat([area_cols, count_cols], axis=1)
+    exposure.columns = [col.lower().replace(" ", "_") for col in exposure.columns]
+    return pd.concat([result, exposure], axis=1)
+
+def extract_flood_exposure(events_path, output_path, buffer_m=DEFAULT_BUFFER_M):
+    """
+    Attach land use exposure features to every flood event that has coordinates.
+    Args:
+        events_path (str): Flood events CSV with date, location, latitude, longitude.
+        output_path (str): Output CSV path.
+        buffer_m (float): Buffer radius in metres.
+    """
+    try:
+        events = schemas.read_csv(events_path, "flood_events")
+        if not {"latitude", "longitude"} <= set(events.columns):
+            logger.error("%s has no latitude/longitude columns; rerun process_gfm / filter_darthmouth.", events_path)
+            return
+        events = events.dropna(subset=["latitude", "longitude"]).reset_index(drop=True)
+        logger.info("Flood events with coordinates: %s", len(events))
+
+        start = time.perf_counter()
+        with instrumentation.span("load") as span:
+            landuse = load_landuse_polygons()
+            span["rows"] = len(landuse)
+        logger.info("Loaded %s land use polygons in %.2fs", len(landuse), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with instrumentation.span("transform") as span:
+            exposure = compute_exposure(events["longitude"], events["latitude"], landuse, buffer_m)
+            span["rows"] = len(events)
+        logger.info("Computed exposure for %s events in %.2fs", len(events), time.perf_counter() - start)
+
+        output = pd.concat([events, exposure], axis=1)
+        with instrumentation.span("write") as span:
+            output.to_csv(output_path, index=False)
+            span["rows"] = len(output)
+        logger.info("Flood exposure saved to %s: %s records, %s features", output_path, len(output), exposure.shape[1])
+        log.preview(logger, "Land use at flood points", lambda: output["landuse_at_point"].value_counts(dropna=False))
+    except Exception as e:
+        logger.error("Error: %s", e)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Overlay flood points on land use polygons.")
+    parser.add_argument("--events", default="data/historical_floods_merged.csv")
+    parser.add_argument("--output", default="data/flood_exposure.csv")
+    parser.add_argument("--buffer-m", type=float, default=DEFAULT_BUFFER_M)
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    instrumentation.run(lambda: extract_flood_exposure(args.events, args.output, args.buffer_m),
+                        args, "extract_flood_exposure", output=args.output)
@@ -1,63 +1,116 @@
-import geopandas as gpd
 import sqlite3
 import pandas as pd
 from sqlalchemy import create_engine
-import os
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import logging
+import sys
+from pathlib import Path
 
-def extract_land_use_features(db_path):
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, landuse_store, locations, log  # noqa: E402
+
+logger = logging.getLogger("extract_landuse_features")
+
+def compute_state_areas(state):
+    """
+    Sum polygon area per land use type for one state.
+    Only the landuse column and geometry are read from the GeoParquet store.
+    Args:
+        state (str): Lower-case state name.
+    Returns:
+        pd.DataFrame: Columns state, landuse, area_sqm.
+    """
+    gdf = landuse_store.read_state(state, columns=["landuse"])
+    gdf = gdf.to_crs(gdf.estimate_utm_crs())  # Project to UTM
+    gdf["area_sqm"] = gdf.geometry.area
+
+    # Aggregate by landuse
+    areas = gdf.groupby("landuse")["area_sqm"].sum().reset_index()
+    areas["state"] = locations.alias_map().get(state.lower(), state.title())
+    return areas[["state", "landuse", "area_sqm"]]
+
+def compute_all_areas(states, workers=None):
+    """
+    Compute land use areas for several states, one process per state when workers != 1.
+    Args:
+        states (list): Lower-case state names.
+        workers (int): Process count; 1 runs sequentially, None uses all cores.
+    Returns:
+        list: (state, DataFrame or None, error or None) tuples in input order.
+    """
+    results = []
+    if workers == 1 or len(states) <= 1:
+        for state in states:
+            try:
+                results.append((state, compute_state_areas(state), None))
+            except Exception as e:
+                results.append((state, None, e))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(state, pool.submit(compute_state_areas, state)) for state in states]
+        for state, future in futures:
+            try:
+                results.append((state, future.result(), None))
+            except Exception as e:
+                results.append((state, None, e))
+    return results
+
+def extract_land_use_features(db_path, states=None, workers=None):
     """
     Compute area of each land use type per state and update socioeconomic table.
     Args:
         db_path (str): SQLite database path.
+        states (list): Lower-case state names; defaults to every state in the land use store.
+        workers (int): Process count for per-state computation; 1 runs sequentially.
     """
     try:
         conn = sqlite3.connect(db_path)
-        
+
         # Check if area_sqm exists
         cursor = conn.cursor()
         cursor.execute("PRAGMA table_info(socioeconomic);")
         columns = [col[1] for col in cursor.fetchall()]
         if "area_sqm" not in columns:
             conn.execute("ALTER TABLE socioeconomic ADD COLUMN area_sqm REAL;")
-            print("Added area_sqm column to socioeconomic table.")
-        
-        states = ["lagos", "rivers", "benue", "bayelsa"]
-        for state in states:
-            try:
-                # Use cleaned GeoJSONs
-                file_path = f"data/{state}_landuse_cleaned_valid.geojson"
-                if not os.path.exists(file_path):
-                    raise FileNotFoundError(f"GeoJSON file {file_path} not found.")
-                gdf = gpd.read_file(file_path)
-                gdf = gdf.to_crs(gdf.estimate_utm_crs())  # Project to UTM
-                gdf["area_sqm"] = gdf["geometry"].area
-                
-                # Aggregate by landuse
-                areas = gdf.groupby("landuse")["area_sqm"].sum().reset_index()
-                areas["state"] = state.title()
-                
-                # Update socioeconomic table
-                for _, row in areas.iterrows():
-                    conn.execute("""
-                        UPDATE socioeconomic
-                        SET area_sqm = ?
-                        WHERE state = ? AND landuse_type = ?;
-                    """, (row["area_sqm"], row["state"], row["landuse"]))
-                
-                print(f"Updated socioeconomic areas for {state}")
-            except Exception as e:
-                print(f"Error processing {state}: {e}")
-        
+            logger.info("Added area_sqm column to socioeconomic table.")
+
+        if states is None:
+            states = landuse_store.available_states()
+        with instrumentation.span("compute_areas"):
+            results = compute_all_areas(states, workers)
+        for state, areas, error in results:
+            if error is not None:
+                logger.error("Error processing %s: %s", state, error)
+                continue
+            # Update socioeconomic table
+            with instrumentation.span("write") as span:
+                conn.executemany("""
+                    UPDATE socioeconomic
+                    SET area_sqm = ?
+                    WHERE state = ? AND landuse_type = ?;
+                """, areas[["area_sqm", "state", "landuse"]].itertuples(index=False, name=None))
+                span["rows"] = len(areas)
+            logger.info("Updated socioeconomic areas for %s", state)
+
         conn.commit()
         conn.close()
-        
+
         # Preview
-        engine = create_engine(f"sqlite:///{db_path}")
-        preview = pd.read_sql("SELECT * FROM socioeconomic;", engine)
-        print("Socioeconomic Preview:\n", preview)
+        log.preview(logger, "Socioeconomic preview",
+                    lambda: pd.read_sql("SELECT * FROM socioeconomic;", create_engine(f"sqlite:///{db_path}")))
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error("Error: %s", e)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute land use areas per state into the socioeconomic table.")
+    parser.add_argument("--workers", type=int, default=None, help="Process count; 1 runs sequentially")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
     db_file = "data/flood_data.db"
-    extract_land_use_features(db_file)
\ No newline at end of file
+    instrumentation.run(lambda: extract_land_use_features(db_file, workers=args.workers), args,
+                        "extract_landuse_features", output="db:socioeconomic")
@@ -2,6 +2,15 @@ import pandas as pd
 import sqlite3
 from sqlalchemy import create_engine
 from datetime import datetime
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, log, schemas  # noqa: E402
+
+logger = logging.getLogger("extract_sentinel_features")
 
 def extract_sentinel_features(db_path):
     """
@@ -22,34 +31,43 @@ def extract_sentinel_features(db_path):
         """)
         
         # Query and deduplicate
-        df = pd.read_sql("SELECT image_id, date, region FROM sentinel_metadata;", conn)
-        df = df.drop_duplicates(subset=["image_id"])
-        df["date"] = pd.to_datetime(df["date"], unit="ms", errors="coerce")
+        with instrumentation.span("load") as span:
+            df = schemas.read_sql("SELECT image_id, date, region FROM sentinel_metadata;", conn, "sentinel_metadata")
+            span["rows"] = len(df)
+        # One image can cover two regions' search boxes; count it for each
+        df = df.drop_duplicates(subset=["image_id", "region"])
         df["week_start_date"] = df["date"].dt.to_period("W").dt.start_time
         
         # Aggregate
-        counts = df.groupby(["region", "week_start_date"]).size().reset_index(name="image_count")
+        counts = df.groupby(["region", "week_start_date"], observed=True).size().reset_index(name="image_count")
         counts["feature_date"] = datetime.now().strftime("%Y-%m-%d")
         counts["week_start_date"] = counts["week_start_date"].dt.strftime("%Y-%m-%d")
         
         # Insert
-        for _, row in counts.iterrows():
-            conn.execute("""
-                INSERT OR REPLACE INTO sentinel_features (region, week_start_date, image_count, feature_date)
-                VALUES (?, ?, ?, ?);
-            """, (row["region"], row["week_start_date"], row["image_count"], row["feature_date"]))
-        
-        conn.commit()
+        with instrumentation.span("write") as span:
+            for _, row in counts.iterrows():
+                conn.execute("""
+                    INSERT OR REPLACE INTO sentinel_features (region, week_start_date, image_count, feature_date)
+                    VALUES (?, ?, ?, ?);
+                """, (row["region"], row["week_start_date"], row["image_count"], row["feature_date"]))
+            conn.commit()
+            span["rows"] = len(counts)
         conn.close()
-        print("Extracted Sentinel features.")
+        logger.info("Extracted Sentinel features: %s region-weeks", len(counts))
         
         # Preview
-        engine = create_engine(f"sqlite:///{db_path}")
-        preview = pd.read_sql("SELECT * FROM sentinel_features;", engine)
-        print("Sentinel Features Preview:\n", preview)
+        log.preview(logger, "Sentinel features preview",
+                    lambda: pd.read_sql("SELECT * FROM sentinel_features;", create_engine(f"sqlite:///{db_path}")))
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error("Error: %s", e)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count Sentinel images per region and week.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
     db_file = "data/flood_data.db"
-    extract_sentinel_features(db_file)
\ No newline at end of file
+    instrumentation.run(lambda: extract_sentinel_features(db_file), args, "extract_sentinel_features",
+                        output="db:sentinel_features")
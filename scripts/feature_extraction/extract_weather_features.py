@@ -2,6 +2,17 @@ import pandas as pd
 import sqlite3
 from sqlalchemy import create_engine
 from datetime import datetime, timedelta
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, log, schemas  # noqa: E402
+
+logger = logging.getLogger("extract_weather_features")
+
+MEASUREMENTS = ["temperature", "humidity", "precipitation"]
 
 def extract_weather_features(db_path):
     """
@@ -26,91 +37,107 @@ def extract_weather_features(db_path):
             );
         """)
         
-        # Query weather data
-        df = pd.read_sql("SELECT city, timestamp, temperature, humidity, precipitation FROM weather;", conn)
+        # Query weather data, as float64 so the stored averages carry no float32 rounding
+        with instrumentation.span("load") as span:
+            df = schemas.read_sql("SELECT city, timestamp, temperature, humidity, precipitation FROM weather;",
+                                  conn, "weather", dtype=dict.fromkeys(MEASUREMENTS, "float64"))
+            span["rows"] = len(df)
         
-        # Parse timestamps
-        df["timestamp"] = pd.to_datetime(df["timestamp"], format="mixed", errors="coerce")
+        # Timestamps are parsed at load; drop the unparseable ones
         if df["timestamp"].isna().any():
-            print(f"Warning: {df['timestamp'].isna().sum()} invalid timestamps. Dropping rows.")
+            logger.warning("%s invalid timestamps. Dropping rows.", df['timestamp'].isna().sum())
             df = df.dropna(subset=["timestamp"])
         
         # Fill NaN in data columns
         df[["temperature", "humidity", "precipitation"]] = df[["temperature", "humidity", "precipitation"]].fillna(0)
         if df["humidity"].isna().any():
-            print(f"Warning: {df['humidity'].isna().sum()} NaN values in humidity after fill.")
+            logger.warning("%s NaN values in humidity after fill.", df['humidity'].isna().sum())
         
         # Initialize results
         results = []
+        skipped_windows = 0
         
         # Process each city
-        for city in df["city"].unique():
-            city_df = df[df["city"] == city].sort_values("timestamp")
-            start_date = city_df["timestamp"].min().floor("D")
-            end_date = city_df["timestamp"].max().floor("D")
-            
-            current_date = start_date
-            while current_date <= end_date:
-                # 7-day window
-                window_7d = city_df[
-                    (city_df["timestamp"] >= current_date) &
-                    (city_df["timestamp"] < current_date + timedelta(days=7))
-                ]
-                # 30-day window
-                window_30d = city_df[
-                    (city_df["timestamp"] >= current_date) &
-                    (city_df["timestamp"] < current_date + timedelta(days=30))
-                ]
-                
-                # Skip empty windows
-                if window_7d.empty:
-                    print(f"Skipping empty 7-day window for {city} at {current_date}")
+        with instrumentation.span("transform"):
+            for city in df["city"].unique():
+                city_df = df[df["city"] == city].sort_values("timestamp")
+                start_date = city_df["timestamp"].min().floor("D")
+                end_date = city_df["timestamp"].max().floor("D")
+
+                current_date = start_date
+                while current_date <= end_date:
+                    # 7-day window
+                    window_7d = city_df[
+                        (city_df["timestamp"] >= current_date) &
+                        (city_df["timestamp"] < current_date + timedelta(days=7))
+                    ]
+                    # 30-day window
+                    window_30d = city_df[
+                        (city_df["timestamp"] >= current_date) &
+                        (city_df["timestamp"] < current_date + timedelta(days=30))
+                    ]
+
+                    # Skip empty windows
+                    if window_7d.empty:
+                        skipped_windows += 1
+                        logger.debug("Skipping empty 7-day window for %s at %s", city, current_date)
+                        current_date += timedelta(days=7)
+                        continue
+
+                    # Aggregate
+                    record = {
+                        "city": city,
+                        "window_start_date": current_date.strftime("%Y-%m-%d"),
+                        "avg_precipitation_7d": window_7d["precipitation"].mean() or 0,
+                        "avg_temperature_7d": window_7d["temperature"].mean() or 0,
+                        "avg_humidity_7d": int(window_7d["humidity"].mean() or 0),
+                        "avg_precipitation_30d": window_30d["precipitation"].mean() or 0,
+                        "feature_date": datetime.now().strftime("%Y-%m-%d")
+                    }
+                    results.append(record)
+
                     current_date += timedelta(days=7)
-                    continue
-                
-                # Aggregate
-                record = {
-                    "city": city,
-                    "window_start_date": current_date.strftime("%Y-%m-%d"),
-                    "avg_precipitation_7d": window_7d["precipitation"].mean() or 0,
-                    "avg_temperature_7d": window_7d["temperature"].mean() or 0,
-                    "avg_humidity_7d": int(window_7d["humidity"].mean() or 0),
-                    "avg_precipitation_30d": window_30d["precipitation"].mean() or 0,
-                    "feature_date": datetime.now().strftime("%Y-%m-%d")
-                }
-                results.append(record)
-                
-                current_date += timedelta(days=7)
-            
+
+        if skipped_windows:
+            logger.info("Skipped %s empty 7-day windows", skipped_windows)
+
         # Save to database
-        results_df = pd.DataFrame(results)
-        results_df.fillna(0, inplace=True)  # Ensure no NaN in final results
-        for _, row in results_df.iterrows():
-            conn.execute("""
-                INSERT OR REPLACE INTO weather_features
-                (city, window_start_date, avg_precipitation_7d, avg_temperature_7d, avg_humidity_7d, avg_precipitation_30d, feature_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?);
-            """, (
-                row["city"],
-                row["window_start_date"],
-                row["avg_precipitation_7d"],
-                row["avg_temperature_7d"],
-                row["avg_humidity_7d"],
-                row["avg_precipitation_30d"],
-                row["feature_date"]
-            ))
-        
-        conn.commit()
+        with instrumentation.span("write") as span:
+            results_df = pd.DataFrame(results)
+            results_df.fillna(0, inplace=True)  # Ensure no NaN in final results
+            for _, row in results_df.iterrows():
+                conn.execute("""
+                    INSERT OR REPLACE INTO weather_features
+                    (city, window_start_date, avg_precipitation_7d, avg_temperature_7d, avg_humidity_7d, avg_precipitation_30d, feature_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?);
+                """, (
+                    row["city"],
+                    row["window_start_date"],
+                    row["avg_precipitation_7d"],
+                    row["avg_temperature_7d"],
+                    row["avg_humidity_7d"],
+                    row["avg_precipitation_30d"],
+                    row["feature_date"]
+                ))
+
+            conn.commit()
+            span["rows"] = len(results_df)
         conn.close()
-        print("Extracted weather features.")
+        logger.info("Extracted weather features: %s windows", len(results_df))
         
         # Preview
-        engine = create_engine(f"sqlite:///{db_path}")
-        preview = pd.read_sql("SELECT * FROM weather_features;", engine)
-        print("Weather Features Preview:\n", preview.head())
+        log.preview(logger, "Weather features preview",
+                    lambda: pd.read_sql("SELECT * FROM weather_features LIMIT 5;", create_engine(f"sqlite:///{db_path}")))
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error("Error: %s", e)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate 7-day and 30-day weather windows per city.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
     db_file = "data/flood_data.db"
-    extract_weather_features(db_file)
\ No newline at end of file
+    instrumentation.run(lambda: extract_weather_features(db_file), args, "extract_weather_features",
+                        output="db:weather_features")
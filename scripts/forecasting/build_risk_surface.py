@@ -0,0 +1,213 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import feature_store, grid_store, instrumentation, landuse_store, log, risk_model, transforms  # noqa: E402
+
+logger = logging.getLogger("build_risk_surface")
+
+ACCUM_FILE = "data/data_stream-oper_stepType-accum.nc"
+INSTANT_FILE = "data/data_stream-oper_stepType-instant.nc"
+STATES_FILE = "data/geospatial/nigeria_states.geojson"
+DAYS = 30  # Longest rolling window
+EARTH_RADIUS_M = 6371008.8
+EQUAL_AREA_CRS = "EPSG:6933"
+
+def relative_humidity(t2m, d2m):
+    """Relative humidity (%) from 2 m temperature and dew point in Kelvin."""
+    t_c = t2m - 273.15
+    d_c = d2m - 273.15
+    e = 6.1078 * 10 ** (7.5 * d_c / (237.3 + d_c))  # Vapor pressure
+    es = 6.1078 * 10 ** (7.5 * t_c / (237.3 + t_c))  # Saturation vapor pressure
+    return np.clip(100 * (e / es), 0, 100)
+
+def load_era5_daily(accum_file=ACCUM_FILE, instant_file=INSTANT_FILE, end_date=None, days=DAYS):
+    """
+    Daily ERA5 weather over the `days` days up to end_date (default: the last day in the files).
+    Args:
+        accum_file (str): NetCDF with hourly total precipitation (tp, m).
+        instant_file (str): NetCDF with hourly 2 m temperature and dew point (t2m, d2m, K).
+        end_date (str): Last day (YYYY-MM-DD).
+        days (int): Days to keep.
+    Returns:
+        dict: lat, lon (ERA5 grid), end_date, and temperature (C, daily mean),
+            humidity (%, daily mean), precipitation (mm, daily total) as (days, lat, lon) arrays.
+    """
+    import xarray as xr  # Only needed to read the NetCDF inputs
+
+    with xr.open_dataset(accum_file) as accum, xr.open_dataset(instant_file) as instant:
+        end = pd.Timestamp(end_date) if end_date else pd.Timestamp(instant["valid_time"].max().values)
+        end = end.normalize()
+        period = slice(end - pd.Timedelta(days=days - 1), end + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+        instant = instant.sel(valid_time=period)
+        daily = {
+            "temperature": (instant["t2m"] - 273.15).resample(valid_time="1D").mean(),
+            "humidity": relative_humidity(instant["t2m"], instant["d2m"]).resample(valid_time="1D").mean(),
+            "precipitation": (accum["tp"].sel(valid_time=period) * 1000).resample(valid_time="1D").sum()
+        }
+        arrays = {col: values.transpose("valid_time", "latitude", "longitude").values for col, values in daily.items()}
+        arrays.update(lat=instant["latitude"].values, lon=instant["longitude"].values, end_date=end)
+    return arrays
+
+def window_features(daily):
+    """
+    MODEL_FEATURES on the source grid from daily (days, lat, lon) arrays: the last
+    day's weather and 7-day / 30-day means ending on it.
+    Returns:
+        dict: feature -> (lat, lon) array.
+    """
+    features = {col: daily[col][-1] for col in transforms.FEATURES}
+    features["avg_precipitation_7d"] = np.nanmean(daily["precipitation"][-7:], axis=0)
+    features["avg_temperature_7d"] = np.nanmean(daily["temperature"][-7:], axis=0)
+    features["avg_humidity_7d"] = np.nanmean(daily["humidity"][-7:], axis=0)
+    features["avg_precipitation_30d"] = np.nanmean(daily["precipitation"][-DAYS:], axis=0)
+    return features
+
+def nearest_index(source, target):
+    """Index of the nearest source coordinate for each target coordinate (source in any order)."""
+    order = np.argsort(source)
+    ordered = source[order]
+    position = np.clip(np.searchsorted(ordered, target), 1, len(ordered) - 1)
+    left_closer = (target - ordered[position - 1]) <= (ordered[position] - target)
+    return order[np.where(left_closer, position - 1, position)]
+
+def regrid(features, source_lat, source_lon, bounds, resolution):
+    """Nearest-neighbour resample of (lat, lon) feature arrays onto the risk grid."""
+    lon, lat = grid_store.cell_centers(bounds, resolution)
+    rows = nearest_index(np.asarray(source_lat, dtype=float), lat)
+    cols = nearest_index(np.asarray(source_lon, dtype=float), lon)
+    return {col: values[np.ix_(rows, cols)] for col, values in features.items()}
+
+def cell_areas(bounds, resolution):
+    """Cell areas in m2 as a (height, 1) column; cells shrink with latitude."""
+    _, lat = grid_store.cell_centers(bounds, resolution)
+    side = EARTH_RADIUS_M * np.radians(resolution)
+    return (side * side * np.cos(np.radians(lat)))[:, None]
+
+def landuse_features(layers, bounds, resolution):
+    """
+    Fraction of each cell covered by each land use class.
+    Polygon areas are accumulated into the cell containing their centroid, which
+    is exact enough for polygons far smaller than a cell.
+    Args:
+        layers (iterable): GeoDataFrames with a landuse column.
+    Returns:
+        dict: landuse_<class> -> (height, width) array.
+    """
+    shape = grid_store.grid_shape(bounds, resolution)
+    totals = {}
+    for layer in layers:
+        projected = layer.to_crs(EQUAL_AREA_CRS)
+        centroids = projected.centroid.to_crs(epsg=4326)
+        rows, cols, inside = grid_store.cell_of(centroids.x.to_numpy(), centroids.y.to_numpy(), bounds, resolution)
+        areas = projected.area.to_numpy()
+        classes = layer["landuse"].fillna("unknown").astype(str).str.lower().str.replace(" ", "_").to_numpy()
+        for landuse in np.unique(classes[inside]):
+            selected = inside & (classes == landuse)
+            grid = totals.setdefault(f"landuse_{landuse}", np.zeros(shape))
+            np.add.at(grid, (rows[selected], cols[selected]), areas[selected])
+    cell_area = cell_areas(bounds, resolution)
+    return {name: np.clip(area / cell_area, 0, 1) for name, area in sorted(totals.items())}
+
+def build_surface(daily, states, model, transform, landuse_layers=(), bounds=grid_store.NIGERIA_BOUNDS,
+                  resolution=grid_store.RESOLUTION, batch_size=risk_model.BATCH_SIZE):
+    """
+    Grid features and flood probability for every cell inside a state.
+    Args:
+        daily (dict): Output of load_era5_daily.
+        states (gpd.GeoDataFrame): State polygons with NAME_1.
+        model: Fitted risk_model.
+        transform (WeatherTransform): Fitted same-day weather transform.
+        landuse_layers (iterable): Land use GeoDataFrames.
+        bounds (tuple): Grid bounds.
+        resolution (float): Cell size in degrees.
+        batch_size (int): Cells scored per batch.
+    Returns:
+        dict: Surface arrays as described in grid_store.
+    """
+    index, names = grid_store.state_index(states, bounds, resolution)
+    inside = index != grid_store.NO_STATE
+    weather = regrid(window_features(daily), daily["lat"], daily["lon"], bounds, resolution)
+    landuse = landuse_features(landuse_layers, bounds, resolution)
+
+    # Only cells inside a state are scored, as one flat table in batches
+    cells = pd.DataFrame({col: weather[col][inside] for col in risk_model.MODEL_FEATURES})
+    probability = np.full(index.shape, np.nan, dtype=np.float32)
+    probability[inside] = risk_model.score(model, cells, transform, batch_size)
+
+    layers = {**weather, **landuse}
+    features = np.stack([np.where(inside, values, np.nan) for values in layers.values()]).astype(np.float32)
+    west, _, _, north = bounds
+    return {
+        "features": features,
+        "feature_names": np.array(list(layers)),
+        "probability": probability,
+        "state_index": index,
+        "state_names": names,
+        "origin": np.array([west, north, resolution])
+    }
+
+def build_risk_surface(accum_file, instant_file, states_file, output_path=grid_store.SURFACE_PATH, end_date=None,
+                       resolution=grid_store.RESOLUTION, transform_path=transforms.TRANSFORM_PATH):
+    """
+    Score flood risk on a regular grid over Nigeria from ERA5 weather and land use.
+    Args:
+        accum_file (str): ERA5 precipitation NetCDF.
+        instant_file (str): ERA5 temperature/dew point NetCDF.
+        states_file (str): Nigeria states GeoJSON.
+        output_path (str): Output .npz path.
+        end_date (str): Day scored (YYYY-MM-DD); default the last ERA5 day.
+        resolution (float): Cell size in degrees.
+        transform_path (str): Saved WeatherTransform.
+    """
+    try:
+        with instrumentation.span("load") as span:
+            daily = load_era5_daily(accum_file, instant_file, end_date)
+            states = gpd.read_file(states_file)
+            layers = [landuse_store.read_state(state, columns=["landuse"]) for state in landuse_store.available_states()]
+            events = feature_store.read_events("train", columns=risk_model.TRAINING_COLUMNS)
+            transform = transforms.WeatherTransform.load(transform_path)
+            span["rows"] = sum(len(layer) for layer in layers) + len(events)
+        logger.info("ERA5 days up to %s on a %sx%s grid; %s states, %s land use layers",
+                    format(daily['end_date'], "%Y-%m-%d"), len(daily['lat']), len(daily['lon']), len(states),
+                    len(layers))
+
+        with instrumentation.span("fit") as span:
+            model = risk_model.fit(events)
+            span["rows"] = len(events)
+
+        with instrumentation.span("score") as span:
+            surface = build_surface(daily, states, model, transform, layers, resolution=resolution)
+            cells = int((surface["state_index"] != grid_store.NO_STATE).sum())
+            span["rows"] = cells
+
+        with instrumentation.span("write"):
+            path = grid_store.write_surface(surface, output_path)
+        height, width = surface["probability"].shape
+        logger.info("Risk surface %sx%s at %s deg, %s cells in %s states, %s features -> %s",
+                    height, width, resolution, cells, len(surface['state_names']), len(surface['feature_names']), path)
+        log.preview(logger, "Risk by state", lambda: grid_store.state_summary(surface), rows=len(surface["state_names"]))
+    except Exception as e:
+        logger.error("Error: %s", e)
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score flood risk on a regular grid over Nigeria.")
+    parser.add_argument("--accum", default=ACCUM_FILE, help="ERA5 precipitation NetCDF")
+    parser.add_argument("--instant", default=INSTANT_FILE, help="ERA5 temperature/dew point NetCDF")
+    parser.add_argument("--date", default=None, help="Day scored (YYYY-MM-DD), default the last ERA5 day")
+    parser.add_argument("--resolution", type=float, default=grid_store.RESOLUTION, help="Cell size in degrees")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    output = str(grid_store.SURFACE_PATH)
+    instrumentation.run(lambda: build_risk_surface(args.accum, args.instant, STATES_FILE, output, args.date,
+                                                   args.resolution),
+                        args, "build_risk_surface", output=output)
@@ -0,0 +1,255 @@
+import requests
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import feature_store, forecast_store, instrumentation, locations, log, risk_model, schemas, transforms  # noqa: E402
+
+logger = logging.getLogger("forecast_floods")
+
+load_dotenv()
+
+DB_PATH = "data/flood_data.db"
+FORECAST_FILE = "data/forecast_weather.json"  # OpenWeatherMap /forecast responses keyed by state
+FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast"
+PAST_DAYS = 30  # Longest rolling window
+WINDOW_COLUMNS = risk_model.WINDOW_COLUMNS
+
+# OpenWeatherMap query and stored state name of each registered state
+cities = [
+    {"api_name": location["weather_query"], "db_name": location["name"]} for location in locations.all_locations()
+]
+
+def parse_openweathermap_forecast(response, state):
+    """
+    Daily weather from a /data/2.5/forecast response (3-hourly entries, UTC).
+    Returns:
+        pd.DataFrame: state, date, temperature and humidity (daily means),
+            precipitation (daily total, like the Daily readings in the weather table).
+    """
+    entries = response.get("list", [])
+    readings = pd.DataFrame({
+        "date": pd.to_datetime([entry["dt"] for entry in entries], unit="s").normalize(),
+        "temperature": [entry["main"]["temp"] for entry in entries],
+        "humidity": [entry["main"]["humidity"] for entry in entries],
+        "precipitation": [entry.get("rain", {}).get("3h", 0) for entry in entries]
+    })
+    daily = readings.groupby("date", as_index=False).agg(
+        temperature=("temperature", "mean"), humidity=("humidity", "mean"), precipitation=("precipitation", "sum")
+    )
+    daily.insert(0, "state", state)
+    return daily
+
+def fetch_forecast_responses(api_key, cities=cities):
+    """Raw /data/2.5/forecast responses keyed by state."""
+    responses = {}
+    with requests.Session() as session:
+        for city in cities:
+            try:
+                response = session.get(FORECAST_URL, params={"q": city["api_name"], "appid": api_key,
+                                                             "units": "metric"}, timeout=10)
+                response.raise_for_status()
+                responses[city["db_name"]] = response.json()
+                logger.debug("Fetched forecast for %s", city["db_name"])
+            except requests.RequestException as e:
+                logger.error("Error fetching forecast for %s: %s", city['api_name'], e)
+            time.sleep(1)
+    return responses
+
+def load_forecast_weather(forecast_file=FORECAST_FILE, api_key=None):
+    """
+    Forecast weather from forecast_file if it exists, else from the OpenWeatherMap API.
+    Returns:
+        tuple: (daily forecast DataFrame, source name). Without a file or API key
+            the frame is empty and the source is "persistence".
+    """
+    if forecast_file and os.path.exists(forecast_file):
+        with open(forecast_file, "r") as f:
+            responses, source = json.load(f), "file"
+    elif api_key:
+        responses, source = fetch_forecast_responses(api_key), "openweathermap"
+    else:
+        responses, source = {}, "persistence"
+    frames = [parse_openweathermap_forecast(response, state) for state, response in responses.items()]
+    columns = ["state", "date"] + transforms.FEATURES
+    daily = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    return daily, source
+
+def load_latest_windows(conn):
+    """
+    Most recent weather_features window per city (the state name).
+    A handful of rows, kept float64 so stored forecasts carry no float32 rounding.
+    """
+    return schemas.read_sql(f"""
+        SELECT f.city, f.window_start_date, {", ".join(f"f.{col}" for col in WINDOW_COLUMNS)}
+        FROM weather_features f
+        JOIN (SELECT city, MAX(window_start_date) AS window_start_date FROM weather_features GROUP BY city) latest
+            ON f.city = latest.city AND f.window_start_date = latest.window_start_date
+        ORDER BY f.city;
+    """, conn, "weather_features", dtype=dict.fromkeys(WINDOW_COLUMNS, "float64"))
+
+def daily_weather(windows, forecast, issue_date, max_horizon):
+    """
+    Day-by-day weather per state from PAST_DAYS - 1 days before issue_date to
+    max_horizon days after it, as (states x days) arrays.
+    Observed days are rebuilt from the latest window: its 7-day means for the
+    last week and, for precipitation, the rest of its 30-day mean before that.
+    Future days take the forecast where there is one and persist the 7-day
+    means where there is not.
+    Args:
+        windows (pd.DataFrame): Output of load_latest_windows.
+        forecast (pd.DataFrame): state, date and transforms.FEATURES per day.
+        issue_date (pd.Timestamp): Last observed day.
+        max_horizon (int): Days after issue_date to cover.
+    Returns:
+        tuple: ({feature: array}, forecast-covered boolean array, days DatetimeIndex).
+    """
+    days = pd.date_range(issue_date - pd.Timedelta(days=PAST_DAYS - 1), issue_date + pd.Timedelta(days=max_horizon))
+    last_week = (days > issue_date - pd.Timedelta(days=7)) & (days <= issue_date)
+    future = days > issue_date
+    shape = (len(windows), len(days))
+
+    recent_precipitation = windows["avg_precipitation_7d"].to_numpy(dtype=float)[:, None]
+    # Precipitation mean over the 30-day window's days before the last week
+    earlier_precipitation = np.clip(
+        (PAST_DAYS * windows["avg_precipitation_30d"].to_numpy(dtype=float)[:, None] - 7 * recent_precipitation)
+        / (PAST_DAYS - 7), 0, None)
+    grid = {
+        "precipitation": np.where(last_week | future, recent_precipitation, earlier_precipitation),
+        "temperature": np.broadcast_to(windows["avg_temperature_7d"].to_numpy(dtype=float)[:, None], shape).copy(),
+        "humidity": np.broadcast_to(windows["avg_humidity_7d"].to_numpy(dtype=float)[:, None], shape).copy()
+    }
+
+    # Overlay forecast days in one scatter per feature
+    state_index = pd.Index(windows["city"].astype(str))
+    rows = state_index.get_indexer(forecast["state"])
+    cols = days.get_indexer(pd.to_datetime(forecast["date"]))
+    keep = (rows >= 0) & (cols >= 0)
+    keep[keep] = future[cols[keep]]
+    for col in transforms.FEATURES:
+        values = forecast[col].to_numpy(dtype=float)
+        known = keep & ~np.isnan(values)
+        grid[col][rows[known], cols[known]] = values[known]
+    covered = np.zeros(shape, dtype=bool)
+    covered[rows[keep], cols[keep]] = True
+    return grid, covered, days
+
+def horizon_features(grid, covered, states, horizons):
+    """
+    Model features for every state x horizon, with rolling means taken from
+    cumulative sums so all windows are computed in one pass.
+    Returns:
+        pd.DataFrame: state, horizon_days, forecast_covered and risk_model.MODEL_FEATURES (unscaled).
+    """
+    horizons = np.asarray(horizons)
+    targets = PAST_DAYS - 1 + horizons  # Column of each target day
+
+    def rolling_mean(values, length):
+        csum = np.concatenate([np.zeros((len(values), 1)), np.cumsum(values, axis=1)], axis=1)
+        return (csum[:, targets + 1] - csum[:, targets + 1 - length]) / length
+
+    features = {
+        "state": np.repeat(np.asarray(states), len(horizons)),
+        "horizon_days": np.tile(horizons, len(states)),
+        "forecast_covered": covered[:, targets].ravel()
+    }
+    for col in transforms.FEATURES:
+        features[col] = grid[col][:, targets].ravel()
+    features["avg_precipitation_7d"] = rolling_mean(grid["precipitation"], 7).ravel()
+    features["avg_temperature_7d"] = rolling_mean(grid["temperature"], 7).ravel()
+    features["avg_humidity_7d"] = rolling_mean(grid["humidity"], 7).ravel()
+    features["avg_precipitation_30d"] = rolling_mean(grid["precipitation"], 30).ravel()
+    return pd.DataFrame(features)
+
+def forecast_floods(db_path, forecast_file=FORECAST_FILE, api_key=None, issue_date=None,
+                    horizons=forecast_store.HORIZONS, transform_path=transforms.TRANSFORM_PATH):
+    """
+    Score flood risk for every state and horizon and store it in the forecasts table.
+    Args:
+        db_path (str): SQLite database path.
+        forecast_file (str): OpenWeatherMap forecast responses keyed by state; used if present.
+        api_key (str): OpenWeatherMap key, used when forecast_file does not exist.
+        issue_date (str): Last observed day (YYYY-MM-DD); defaults to today (UTC).
+        horizons (tuple): Days ahead to forecast.
+        transform_path (str): Saved WeatherTransform.
+    Raises:
+        ValueError: If weather_features has no windows to forecast from.
+    """
+    try:
+        issue_date = pd.Timestamp(issue_date) if issue_date else pd.Timestamp.now(tz="UTC").tz_localize(None)
+        issue_date = issue_date.normalize()
+        conn = sqlite3.connect(db_path)
+        try:
+            with instrumentation.span("load") as span:
+                windows = load_latest_windows(conn)
+                events = feature_store.read_events("train", columns=risk_model.TRAINING_COLUMNS)
+                transform = transforms.WeatherTransform.load(transform_path)
+                span["rows"] = len(windows) + len(events)
+            if windows.empty:
+                raise ValueError("No weather_features windows; run extract_weather_features.py first.")
+            stale = windows[windows["window_start_date"] < issue_date - pd.Timedelta(days=PAST_DAYS)]
+            if not stale.empty:
+                logger.warning("Latest weather window is over %s days old for: %s",
+                               PAST_DAYS, ', '.join(stale['city'].astype(str)))
+
+            with instrumentation.span("fetch") as span:
+                forecast, source = load_forecast_weather(forecast_file, api_key)
+                span["rows"] = len(forecast)
+            if source == "persistence":
+                logger.warning("No forecast file or OPENWEATHERMAP_API_KEY; persisting the latest weather windows")
+            logger.info("Forecast weather: %s state-days from %s", len(forecast), source)
+
+            with instrumentation.span("fit") as span:
+                model = risk_model.fit(events)
+                span["rows"] = len(events)
+
+            # Every state x horizon is scored in one batch
+            with instrumentation.span("score") as span:
+                grid, covered, _ = daily_weather(windows, forecast, issue_date, max(horizons))
+                features = horizon_features(grid, covered, windows["city"].astype(str), horizons)
+                probabilities = risk_model.score(model, features, transform)
+                span["rows"] = len(features)
+
+            forecasts = features.assign(
+                issue_date=issue_date.strftime("%Y-%m-%d"),
+                target_date=(issue_date + pd.to_timedelta(features["horizon_days"], unit="D")).dt.strftime("%Y-%m-%d"),
+                flood_probability=probabilities,
+                risk_level=risk_model.risk_levels(probabilities),
+                weather_source=np.where(features["forecast_covered"], source, "persistence")
+            )
+            with instrumentation.span("write") as span:
+                forecast_store.create_forecast_table(conn)
+                span["rows"] = forecast_store.write_forecasts(conn, forecasts)
+        finally:
+            conn.close()
+        logger.info("Forecasts issued %s: %s rows (%s states x horizons %s)",
+                    format(issue_date, "%Y-%m-%d"), len(forecasts), len(windows), list(horizons))
+        log.preview(logger, "Forecasts", lambda: forecasts[forecast_store.FORECAST_COLUMNS], rows=len(forecasts))
+    except Exception as e:
+        logger.error("Error: %s", e)
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score 1/3/7-day flood risk per state into the forecasts table.")
+    parser.add_argument("--forecast-file", default=FORECAST_FILE,
+                        help="OpenWeatherMap forecast responses keyed by state; fetched from the API if missing")
+    parser.add_argument("--issue-date", default=None, help="Last observed day (YYYY-MM-DD), default today")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(forecast_store.HORIZONS))
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    api_key = os.getenv("OPENWEATHERMAP_API_KEY")
+    instrumentation.run(lambda: forecast_floods(DB_PATH, args.forecast_file, api_key, args.issue_date,
+                                                tuple(args.horizons)),
+                        args, "forecast_floods", output="db:forecasts")
@@ -1,26 +1,53 @@
 import pandas as pd
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, locations, log  # noqa: E402
+
+logger = logging.getLogger("clean_darthmouth")
 
 # Input and output files
 input_file = "data/historical_floods.csv"
 output_file = "data/historical_floods_cleaned.csv"
 
-try:
-    # Load CSV
-    df = pd.read_csv(input_file)
-    
-    # Clean location
-    df["location"] = df["location"].astype(str).fillna("Unknown")
-    
-    # Filter for target states (optional: comment out to keep all states)
-    target_states = ["Lagos", "Rivers", "Benue", "Bayelsa"]
-    df = df[df["location"].isin(target_states + ["Unknown"])].copy()
-    
-    # Standardize date
-    df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
-    
-    # Save cleaned data
-    df.to_csv(output_file, index=False)
-    print(f"Cleaned Dartmouth floods saved to {output_file}: {len(df)} records")
-    
-except Exception as e:
-    print(f"Error cleaning Dartmouth data: {e}")
\ No newline at end of file
+def clean_darthmouth(input_file, output_file):
+    """
+    Keep the Dartmouth flood records of the registered states, with standardized dates.
+    """
+    try:
+        # Load CSV
+        with instrumentation.span("load") as span:
+            df = pd.read_csv(input_file)
+            span["rows"] = len(df)
+
+        # Clean location
+        df["location"] = df["location"].astype(str).fillna("Unknown")
+
+        # Filter for the registered states (optional: comment out to keep all states)
+        target_states = locations.names()
+        df = df[df["location"].isin(target_states + ["Unknown"])].copy()
+
+        # Standardize date
+        df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+
+        # Save cleaned data
+        with instrumentation.span("write") as span:
+            df.to_csv(output_file, index=False)
+            span["rows"] = len(df)
+        logger.info("Cleaned Dartmouth floods saved to %s: %d records", output_file, len(df))
+
+    except Exception as e:
+        logger.error("Error cleaning Dartmouth data: %s", e)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter the Dartmouth flood records to the registered states.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    instrumentation.run(lambda: clean_darthmouth(input_file, output_file), args, "clean_darthmouth",
+                        output=output_file)
@@ -1,47 +1,178 @@
 import geopandas as gpd
-import pandas as pd
+import numpy as np
+import shapely
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import glob
 import os
+import logging
+import sys
+import time
+from pathlib import Path
 
-def clean_geojson(state, input_path, output_path):
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, landuse_store, locations, log  # noqa: E402
+
+logger = logging.getLogger("clean_geojson")
+
+# Reject unclosed rings at read time instead of silently closing them
+os.environ["OGR_GEOMETRY_ACCEPT_UNCLOSED_RING"] = "NO"
+
+RAW_PATTERN = "data/{state}_landuse.geojson"
+FALLBACK_PATTERN = "data/{state}_landuse_cleaned.geojson"
+STATES_FILE = "data/geospatial/nigeria_states.geojson"
+POLYGONAL_TYPES = ["Polygon", "MultiPolygon"]
+
+# Bounds that replace the state outline's extent (previously correct_lagos_geojson.py), from the registry
+BBOX_OVERRIDES = {
+    location["name"].lower(): tuple(location["landuse_bbox"])
+    for location in locations.all_locations() if location.get("landuse_bbox")
+}
+
+def discover_states():
+    """
+    List states with a raw (or previously cleaned) land use GeoJSON.
+    Returns:
+        list: Lower-case state names, sorted.
+    """
+    states = set()
+    for pattern in [RAW_PATTERN, FALLBACK_PATTERN]:
+        prefix, suffix = pattern.split("{state}")
+        for path in glob.glob(pattern.format(state="*")):
+            states.add(path[len(prefix):-len(suffix)])
+    return sorted(states)
+
+def load_state_bboxes(states_file=STATES_FILE):
+    """
+    Bounding box of each state outline, keyed by lower-case state name.
+    Returns:
+        dict: state -> (minx, miny, maxx, maxy) in EPSG:4326.
+    """
+    bboxes = {}
+    if os.path.exists(states_file):
+        outlines = gpd.read_file(states_file, engine="pyogrio", columns=["NAME_1"]).to_crs(epsg=4326)
+        for name, bounds in zip(outlines["NAME_1"], outlines.bounds.itertuples(index=False, name=None)):
+            bboxes[name.lower()] = bounds
+    bboxes.update(BBOX_OVERRIDES)
+    return bboxes
+
+def input_path_for(state):
+    """Raw export if present, else the legacy *_landuse_cleaned.geojson."""
+    for pattern in [RAW_PATTERN, FALLBACK_PATTERN]:
+        path = pattern.format(state=state)
+        if os.path.exists(path):
+            return path
+    return None
+
+def clean_state(state, bbox=None):
+    """
+    Clean one state's land use layer in a single vectorized pass and write it to the store.
+    Steps: drop null/empty geometries, repair invalid ones with make_valid, keep
+    polygonal results, keep features intersecting bbox.
+    Args:
+        state (str): Lower-case state name.
+        bbox (tuple): Optional (minx, miny, maxx, maxy) in EPSG:4326.
+    Returns:
+        dict: Per-step feature counts and elapsed seconds.
     """
-    Clean GeoJSON by removing invalid or empty geometries.
+    start = time.perf_counter()
+    input_path = input_path_for(state)
+    if input_path is None:
+        raise FileNotFoundError(f"No land use GeoJSON found for {state}.")
+
+    gdf = gpd.read_file(input_path, engine="pyogrio", use_arrow=True)
+    gdf = gdf.to_crs(epsg=4326)
+    stats = {"state": state, "input": len(gdf)}
+
+    # Remove null and empty geometries
+    geoms = gdf.geometry.values
+    keep = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    gdf = gdf[keep]
+    stats["empty"] = int((~keep).sum())
+
+    # Repair only the invalid geometries; "structure" keeps polygon input polygonal
+    geoms = np.asarray(gdf.geometry.values)
+    invalid = ~shapely.is_valid(geoms)
+    if invalid.any():
+        geoms = geoms.copy()
+        geoms[invalid] = shapely.make_valid(geoms[invalid], method="structure", keep_collapsed=False)
+        gdf = gdf.set_geometry(gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs))
+    stats["repaired"] = int(invalid.sum())
+
+    # Drop anything that collapsed or is not an area
+    keep = gdf.geometry.geom_type.isin(POLYGONAL_TYPES).values & ~shapely.is_empty(gdf.geometry.values)
+    gdf = gdf[keep]
+    stats["non_polygonal"] = int((~keep).sum())
+
+    # Keep features intersecting the state bounds
+    if bbox is not None:
+        index = gdf.sindex.query(shapely.box(*bbox), predicate="intersects")
+        stats["outside_bbox"] = len(gdf) - len(index)
+        gdf = gdf.iloc[np.sort(index)]
+    else:
+        stats["outside_bbox"] = 0
+
+    landuse_store.write_state(gdf, state)
+    stats["output"] = len(gdf)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+def clean_all_states(states, workers=None):
+    """
+    Clean several states, one process per state when workers != 1.
     Args:
-        state (str): State name (e.g., 'lagos').
-        input_path (str): Input GeoJSON path.
-        output_path (str): Output cleaned GeoJSON path.
+        states (list): Lower-case state names.
+        workers (int): Process count; 1 runs sequentially, None uses all cores.
     Returns:
-        int: Number of valid features.
-    """
-    try:
-        gdf = gpd.read_file(input_path)
-        gdf = gdf.to_crs(epsg=4326)
-        
-        # Remove empty geometries
-        initial_count = len(gdf)
-        gdf = gdf[~gdf["geometry"].is_empty]
-        print(f"Removed {initial_count - len(gdf)} empty geometries for {state}.")
-        
-        # Fix invalid geometries
-        gdf["geometry"] = gdf["geometry"].buffer(0)  # Fix self-intersections
-        gdf = gdf[gdf["geometry"].is_valid]
-        print(f"Kept {len(gdf)} valid geometries after fixing for {state}.")
-        
-        # Save cleaned GeoJSON
-        gdf.to_file(output_path, driver="GeoJSON")
-        print(f"Saved cleaned GeoJSON for {state} to {output_path}")
-        
-        return len(gdf)
-    except Exception as e:
-        print(f"Error cleaning {state} GeoJSON: {e}")
-        return 0
+        list: (state, stats or None, error or None) tuples in input order.
+    """
+    bboxes = load_state_bboxes()
+    results = []
+    if workers == 1 or len(states) <= 1:
+        for state in states:
+            try:
+                results.append((state, clean_state(state, bboxes.get(state)), None))
+            except Exception as e:
+                results.append((state, None, e))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(state, pool.submit(clean_state, state, bboxes.get(state))) for state in states]
+        for state, future in futures:
+            try:
+                results.append((state, future.result(), None))
+            except Exception as e:
+                results.append((state, None, e))
+    return results
+
+def main(args):
+    states = args.states or discover_states()
+    if not states:
+        logger.warning("No land use GeoJSON files found.")
+        return
+
+    start = time.perf_counter()
+    with instrumentation.span("clean") as span:
+        results = clean_all_states(states, args.workers)
+        span["rows"] = sum(stats["output"] for _, stats, _ in results if stats)
+    for state, stats, error in results:
+        if error is not None:
+            logger.error("%s: %s", state, error)
+            continue
+        counts = ", ".join(f"{key} {value}" for key, value in stats.items() if key not in ("state", "seconds"))
+        logger.info("%s: %s in %.2fs", state, counts, stats['seconds'], extra=stats)
+    logger.info("Cleaned %s of %s states in %.2fs",
+                sum(1 for _, stats, _ in results if stats), len(states), time.perf_counter() - start)
+    if any(error is not None for _, _, error in results):
+        sys.exit(1)
 
 if __name__ == "__main__":
-    states = ["lagos", "rivers", "benue", "bayelsa"]
-    for state in states:
-        input_file = f"data/{'lagos_landuse_cleaned.geojson' if state == 'lagos' else f'{state}_landuse_cleaned.geojson'}"
-        output_file = f"data/{state}_landuse_cleaned_valid.geojson"
-        if not os.path.exists(input_file):
-            print(f"Input file {input_file} not found.")
-        else:
-            num_features = clean_geojson(state, input_file, output_file)
-            print(f"Processed {num_features} features for {state}.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean land use GeoJSON exports into the GeoParquet store.")
+    parser.add_argument("--states", nargs="+", help="Lower-case state names (default: every state with an export)")
+    parser.add_argument("--workers", type=int, default=None, help="Process count; 1 runs sequentially")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    instrumentation.run(lambda: main(args), args, "clean_geojson", output=str(landuse_store.STORE_DIR))
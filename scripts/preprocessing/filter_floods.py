@@ -1,58 +1,88 @@
 import pandas as pd
 import geopandas as gpd
 from shapely.geometry import Point
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, log  # noqa: E402
+
+logger = logging.getLogger("filter_floods")
 
 # Input and output files
 raw_file = "data/historical_floods_raw.csv"
 shapefile = "data/nigeria_states.geojson"  # Or .shp
 output_file = "data/historical_floods.csv"
 
-try:
-    # Load raw CSV
-    df = pd.read_csv(raw_file, encoding="utf-8", low_memory=False)
-    
-    # Inspect columns
-    print("Columns:", df.columns.tolist())
-    print("Data types:\n", df.dtypes)
-    
-    # Filter for Nigeria
-    df["Country"] = df["Country"].astype(str).fillna("")
-    nigeria_floods = df[df["Country"].str.contains("Nigeria", case=False, na=False)]
-
-    # Create geometry from long/lat
-    nigeria_floods = nigeria_floods[nigeria_floods["long"].notnull() & nigeria_floods["lat"].notnull()]
-    geometry = [Point(xy) for xy in zip(nigeria_floods["long"], nigeria_floods["lat"])]
-    gdf_floods = gpd.GeoDataFrame(nigeria_floods, geometry=geometry, crs="EPSG:4326")
-
-    # Load Nigeria states shapefile
-    gdf_states = gpd.read_file(shapefile)
-    gdf_states = gdf_states.to_crs("EPSG:4326")
-
-    # Spatial join to get state names
-    gdf_joined = gpd.sjoin(gdf_floods, gdf_states, how="left", predicate="intersects")
-    
-    # Select and rename columns
-    columns_map = {
-        "Began": "date",
-        "Country": "country",
-        "NAME_1": "location",  # Adjust to match shapefile's state name column
-        "Severity": "severity"
-    }
-    available_columns = {k: v for k, v in columns_map.items() if k in gdf_joined.columns}
-    filtered_df = gdf_joined[list(available_columns.keys())].copy()
-    filtered_df.rename(columns=available_columns, inplace=True)
-
-    # Standardize data
-    if "location" in filtered_df.columns:
-        filtered_df["location"] = filtered_df["location"].astype(str).fillna("Unknown")
-    if "severity" in filtered_df.columns:
-        filtered_df["severity"] = filtered_df["severity"].astype(str).fillna("Unknown").str.title()
-    if "date" in filtered_df.columns:
-        filtered_df["date"] = pd.to_datetime(filtered_df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
-
-    # Save filtered data
-    filtered_df.to_csv(output_file, index=False)
-    print(f"Filtered floods saved to {output_file}: {len(filtered_df)} records")
-
-except Exception as e:
-    print(f"Error filtering floods: {e}")
\ No newline at end of file
+def filter_floods(raw_file, shapefile, output_file):
+    """
+    Keep the Nigerian records of the raw flood archive and tag each with its state.
+    """
+    try:
+        # Load raw CSV
+        with instrumentation.span("load") as span:
+            df = pd.read_csv(raw_file, encoding="utf-8", low_memory=False)
+            span["rows"] = len(df)
+
+        # Inspect columns
+        logger.debug("Columns: %s", df.columns.tolist())
+        log.preview(logger, "Data types", lambda: df.dtypes.to_frame("dtype"))
+
+        # Filter for Nigeria
+        df["Country"] = df["Country"].astype(str).fillna("")
+        nigeria_floods = df[df["Country"].str.contains("Nigeria", case=False, na=False)]
+
+        # Create geometry from long/lat
+        nigeria_floods = nigeria_floods[nigeria_floods["long"].notnull() & nigeria_floods["lat"].notnull()]
+        geometry = [Point(xy) for xy in zip(nigeria_floods["long"], nigeria_floods["lat"])]
+        gdf_floods = gpd.GeoDataFrame(nigeria_floods, geometry=geometry, crs="EPSG:4326")
+
+        # Load Nigeria states shapefile
+        with instrumentation.span("load_states"):
+            gdf_states = gpd.read_file(shapefile)
+            gdf_states = gdf_states.to_crs("EPSG:4326")
+
+        # Spatial join to get state names
+        with instrumentation.span("join") as span:
+            gdf_joined = gpd.sjoin(gdf_floods, gdf_states, how="left", predicate="intersects")
+            span["rows"] = len(gdf_joined)
+
+        # Select and rename columns
+        columns_map = {
+            "Began": "date",
+            "Country": "country",
+            "NAME_1": "location",  # Adjust to match shapefile's state name column
+            "Severity": "severity"
+        }
+        available_columns = {k: v for k, v in columns_map.items() if k in gdf_joined.columns}
+        filtered_df = gdf_joined[list(available_columns.keys())].copy()
+        filtered_df.rename(columns=available_columns, inplace=True)
+
+        # Standardize data
+        if "location" in filtered_df.columns:
+            filtered_df["location"] = filtered_df["location"].astype(str).fillna("Unknown")
+        if "severity" in filtered_df.columns:
+            filtered_df["severity"] = filtered_df["severity"].astype(str).fillna("Unknown").str.title()
+        if "date" in filtered_df.columns:
+            filtered_df["date"] = pd.to_datetime(filtered_df["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+
+        # Save filtered data
+        with instrumentation.span("write") as span:
+            filtered_df.to_csv(output_file, index=False)
+            span["rows"] = len(filtered_df)
+        logger.info("Filtered floods saved to %s: %d records", output_file, len(filtered_df))
+
+    except Exception as e:
+        logger.error("Error filtering floods: %s", e)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter the raw flood archive to Nigeria and tag each record's state.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    instrumentation.run(lambda: filter_floods(raw_file, shapefile, output_file), args, "filter_floods",
+                        output=output_file)
@@ -0,0 +1,63 @@
+import shapely
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, landuse_store, locations, log, spatialite  # noqa: E402
+
+logger = logging.getLogger("load_landuse_spatialite")
+
+def load_landuse_spatialite(db_path, states=None):
+    """
+    Load cleaned land use polygons from the GeoParquet store into the Spatialite land_use table.
+    Args:
+        db_path (str): SQLite database path.
+        states (list): Lower-case state names; defaults to every state in the store.
+    """
+    try:
+        conn = spatialite.connect(db_path)
+    except spatialite.SpatialiteUnavailable as e:
+        logger.error("Error: %s", e)
+        return
+
+    try:
+        spatialite.create_land_use_table(conn)
+        if states is None:
+            states = landuse_store.available_states()
+        for state in states:
+            start = time.perf_counter()
+            with instrumentation.span("load") as span:
+                gdf = landuse_store.read_state(state, columns=["landuse"])
+                span["rows"] = len(gdf)
+            # Areas in metres from the state's UTM zone, same as extract_landuse_features
+            areas = gdf.geometry.to_crs(gdf.estimate_utm_crs()).area
+            rows = zip(gdf["landuse"].tolist(), areas.tolist(), shapely.to_wkb(gdf.geometry.values))
+            with instrumentation.span("write") as span:
+                count = spatialite.replace_state_features(conn, locations.get(state)["name"], rows)
+                conn.commit()
+                span["rows"] = count
+            logger.info("Loaded %s land use features for %s in %.2fs", count, state, time.perf_counter() - start)
+
+        # Refresh planner statistics for the new rows
+        conn.execute("ANALYZE;")
+        conn.commit()
+        log.preview(logger, "Land use area preview", lambda: spatialite.area_by_landuse(conn).head())
+    except Exception as e:
+        logger.error("Error: %s", e)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load land use polygons into the Spatialite land_use table.")
+    parser.add_argument("--states", nargs="+", help="Lower-case state names (default: every state in the store)")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    db_file = "data/flood_data.db"
+    instrumentation.run(lambda: load_landuse_spatialite(db_file, args.states), args, "load_landuse_spatialite",
+                        output="db:land_use")
@@ -1,187 +1,211 @@
 import pandas as pd
 from sqlalchemy import create_engine
 import numpy as np
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import feature_store, instrumentation, locations, log, schemas  # noqa: E402
+
+logger = logging.getLogger("merge_features")
 
 # Enable future pandas behavior
 pd.set_option('future.no_silent_downcasting', True)
 
-def find_closest_weather_date(target_date, city, weather):
-    """Find the closest weather window_start_date for a city."""
-    try:
-        target_date = pd.to_datetime(target_date, errors='coerce')
-        if pd.isna(target_date):
-            print(f"Invalid target date for {city}: {target_date}")
-            return None
-        city_weather = weather[weather["city"] == city]
-        if city_weather.empty:
-            print(f"No weather data for city: {city}")
-            return None
-        weather_dates = pd.to_datetime(city_weather["window_start_date"], errors='coerce').dropna()
-        if len(weather_dates) == 0:
-            print(f"No valid weather dates for city: {city}")
-            return None
-        diff = np.abs((weather_dates - target_date).dt.days)
-        idx = diff.idxmin()
-        closest_date = weather_dates.loc[idx]
-        print(f"Closest date for {target_date} in {city}: {closest_date} ({diff.loc[idx]} days)")
-        return closest_date
-    except Exception as e:
-        print(f"Error in find_closest_weather_date for {target_date}, {city}: {e}")
-        return None
+WEATHER_COLUMNS = ["avg_precipitation_7d", "avg_temperature_7d", "avg_humidity_7d", "avg_precipitation_30d"]
+SENTINEL_WINDOWS = (7, 30, 90)
+
+def build_static_features(engine):
+    """
+    Per-state features that do not change with the event date, one row per location.
+    Args:
+        engine: SQLAlchemy engine.
+    Returns:
+        pd.DataFrame: location and area_<landuse> columns.
+    """
+    # Socioeconomic: land use area per state
+    socio = schemas.read_sql("SELECT state, landuse_type, area_sqm FROM socioeconomic;", engine, "socioeconomic")
+    static = socio.pivot(index="state", columns="landuse_type", values="area_sqm").fillna(0)
+    static.columns = [f"area_{col.lower().replace(' ', '_')}" for col in static.columns]
+    static.index = static.index.str.lower()
+    static.index.name = feature_store.KEY
+    return static.reset_index()
+
+def load_sentinel_images(engine):
+    """
+    Sentinel images per region and day, with a running total per region.
+    Depends on the migrate_location_names stage: regions are matched to event
+    locations by canonical state name, and rows still stored under a city alias
+    ("Port Harcourt", ...) match no event, so they are reported here.
+    Dates are epoch milliseconds, stored as integers or text, parsed through the
+    sentinel_metadata schema.
+    Args:
+        engine: SQLAlchemy engine.
+    Returns:
+        pd.DataFrame: region (lower-case state name), day and cumulative_images, sorted by day.
+    """
+    images = schemas.read_sql("SELECT image_id, date, region FROM sentinel_metadata;", engine, "sentinel_metadata")
+    # One image can cover two states' search boxes; count it for each
+    images = images.drop_duplicates(subset=["image_id", "region"])
+    images["day"] = images["date"].dt.normalize()
+    images = images.dropna(subset=["day", "region"])
+    images["region"] = images["region"].str.lower()
+    unknown = sorted(set(images["region"]) - set(locations.slugs()))
+    if unknown:
+        logger.warning("Sentinel regions outside the location registry match no event; "
+                       "run scripts/preprocessing/migrate_location_names.py: %s", ", ".join(unknown))
+    daily = images.groupby(["region", "day"]).size().rename("images").reset_index()
+    daily["cumulative_images"] = daily.groupby("region")["images"].cumsum()
+    return daily[["region", "day", "cumulative_images"]].sort_values("day", ignore_index=True)
 
-def merge_features(db_path, train_path, test_path, output_train, output_test):
-    """Merge socioeconomic, Sentinel, and weather features with train/test data."""
+def attach_sentinel_counts(df, daily, windows=SENTINEL_WINDOWS):
+    """
+    Count Sentinel images over the region in the N days before each row's date.
+    Each window is the difference of two as-of lookups into the per-region running
+    total, so the schema is one images_<N>d column per window however long the archive.
+    Args:
+        df (pd.DataFrame): Rows with location and date (datetime) columns.
+        daily (pd.DataFrame): Output of load_sentinel_images.
+        windows (tuple): Window lengths in days.
+    Returns:
+        pd.DataFrame: df with images_<N>d columns, in the original row order.
+    """
+    def images_before(days):
+        # Running total up to, not including, each day; 0 before the first image
+        lookup = pd.DataFrame({"_row": np.arange(len(df)), "location": df["location"].to_numpy(), "day": days})
+        lookup = lookup[lookup["day"].notna()].sort_values("day")
+        matched = pd.merge_asof(
+            lookup, daily, on="day", left_by="location", right_by="region",
+            direction="backward", allow_exact_matches=False
+        )
+        counts = np.full(len(df), np.nan)
+        counts[matched["_row"].to_numpy()] = matched["cumulative_images"].fillna(0).to_numpy()
+        return counts
+
+    df = df.reset_index(drop=True)
+    # merge_asof needs both keys at the same datetime resolution
+    daily = daily.astype({"day": "datetime64[ns]"})
+    days = df["date"].dt.normalize().astype("datetime64[ns]")
+    before_date = images_before(days)
+    for window in windows:
+        df[f"images_{window}d"] = before_date - images_before(days - pd.Timedelta(days=window))
+    return df
+
+def attach_weather(df, weather):
+    """
+    Attach the weather window nearest to each row's date for its location, falling
+    back to the location's mean weather where no dated window matches.
+    Args:
+        df (pd.DataFrame): Rows with location and date (datetime) columns.
+        weather (pd.DataFrame): city, window_start_date and WEATHER_COLUMNS.
+    Returns:
+        pd.DataFrame: df with WEATHER_COLUMNS, in the original row order.
+    """
+    df = df.drop(columns=WEATHER_COLUMNS, errors='ignore').reset_index(drop=True)
+    df["_row"] = np.arange(len(df))
+    windows = (weather.dropna(subset=["window_start_date"])
+               .drop_duplicates(subset=["city", "window_start_date"])
+               .sort_values("window_start_date"))
+
+    # Nearest window per location in one sorted pass instead of a per-row scan
+    dated = df["date"].notna()
+    matched = pd.merge_asof(
+        df[dated].sort_values("date"),
+        windows[["city", "window_start_date"] + WEATHER_COLUMNS],
+        left_on="date", right_on="window_start_date",
+        left_by="location", right_by="city",
+        direction="nearest"
+    ).drop(columns=["city", "window_start_date"])
+    df = pd.concat([matched, df[~dated]], ignore_index=True).sort_values("_row").drop(columns=["_row"])
+    df = df.reset_index(drop=True)
+
+    # Fallback: mean weather features per city
+    weather_means = weather.groupby("city")[WEATHER_COLUMNS].mean()
+    for col in WEATHER_COLUMNS:
+        df[col] = df[col].fillna(df["location"].map(weather_means[col]))
+    return df
+
+def merge_features(db_path, train_path, test_path, materialize_paths=None):
+    """
+    Build the feature store: static per-state features once, and train/test event
+    rows with date-matched weather features and rolling Sentinel image counts.
+    Args:
+        db_path (str): SQLite database path.
+        train_path (str): Train split CSV.
+        test_path (str): Test split CSV.
+        materialize_paths (dict): Optional {"train": csv, "test": csv} for the legacy
+            fully joined matrices.
+    """
     try:
         engine = create_engine(f"sqlite:///{db_path}")
-        
-        # Load socioeconomic features
-        socio = pd.read_sql("SELECT state, landuse_type, area_sqm FROM socioeconomic;", engine)
-        print("Socioeconomic Preview:\n", socio.head())
-        socio_pivot = socio.pivot(index="state", columns="landuse_type", values="area_sqm").fillna(0)
-        socio_pivot.columns = [f"area_{col.lower().replace(' ', '_')}" for col in socio_pivot.columns]
-        socio_pivot.reset_index(inplace=True)
-        socio_pivot["state"] = socio_pivot["state"].str.lower()
-        print("Socioeconomic Pivot Preview:\n", socio_pivot.head())
-        
-        # Load Sentinel features
-        sentinel = pd.read_sql("SELECT region, week_start_date, image_count FROM sentinel_features;", engine)
-        print("Sentinel Preview:\n", sentinel.head())
-        sentinel_pivot = sentinel.pivot(index="region", columns="week_start_date", values="image_count").fillna(0)
-        sentinel_pivot.columns = [f"images_{col}" for col in sentinel_pivot.columns]
-        sentinel_pivot.reset_index(inplace=True)
-        sentinel_pivot["region"] = sentinel_pivot["region"].str.lower()
-        print("Sentinel Pivot Preview:\n", sentinel_pivot.head())
-        
-        # Load weather features
-        weather = pd.read_sql("SELECT city, window_start_date, avg_precipitation_7d, avg_temperature_7d, avg_humidity_7d, avg_precipitation_30d FROM weather_features;", engine)
-        print("Weather Preview:\n", weather.head())
-        weather["city"] = weather["city"].str.lower()
-        weather["window_start_date"] = pd.to_datetime(weather["window_start_date"], errors='coerce')
-        print("Unique Weather Cities:", weather["city"].unique())
-        print("Unique Weather Dates:", weather["window_start_date"].dropna().unique())
-        
-        # Compute mean weather features per city
-        weather_means = weather.groupby("city")[["avg_precipitation_7d", "avg_temperature_7d", "avg_humidity_7d", "avg_precipitation_30d"]].mean().reset_index()
-        print("Weather Means Preview:\n", weather_means)
-        
-        # Load train/test data
-        train_df = pd.read_csv(train_path)
-        test_df = pd.read_csv(test_path)
-        print("Train Preview:\n", train_df[["date", "location", "severity"]].head())
-        print("Test Preview:\n", test_df[["date", "location", "severity"]].head())
-        train_df["location"] = train_df["location"].str.lower()
-        test_df["location"] = test_df["location"].str.lower()
-        train_df["date"] = pd.to_datetime(train_df["date"], errors='coerce')
-        test_df["date"] = pd.to_datetime(test_df["date"], errors='coerce')
-        print("Unique Train Locations:", train_df["location"].unique())
-        
-        # Merge socioeconomic and sentinel
-        for df, df_type in [(train_df, "train_df"), (test_df, "test_df")]:
-            # Merge socioeconomic
-            merged_df = df.merge(socio_pivot, left_on="location", right_on="state", how="left")
-            merged_df.drop(columns=["state"], errors='ignore', inplace=True)
-            # Merge Sentinel
-            merged_df = merged_df.merge(sentinel_pivot, left_on="location", right_on="region", how="left")
-            merged_df.drop(columns=["region"], errors='ignore', inplace=True)
-            # Update original DataFrame
-            if df_type == "train_df":
-                train_df = merged_df
-            else:
-                test_df = merged_df
-            print(f"{df_type} After Socio/Sentinel Merge:\n", train_df[["date", "location", "area_residential", "images_2025-06-02"]].head())
-        
-        # Weather columns to merge
-        weather_columns = ["avg_precipitation_7d", "avg_temperature_7d", "avg_humidity_7d", "avg_precipitation_30d"]
-        
-        # Merge weather for train and test
-        for df, df_type in [(train_df, "train_df"), (test_df, "test_df")]:
-            # Compute closest weather date
-            df["closest_weather_date"] = df.apply(
-                lambda row: find_closest_weather_date(row["date"], row["location"], weather), axis=1
-            )
-            print(f"Sample Closest Dates for {df_type}:\n", df[["date", "location", "closest_weather_date"]].head())
-            
-            # Initialize weather columns
-            for col in weather_columns:
-                df[col] = np.nan
-            
-            # Date-based merge
-            if df["closest_weather_date"].notna().any():
-                merge_df = df.merge(
-                    weather[["city", "window_start_date"] + weather_columns],
-                    left_on=["location", "closest_weather_date"],
-                    right_on=["city", "window_start_date"],
-                    how="left",
-                    suffixes=('', '_weather')
-                )
-                # Update weather columns with merged values
-                for col in weather_columns:
-                    df[col] = merge_df[col].fillna(df[col])
-                # Drop merge artifacts
-                df.drop(columns=["window_start_date", "city"], errors='ignore', inplace=True)
-            else:
-                print(f"No valid closest_weather_date for {df_type}, skipping date-based merge")
-            print(f"{df_type} After Date-Based Weather Merge:\n", df[["date", "location"] + weather_columns].head())
-            
-            # Fallback: Merge mean weather features
-            merge_df = df.merge(
-                weather_means[["city"] + weather_columns],
-                left_on="location",
-                right_on="city",
-                how="left",
-                suffixes=('', '_mean')
+
+        with instrumentation.span("load") as span:
+            static = build_static_features(engine)
+            daily_images = load_sentinel_images(engine)
+            weather = schemas.read_sql(
+                f"SELECT city, window_start_date, {', '.join(WEATHER_COLUMNS)} FROM weather_features;", engine,
+                "weather_features", dtype=dict.fromkeys(WEATHER_COLUMNS, "float64")
             )
-            # Fill NaNs with mean values
-            for col in weather_columns:
-                df[col] = df[col].fillna(merge_df[f"{col}_mean"])
-                df.drop(columns=[f"{col}_mean"], errors='ignore', inplace=True)
-            df.drop(columns=["city"], errors='ignore', inplace=True)
-            print(f"{df_type} After Fallback Weather Merge:\n", df[["date", "location"] + weather_columns].head())
-            
-            # Drop closest_weather_date
-            df.drop(columns=["closest_weather_date"], errors='ignore', inplace=True)
-            
-            # Validate weather columns
-            print(f"{df_type} Weather Validation After Merge:\n", df[weather_columns].describe())
-        
-        # Final cleanup
-        for df, df_type in [(train_df, "train_df"), (test_df, "test_df")]:
-            # Drop any residual merge artifacts
-            columns_to_drop = [col for col in ["city_x", "city_y", "state", "region", "window_start_date", "closest_weather_date"] if col in df.columns]
-            if columns_to_drop:
-                df.drop(columns=columns_to_drop, inplace=True)
-                print(f"Dropped residual columns in {df_type}: {columns_to_drop}")
-            # Fill NaNs for non-weather columns
-            non_weather_columns = [col for col in df.columns if col not in weather_columns]
-            df[non_weather_columns] = df[non_weather_columns].fillna(0)
-            # Ensure weather columns exist
-            for col in weather_columns:
-                if col not in df.columns:
-                    df[col] = np.nan
-            print(f"{df_type} Final Columns ({len(df.columns)}):", df.columns.tolist())
-            print(f"{df_type} Final Weather Validation:\n", df[weather_columns].describe())
-        
-        # Save output
-        train_df.to_csv(output_train, index=False)
-        test_df.to_csv(output_test, index=False)
-        print(f"Saved train features to {output_train}")
-        print(f"Saved test features to {output_test}")
-        
-        # Final preview
-        print("Train Features Preview:\n", train_df.head())
-        print("Test Features Preview:\n", test_df.head())
-        print("Train Columns:", train_df.columns.tolist())
-        print("Test Columns:", test_df.columns.tolist())
-        
+            span["rows"] = len(static) + len(daily_images) + len(weather)
+        with instrumentation.span("write"):
+            feature_store.write_static(static)
+        logger.info("Static features: %s locations x %s features -> %s",
+                    len(static), static.shape[1] - 1, feature_store.STATIC_PATH)
+
+        weather["city"] = weather["city"].str.lower()
+
+        for split, path in [("train", train_path), ("test", test_path)]:
+            df = schemas.read_csv(path, "flood_events")
+            df["location"] = df["location"].str.lower()
+
+            with instrumentation.span("transform") as span:
+                events = attach_weather(df, weather)
+                events = attach_sentinel_counts(events, daily_images)
+                # Fill NaNs for non-weather numeric columns (labels stay categorical, unparseable dates NaT)
+                non_weather_columns = [col for col in events.select_dtypes("number").columns
+                                       if col not in WEATHER_COLUMNS]
+                events[non_weather_columns] = events[non_weather_columns].fillna(0)
+                span["rows"] = len(events)
+            with instrumentation.span("write") as span:
+                feature_store.write_events(events, split)
+                span["rows"] = len(events)
+
+            logger.info("%s: %s rows, %s event columns + %s static features -> %s",
+                        split, len(events), events.shape[1], static.shape[1] - 1, feature_store.events_path(split))
+            log.preview(logger, f"{split} weather validation", lambda: events[WEATHER_COLUMNS].describe())
+
+            # The joined matrix is only built when it is written or its size is logged
+            if materialize_paths or logger.isEnabledFor(logging.DEBUG):
+                matrix = feature_store.join_static(events, static)
+                stored_bytes = events.memory_usage(deep=True).sum() + static.memory_usage(deep=True).sum()
+                logger.debug("%s: stored %.1f KiB vs materialized %.1f KiB", split, stored_bytes / 1024,
+                             matrix.memory_usage(deep=True).sum() / 1024)
+            if materialize_paths:
+                matrix.to_csv(materialize_paths[split], index=False)
+                logger.info("Saved materialized %s features to %s", split, materialize_paths[split])
+
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error("Error: %s", e)
         raise
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the feature store from the database and train/test splits.")
+    parser.add_argument("--materialize", action="store_true",
+                        help="Also write the fully joined train/test CSVs")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
     db_file = "data/flood_data.db"
     train_file = "data/train_data.csv"
     test_file = "data/test_data.csv"
-    output_train = "data/train_data_with_features.csv"
-    output_test = "data/test_data_with_features.csv"
-    
-    merge_features(db_file, train_file, test_file, output_train, output_test)
+    materialize_paths = None
+    if args.materialize:
+        materialize_paths = {"train": "data/train_data_with_features.csv",
+                             "test": "data/test_data_with_features.csv"}
+
+    instrumentation.run(lambda: merge_features(db_file, train_file, test_file, materialize_paths),
+                        args, "merge_features", output=str(feature_store.STORE_DIR))
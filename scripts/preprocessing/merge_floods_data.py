@@ -1,45 +1,76 @@
 import pandas as pd
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, log, schemas  # noqa: E402
+
+logger = logging.getLogger("merge_floods_data")
 
 # Input and output files
 dartmouth_file = "data/historical_floods.csv"
 gfm_file = "data/gfm_floods.csv"
 output_file = "data/historical_floods_merged.csv"
 
-try:
-    # Load datasets
-    dartmouth_df = pd.read_csv(dartmouth_file)
-    gfm_df = pd.read_csv(gfm_file)
-
-    # Standardize columns
-    dartmouth_df = dartmouth_df[["date", "country", "location", "severity"]].copy()
-    gfm_df = gfm_df[["date", "country", "location", "severity"]].copy()
-
-    # Normalize severity
-    severity_map = {
-        "Low": "Low",
-        "Medium": "Medium",
-        "High": "High",
-        "Moderate": "Medium",  # Map GFM's Moderate to Medium
-        "Unknown": "Unknown"
-    }
-    dartmouth_df["severity"] = dartmouth_df["severity"].map(severity_map).fillna("Unknown")
-    gfm_df["severity"] = gfm_df["severity"].map(severity_map).fillna("Unknown")
-
-    # Concatenate
-    merged_df = pd.concat([dartmouth_df, gfm_df], ignore_index=True)
-
-    # Remove duplicates (same date and location)
-    merged_df.drop_duplicates(subset=["date", "location"], keep="first", inplace=True)
-
-    # Save
-    merged_df.to_csv(output_file, index=False)
-    print(f"Merged floods saved to {output_file}: {len(merged_df)} records")
-
-    # Summarize
-    merged_df["date"] = pd.to_datetime(merged_df["date"], errors="coerce")
-    merged_df["year"] = merged_df["date"].dt.year
-    print("\nMerged Floods by Year:\n", merged_df["year"].value_counts().sort_index())
-    print("\nMerged Floods by State:\n", merged_df["location"].value_counts())
-
-except Exception as e:
-    print(f"Error merging floods: {e}")
\ No newline at end of file
+def merge_floods_data(dartmouth_file, gfm_file, output_file):
+    """
+    Combine Dartmouth and GFM flood records, normalizing severity and dropping duplicate (date, location) rows.
+    Args:
+        dartmouth_file (str): Filtered Dartmouth CSV.
+        gfm_file (str): Processed GFM CSV.
+        output_file (str): Output CSV path.
+    """
+    try:
+        # Load datasets
+        with instrumentation.span("load") as span:
+            dartmouth_df = schemas.read_csv(dartmouth_file, "flood_events")
+            gfm_df = schemas.read_csv(gfm_file, "flood_events")
+            span["rows"] = len(dartmouth_df) + len(gfm_df)
+
+        # Standardize columns (coordinates are kept when the source has them)
+        columns = ["date", "country", "location", "severity", "latitude", "longitude"]
+        dartmouth_df = dartmouth_df[[col for col in columns if col in dartmouth_df.columns]].copy()
+        gfm_df = gfm_df[[col for col in columns if col in gfm_df.columns]].copy()
+
+        # Normalize severity
+        severity_map = {
+            "Low": "Low",
+            "Medium": "Medium",
+            "High": "High",
+            "Moderate": "Medium",  # Map GFM's Moderate to Medium
+            "Unknown": "Unknown"
+        }
+        dartmouth_df["severity"] = schemas.map_labels(dartmouth_df["severity"], severity_map, "Unknown")
+        gfm_df["severity"] = schemas.map_labels(gfm_df["severity"], severity_map, "Unknown")
+
+        # Concatenate
+        merged_df = pd.concat([dartmouth_df, gfm_df], ignore_index=True)
+
+        # Remove duplicates (same date and location)
+        merged_df.drop_duplicates(subset=["date", "location"], keep="first", inplace=True)
+
+        # Save
+        with instrumentation.span("write") as span:
+            merged_df.to_csv(output_file, index=False)
+            span["rows"] = len(merged_df)
+        logger.info("Merged floods saved to %s: %s records", output_file, len(merged_df))
+
+        # Summarize
+        log.preview(logger, "Merged floods by year",
+                    lambda: merged_df["date"].dt.year.value_counts().sort_index())
+        log.preview(logger, "Merged floods by state", lambda: merged_df["location"].value_counts())
+
+    except Exception as e:
+        logger.error("Error merging floods: %s", e)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge Dartmouth and GFM flood records.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    instrumentation.run(lambda: merge_floods_data(dartmouth_file, gfm_file, output_file),
+                        args, "merge_floods_data", output=output_file)
@@ -0,0 +1,62 @@
+import argparse
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, locations, log, weather_store  # noqa: E402
+
+logger = logging.getLogger("migrate_location_names")
+
+# Tables storing a location name: (name column, columns identifying a row with it)
+NAME_COLUMNS = {
+    "weather": ("city", ["timestamp"]),
+    "sentinel_metadata": ("region", ["image_id"]),
+    "weather_features": ("city", ["window_start_date"]),
+    "sentinel_features": ("region", ["week_start_date"])
+}
+
+def migrate_location_names(db_path):
+    """
+    Rewrite location names stored under a registry alias (e.g. "Port Harcourt"
+    from before the location registry) to the canonical state name, so readers
+    join on the name directly. Weather timestamps are normalized first (once per
+    database, see weather_store.migrate_timestamps) so renamed rows compare
+    like with like. Running it again changes nothing.
+    Args:
+        db_path (str): SQLite database path.
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+        with instrumentation.span("migrate") as span:
+            changed = weather_store.migrate_timestamps(conn)
+            if changed:
+                logger.info("weather.timestamp: %s timestamps normalized", changed)
+            for table, (column, keys) in NAME_COLUMNS.items():
+                if table not in tables:
+                    continue
+                renamed, dropped = locations.canonicalize_table(conn, table, column, keys)
+                if renamed or dropped:
+                    logger.info("%s.%s: %s rows renamed, %s already stored under the canonical name dropped",
+                                table, column, renamed, dropped)
+                changed += renamed + dropped
+            conn.commit()
+            span["rows"] = changed
+        conn.close()
+        logger.info("Location names migrated: %s rows changed", changed)
+    except Exception as e:
+        logger.error("Error: %s", e)
+        raise
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite stored location aliases to the registry's canonical names.")
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    db_file = "data/flood_data.db"
+    instrumentation.run(lambda: migrate_location_names(db_file), args, "migrate_location_names",
+                        output="db:weather")
@@ -1,79 +1,216 @@
+import numpy as np
 import pandas as pd
 import sqlite3
-from sklearn.preprocessing import MinMaxScaler
 from sklearn.model_selection import train_test_split
+import argparse
+import logging
+import sys
+from pathlib import Path
 
-conn = sqlite3.connect("data/flood_data.db")
-
-try:
-    weather_df = pd.read_sql("SELECT * FROM weather", conn)
-    flood_df = pd.read_sql("SELECT * FROM historical_floods", conn)
-
-    print("Weather Data Sample:\n", weather_df.head())
-    print(f"Weather Records: {len(weather_df)}")
-    print("Weather Cities:", ", ".join(weather_df["city"].unique()))
-    print(f"Weather Date Range: {weather_df['timestamp'].min()} to {weather_df['timestamp'].max()}")
-
-    print("\nFlood Data Sample:\n", flood_df.head())
-    print(f"Flood Records: {len(flood_df)}")
-    print("Flood Locations:", ", ".join(flood_df["location"].unique()))
-    print(f"Flood Date Range: {flood_df['date'].min()} to {flood_df['date'].max()}")
-
-    # Standardize dates and cities
-    weather_df["timestamp"] = pd.to_datetime(weather_df["timestamp"], errors="coerce").dt.date
-    flood_df["date"] = pd.to_datetime(flood_df["date"], errors="coerce").dt.date
-    weather_df["city"] = weather_df["city"].replace({
-        "Port Harcourt": "Rivers",
-        "Makurdi": "Benue",
-        "Yenagoa": "Bayelsa"
-    })
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation, log, schemas, transforms, weather_store  # noqa: E402
+
+logger = logging.getLogger("preprocess_data")
+
+START_DATE = "2014-01-01"
+NEGATIVE_RATIO = 1.0
+NEGATIVE_SAMPLES_TABLE = "negative_samples"
+
+def load_flood_weather(conn, start_date=START_DATE, table="historical_floods"):
+    """
+    Events from start_date with the mean of their same-day weather readings.
+    The join runs in SQLite as range lookups on the weather (city, timestamp)
+    index, so only matching readings leave the database. Weather is stored
+    under the canonical location name (see migrate_location_names.py).
+    Args:
+        conn: sqlite3 connection.
+        start_date (str): First event date kept (YYYY-MM-DD).
+        table (str): Event table with date and location columns.
+    Returns:
+        pd.DataFrame: The table's columns plus temperature, humidity and
+            precipitation (NaN where no reading matched).
+    """
+    weather_store.create_weather_table(conn)
+    query = f"""
+        WITH floods AS (
+            SELECT rowid AS event_id, date(date) AS day, * FROM {table} WHERE date(date) >= ?
+        )
+        SELECT floods.*,
+               AVG(w.temperature) AS temperature,
+               AVG(w.humidity) AS humidity,
+               AVG(w.precipitation) AS precipitation
+        FROM floods
+        LEFT JOIN {weather_store.WEATHER_TABLE} w
+            ON w.city = floods.location
+            AND w.timestamp >= floods.day AND w.timestamp < date(floods.day, '+1 day')
+        GROUP BY floods.event_id
+        ORDER BY floods.event_id;
+    """
+    data = pd.read_sql(query, conn, params=[start_date])
+    data["date"] = data.pop("day")
+    return data.drop(columns=["event_id"])
+
+def to_day_numbers(values):
+    """Dates (strings or datetimes) as int64 days since 1970-01-01."""
+    return pd.to_datetime(values).to_numpy().astype("datetime64[D]").astype(np.int64)
 
-    # Filter floods to 2014–2023
-    flood_df = flood_df[flood_df["date"] >= pd.to_datetime("2014-01-01").date()]
-    print(f"Filtered Flood Records (2014–2023): {len(flood_df)}")
-
-    # Merge
-    data = flood_df.merge(
-        weather_df,
-        left_on=["location", "date"],
-        right_on=["city", "timestamp"],
-        how="left"
-    )
-    data["severity"] = data["severity"].fillna("No Flood")
-    print(f"\nMerged Records: {len(data)}")
-    print("Merged Data Sample:\n", data.head())
-
-    # Impute missing weather data
-    data[["temperature", "humidity", "precipitation"]] = data[["temperature", "humidity", "precipitation"]].fillna({
-        "temperature": 25.0,  # Average for Nigeria
-        "humidity": 80.0,
-        "precipitation": 0.0
+def load_calendar(conn, start_date=START_DATE):
+    """
+    Days each location has weather for, from start_date.
+    Only the (city, timestamp) index is read.
+    Returns:
+        pd.DataFrame: location, first_day, last_day (inclusive, days since epoch).
+    """
+    spans = pd.read_sql(f"""
+        SELECT city AS location, MIN(timestamp) AS first_timestamp, MAX(timestamp) AS last_timestamp
+        FROM {weather_store.WEATHER_TABLE} GROUP BY city;
+    """, conn)
+    calendar = pd.DataFrame({
+        "location": spans["location"],
+        "first_day": np.maximum(to_day_numbers(spans["first_timestamp"]), to_day_numbers([start_date])[0]),
+        "last_day": to_day_numbers(spans["last_timestamp"])
     })
+    return calendar[calendar["first_day"] <= calendar["last_day"]]
+
+def sample_negative_days(calendar, flood_days, ratio=NEGATIVE_RATIO, buffer_days=0, seed=42):
+    """
+    Sample (location, day) pairs with no flood, one location at a time.
+    Each location's calendar is enumerated as an integer day range and marked
+    against its sorted flood days with searchsorted, so memory stays at one
+    location's calendar however many locations there are.
+    Args:
+        calendar (pd.DataFrame): location, first_day, last_day (days since epoch, inclusive).
+        flood_days (pd.DataFrame): location, day (days since epoch).
+        ratio (float): Negatives drawn per flood day of the location inside its calendar.
+        buffer_days (int): Also skip days within this many days of a flood.
+        seed (int): Random seed.
+    Yields:
+        pd.DataFrame: location and day (days since epoch, sorted) for one location.
+    """
+    rng = np.random.default_rng(seed)
+    flooded_by_location = {
+        location: np.unique(days.to_numpy()) for location, days in flood_days.groupby("location", sort=False)["day"]
+    }
+    no_floods = np.empty(0, dtype=np.int64)
+    for location, first_day, last_day in calendar[["location", "first_day", "last_day"]].itertuples(index=False):
+        flooded = flooded_by_location.get(location, no_floods)
+        flooded = flooded[(flooded >= first_day) & (flooded <= last_day)]
+        n_samples = int(round(ratio * len(flooded)))
+        if n_samples == 0:
+            continue
+
+        days = np.arange(first_day, last_day + 1, dtype=np.int64)
+        # Distance to the nearest flood day on either side via the insertion point
+        position = np.searchsorted(flooded, days)
+        next_gap = flooded[np.minimum(position, len(flooded) - 1)] - days
+        previous_gap = days - flooded[np.maximum(position - 1, 0)]
+        near_flood = (((position < len(flooded)) & (next_gap <= buffer_days))
+                      | ((position > 0) & (previous_gap <= buffer_days)))
+        candidates = days[~near_flood]
+
+        chosen = rng.choice(len(candidates), size=min(n_samples, len(candidates)), replace=False)
+        yield pd.DataFrame({"location": location, "day": np.sort(candidates[chosen])})
+
+def write_negative_samples(conn, ratio=NEGATIVE_RATIO, buffer_days=0, seed=42, start_date=START_DATE):
+    """
+    Sample "No Flood" days over the weather calendar into a temporary table.
+    Returns:
+        int: Rows written to NEGATIVE_SAMPLES_TABLE.
+    """
+    calendar = load_calendar(conn, start_date)
+    flood_days = pd.read_sql("SELECT location, date(date) AS day FROM historical_floods WHERE date(date) >= ?",
+                             conn, params=[start_date])
+    flood_days["day"] = to_day_numbers(flood_days["day"])
+
+    conn.execute(f"DROP TABLE IF EXISTS temp.{NEGATIVE_SAMPLES_TABLE};")
+    conn.execute(f"CREATE TEMP TABLE {NEGATIVE_SAMPLES_TABLE} (date TEXT, location TEXT, severity TEXT, country TEXT);")
+    written = 0
+    for samples in sample_negative_days(calendar, flood_days, ratio, buffer_days, seed):
+        dates = samples["day"].to_numpy().astype("datetime64[D]").astype(str)
+        conn.executemany(f"INSERT INTO {NEGATIVE_SAMPLES_TABLE} VALUES (?, ?, 'No Flood', 'Nigeria');",
+                         zip(dates.tolist(), samples["location"].tolist()))
+        written += len(samples)
+    return written
+
+def preprocess_data(db_path, train_path, test_path, transform_path=transforms.TRANSFORM_PATH,
+                    negative_ratio=NEGATIVE_RATIO, buffer_days=0, seed=42):
+    """
+    Join flood events to same-day weather, split train/test and scale weather features.
+    The weather transform is fitted on the training split only and saved to
+    transform_path for the backend and later scoring.
+    Args:
+        db_path (str): SQLite database path.
+        train_path (str): Output train CSV.
+        test_path (str): Output test CSV.
+        transform_path (str): Output path of the fitted WeatherTransform.
+        negative_ratio (float): "No Flood" days sampled per flood day and location; 0 disables.
+        buffer_days (int): Days around a flood never sampled as negatives.
+        seed (int): Seed for negative sampling and the split.
+    """
+    conn = sqlite3.connect(db_path)
+
+    try:
+        with instrumentation.span("load") as span:
+            data = load_flood_weather(conn)
+            span["rows"] = len(data)
+        matched = data[transforms.FEATURES].notna().any(axis=1).sum()
+        logger.info("Flood records (%s on): %s, %s with same-day weather", START_DATE, len(data), matched)
+
+        if negative_ratio > 0:
+            with instrumentation.span("sample") as span:
+                span["rows"] = write_negative_samples(conn, negative_ratio, buffer_days, seed)
+                negatives = load_flood_weather(conn, table=NEGATIVE_SAMPLES_TABLE)
+            logger.info("Sampled %s no-flood days (ratio %s, buffer %s days)",
+                        len(negatives), negative_ratio, buffer_days)
+            data = pd.concat([data, negatives], ignore_index=True)
+        log.preview(logger, "Merged data sample", data)
+        data["severity"] = data["severity"].fillna("No Flood")
+
+    except Exception as e:
+        logger.error("Error merging data: %s", e)
+        data = pd.read_sql("SELECT * FROM historical_floods WHERE date(date) >= ?", conn, params=[START_DATE])
+        data["severity"] = data["severity"].fillna("No Flood")
+        for col in transforms.FEATURES:
+            data[col] = float("nan")  # Imputed by the transform
+        logger.warning("Fallback to flood data only: %s records", len(data))
+    schemas.apply(data, "flood_events")
+
+    # Create flood risk label
+    data["flood_risk"] = (data["severity"] != "No Flood").astype(int)
+
+    # Split before fitting so test rows do not leak into the scaling bounds
+    train, test = train_test_split(data, test_size=0.2, random_state=seed)
+    with instrumentation.span("transform") as span:
+        transform = transforms.WeatherTransform().fit(train)
+        train = transform.transform(train)
+        test = transform.transform(test)
+        span["rows"] = len(train) + len(test)
+
+    # Save
+    with instrumentation.span("write") as span:
+        train.to_csv(train_path, index=False)
+        test.to_csv(test_path, index=False)
+        transform.save(transform_path)
+        span["rows"] = len(train) + len(test)
+
+    conn.close()
+    logger.info("Data preprocessing complete: %s training rows, %s test rows; weather transform saved to %s",
+                len(train), len(test), transform_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the train/test splits from the database.")
+    parser.add_argument("--negative-ratio", type=float, default=NEGATIVE_RATIO,
+                        help="No-flood days sampled per flood day and state (0 disables)")
+    parser.add_argument("--buffer-days", type=int, default=0, help="Days around a flood never sampled as negatives")
+    parser.add_argument("--seed", type=int, default=42)
+    instrumentation.add_profile_args(parser)
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
 
-except Exception as e:
-    print(f"Error merging data: {e}")
-    data = flood_df.copy()
-    data["severity"] = data["severity"].fillna("No Flood")
-    data["temperature"] = 25.0
-    data["humidity"] = 80.0
-    data["precipitation"] = 0.0
-    print(f"Fallback to flood data only: {len(data)} records")
-
-# Normalize features
-scaler = MinMaxScaler()
-data[["temperature", "humidity", "precipitation"]] = scaler.fit_transform(
-    data[["temperature", "humidity", "precipitation"]]
-)
-
-# Create flood risk label
-data["flood_risk"] = data["severity"].apply(lambda x: 1 if x != "No Flood" else 0)
-
-# Split
-train, test = train_test_split(data, test_size=0.2, random_state=42)
-
-# Save
-train.to_csv("data/train_data.csv", index=False)
-test.to_csv("data/test_data.csv", index=False)
-
-conn.close()
-print(f"Data preprocessing complete: {len(train)} training rows, {len(test)} test rows")
+    train_file = "data/train_data.csv"
+    test_file = "data/test_data.csv"
+    instrumentation.run(lambda: preprocess_data("data/flood_data.db", train_file, test_file,
+                                                negative_ratio=args.negative_ratio, buffer_days=args.buffer_days,
+                                                seed=args.seed),
+                        args, "preprocess_data", output=train_file)
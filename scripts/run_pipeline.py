@@ -0,0 +1,301 @@
+"""
+Run the data pipeline as a DAG of the standalone scripts.
+
+Each stage declares its inputs and outputs. Resources are either file paths
+or "db:<table>" references into the SQLite database. A stage is skipped when
+its script and the content hash of every input are unchanged since its last
+successful run and its outputs are still as it left them. Stages whose inputs
+are ready run concurrently, each in its own process.
+
+Run from the repository root:
+    python scripts/run_pipeline.py                 # everything that is stale
+    python scripts/run_pipeline.py --dry-run       # show what would run
+    python scripts/run_pipeline.py --force merge_features
+    python scripts/run_pipeline.py --only extract_weather_features extract_sentinel_features
+    python scripts/run_pipeline.py --force merge_features --profile   # cProfile each stage that runs
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from common import locations, log
+
+logger = logging.getLogger("pipeline")
+
+DB_PATH = "data/flood_data.db"
+STATE_PATH = "data/.pipeline_state.json"
+LOCATIONS_FILE = "data/geospatial/locations.json"
+LANDUSE_STATES = locations.slugs()
+
+STAGES = [
+    # Data collection (network-bound; rerun with --force to refresh)
+    {"name": "fetch_historical_weather", "script": "scripts/data_collection/fetch_historical_weather.py",
+     "inputs": [LOCATIONS_FILE], "outputs": ["db:weather"]},
+    {"name": "fetch_realtime_weather", "script": "scripts/data_collection/fetch_realtime_weather.py",
+     "inputs": [LOCATIONS_FILE], "outputs": ["db:weather"]},
+    {"name": "fetch_sentinel", "script": "scripts/data_collection/fetch_sentinel.py",
+     "inputs": [LOCATIONS_FILE], "outputs": ["data/sentinel_metadata.csv", "db:sentinel_metadata"]},
+    {"name": "filter_darthmouth", "script": "scripts/data_collection/filter_darthmouth.py",
+     "inputs": ["data/historical_floods_raw.csv", "data/nigeria_states.geojson", LOCATIONS_FILE],
+     "outputs": ["data/historical_floods.csv"]},
+
+    # Preprocessing
+    {"name": "migrate_location_names", "script": "scripts/preprocessing/migrate_location_names.py",
+     "inputs": ["db:weather", "db:sentinel_metadata", LOCATIONS_FILE],
+     "outputs": ["db:weather", "db:sentinel_metadata", "db:weather_features", "db:sentinel_features"]},
+    {"name": "process_gfm", "script": "scripts/preprocessing/process_gfm.py",
+     "inputs": ["data/global_flood_monitor.csv", "data/geonames_ng.txt", "data/nigeria_states.geojson",
+                LOCATIONS_FILE],
+     "outputs": ["data/gfm_floods.csv"]},
+    {"name": "merge_floods_data", "script": "scripts/preprocessing/merge_floods_data.py",
+     "inputs": ["data/historical_floods.csv", "data/gfm_floods.csv"],
+     "outputs": ["data/historical_floods_merged.csv"]},
+    {"name": "clean_geojson", "script": "scripts/preprocessing/clean_geojson.py",
+     "inputs": [f"data/{state}_landuse.geojson" for state in LANDUSE_STATES]
+     + [f"data/{state}_landuse_cleaned.geojson" for state in LANDUSE_STATES]
+     + ["data/geospatial/nigeria_states.geojson", LOCATIONS_FILE],
+     "outputs": [f"data/geospatial/landuse/{state}.parquet" for state in LANDUSE_STATES]},
+    {"name": "preprocess_data", "script": "scripts/preprocessing/preprocess_data.py",
+     "inputs": ["db:weather", "db:historical_floods"],
+     "outputs": ["data/train_data.csv", "data/test_data.csv", "data/models/weather_transform.json"]},
+
+    # Feature extraction (independent of each other, run in parallel)
+    {"name": "extract_weather_features", "script": "scripts/feature_extraction/extract_weather_features.py",
+     "inputs": ["db:weather"], "outputs": ["db:weather_features"]},
+    {"name": "extract_sentinel_features", "script": "scripts/feature_extraction/extract_sentinel_features.py",
+     "inputs": ["db:sentinel_metadata"], "outputs": ["db:sentinel_features"]},
+    {"name": "extract_landuse_features", "script": "scripts/feature_extraction/extract_landuse_features.py",
+     "inputs": [f"data/geospatial/landuse/{state}.parquet" for state in LANDUSE_STATES] + [LOCATIONS_FILE],
+     "outputs": ["db:socioeconomic"]},
+    {"name": "load_landuse_spatialite", "script": "scripts/preprocessing/load_landuse_spatialite.py",
+     "inputs": [f"data/geospatial/landuse/{state}.parquet" for state in LANDUSE_STATES],
+     "outputs": ["db:land_use"]},
+    {"name": "extract_flood_exposure", "script": "scripts/feature_extraction/extract_flood_exposure.py",
+     "inputs": ["data/historical_floods_merged.csv"]
+     + [f"data/geospatial/landuse/{state}.parquet" for state in LANDUSE_STATES],
+     "outputs": ["data/flood_exposure.csv"]},
+
+    {"name": "merge_features", "script": "scripts/preprocessing/merge_features.py",
+     "inputs": ["db:socioeconomic", "db:sentinel_metadata", "db:weather_features",
+                "data/train_data.csv", "data/test_data.csv", LOCATIONS_FILE],
+     "outputs": ["data/features/state_static.parquet", "data/features/train_events.parquet",
+                 "data/features/test_events.parquet"]},
+
+    # Forecasting (issued for today; rerun with --force to refresh)
+    {"name": "forecast_floods", "script": "scripts/forecasting/forecast_floods.py",
+     "inputs": ["db:weather_features", "data/features/train_events.parquet", "data/models/weather_transform.json",
+                "data/forecast_weather.json", LOCATIONS_FILE],
+     "outputs": ["db:forecasts"]},
+    {"name": "build_risk_surface", "script": "scripts/forecasting/build_risk_surface.py",
+     "inputs": ["data/data_stream-oper_stepType-accum.nc", "data/data_stream-oper_stepType-instant.nc",
+                "data/geospatial/nigeria_states.geojson", "data/features/train_events.parquet",
+                "data/models/weather_transform.json"]
+     + [f"data/geospatial/landuse/{state}.parquet" for state in LANDUSE_STATES],
+     "outputs": ["data/grid/risk_surface.npz"]},
+]
+
+def hash_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_table(table):
+    """Hash a table's rows in rowid order, so writes to other tables do not invalidate it."""
+    if not os.path.exists(DB_PATH):
+        return None
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (table,)).fetchone()
+        if not exists:
+            return None
+        digest = hashlib.sha256()
+        cursor = conn.execute(f'SELECT * FROM "{table}";')
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            digest.update(repr(rows).encode("utf-8"))
+        return digest.hexdigest()
+    finally:
+        conn.close()
+
+def hash_resource(resource):
+    """
+    Content hash of a file or "db:<table>" resource.
+    Returns:
+        str or None: Hex digest, or None if the resource does not exist.
+    """
+    if resource.startswith("db:"):
+        return hash_table(resource[3:])
+    if not os.path.exists(resource):
+        return None
+    return hash_file(resource)
+
+def stage_key(stage):
+    """Hash of the stage's script plus all of its inputs."""
+    digest = hashlib.sha256(hash_file(stage["script"]).encode("utf-8"))
+    for resource in sorted(stage["inputs"]):
+        digest.update(f"{resource}={hash_resource(resource)}".encode("utf-8"))
+    return digest.hexdigest()
+
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH, "r") as f:
+        return json.load(f)
+
+def save_state(state):
+    tmp_path = f"{STATE_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+def is_up_to_date(stage, key, state):
+    """True if the last successful run had the same key and left the outputs untouched since."""
+    previous = state.get(stage["name"])
+    if not previous or previous.get("key") != key:
+        return False
+    for resource in stage["outputs"]:
+        recorded = previous["outputs"].get(resource)
+        if recorded is None or hash_resource(resource) != recorded:
+            return False
+    return True
+
+def build_dependencies(stages):
+    """Map each stage name to the names of stages producing any of its inputs."""
+    producers = {}
+    for stage in stages:
+        for resource in stage["outputs"]:
+            producers.setdefault(resource, set()).add(stage["name"])
+    return {
+        stage["name"]: {producer for resource in stage["inputs"] for producer in producers.get(resource, ())
+                        if producer != stage["name"]}
+        for stage in stages
+    }
+
+def run_stage(stage, extra_args=()):
+    """Run one stage's script in a child process. Returns (return code, seconds, output tail)."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, stage["script"], *extra_args], capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    output = (result.stdout + result.stderr).strip().splitlines()
+    return result.returncode, elapsed, output[-5:]
+
+def run_pipeline(stages, jobs, force=(), dry_run=False, stage_args=()):
+    """
+    Execute stages in dependency order, in parallel where possible.
+    Args:
+        stages (list): Stage definitions to run.
+        jobs (int): Maximum number of concurrent stages.
+        force (iterable): Stage names to run even if up to date.
+        dry_run (bool): Only report what would run.
+        stage_args (iterable): Extra arguments passed to every stage script (e.g. --profile).
+    Returns:
+        list: Per-stage report rows (name, status, seconds).
+    """
+    dependencies = build_dependencies(stages)
+    by_name = {stage["name"]: stage for stage in stages}
+    pending = set(by_name)
+    done, failed, stale = set(), set(), set()
+    report = []
+    state = load_state()
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while pending or running:
+            # Stages blocked by a failed upstream stage are never started
+            for name in sorted(pending):
+                if dependencies[name] & failed:
+                    pending.discard(name)
+                    failed.add(name)
+                    report.append((name, "blocked", 0.0))
+
+            ready = sorted(name for name in pending if dependencies[name] <= done)
+            for name in ready:
+                pending.discard(name)
+                stage = by_name[name]
+                key = stage_key(stage)
+                upstream_stale = bool(dependencies[name] & stale)
+                if name not in force and not upstream_stale and is_up_to_date(stage, key, state):
+                    done.add(name)
+                    report.append((name, "cached", 0.0))
+                    continue
+                if dry_run:
+                    # Upstream stages did not actually run, so anything downstream of them is stale too
+                    done.add(name)
+                    stale.add(name)
+                    report.append((name, "would run", 0.0))
+                    continue
+                logger.info("Starting %s", name)
+                running[pool.submit(run_stage, stage, tuple(stage_args))] = (name, key)
+
+            if not running:
+                if pending and not ready:
+                    raise RuntimeError(f"Dependency cycle among stages: {sorted(pending)}")
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, key = running.pop(future)
+                returncode, elapsed, tail = future.result()
+                if returncode == 0:
+                    done.add(name)
+                    state[name] = {
+                        "key": key,
+                        "outputs": {resource: hash_resource(resource) for resource in by_name[name]["outputs"]},
+                        "seconds": round(elapsed, 3)
+                    }
+                    save_state(state)
+                    report.append((name, "ran", elapsed))
+                    logger.info("Finished %s in %.2fs", name, elapsed, extra={"stage": name, "seconds": elapsed})
+                else:
+                    failed.add(name)
+                    report.append((name, "failed", elapsed))
+                    logger.error("%s failed (exit %s):\n%s", name, returncode,
+                                 "\n".join(f"    {line}" for line in tail),
+                                 extra={"stage": name, "seconds": elapsed, "returncode": returncode})
+    return report
+
+def print_report(report):
+    print(f"\n{'stage':<30}{'status':<12}{'seconds':>10}")
+    for name, status, seconds in report:
+        print(f"{name:<30}{status:<12}{seconds:>10.2f}")
+    total = sum(seconds for _, status, seconds in report if status in ("ran", "failed"))
+    print(f"{'total stage time':<42}{total:>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run pipeline stages whose inputs changed.")
+    parser.add_argument("--only", nargs="+", help="Run only these stages (their upstream stages are not run)")
+    parser.add_argument("--force", nargs="+", default=[], help="Run these stages even if up to date")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Maximum concurrent stages")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would run without running it")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run each stage with --profile; summaries land next to the stage outputs")
+    parser.add_argument("--profile-memory", action="store_true", help="Run each stage with --profile-memory")
+    log.add_log_args(parser)
+    args = parser.parse_args()
+    log.configure(args.log_level, args.log_format)
+
+    stage_names = {stage["name"] for stage in STAGES}
+    unknown = set(args.only or []) | set(args.force)
+    unknown -= stage_names
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    selected = [stage for stage in STAGES if not args.only or stage["name"] in args.only]
+    stage_args = [flag for flag, enabled in (("--profile", args.profile), ("--profile-memory", args.profile_memory))
+                  if enabled]
+    stage_args += ["--log-level", args.log_level, "--log-format", args.log_format]
+    report = run_pipeline(selected, args.jobs, force=set(args.force), dry_run=args.dry_run, stage_args=stage_args)
+    print_report(report)
+    if any(status in ("failed", "blocked") for _, status, _ in report):
+        sys.exit(1)
@@ -0,0 +1,73 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+ENDPOINTS = [
+    "/api/health",
+    "/api/socioeconomic",
+    "/api/sentinel_features",
+    "/api/weather_features",
+    "/api/landuse/lagos",
+    "/api/dashboard"
+]
+
+def fetch(url):
+    """
+    Issue one GET request.
+    Returns:
+        tuple: (status code, latency in seconds).
+    """
+    start = time.perf_counter()
+    try:
+        with urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except HTTPError as e:
+        status = e.code
+    except URLError:
+        status = 0
+    return status, time.perf_counter() - start
+
+def benchmark_endpoint(base_url, path, concurrency, total_requests):
+    """
+    Hit one endpoint with a fixed number of concurrent clients.
+    Args:
+        base_url (str): Server root, e.g. http://localhost:5000.
+        path (str): Endpoint path.
+        concurrency (int): Number of simultaneous clients.
+        total_requests (int): Requests to send in total.
+    Returns:
+        dict: Throughput and latency summary.
+    """
+    url = f"{base_url}{path}"
+    fetch(url)  # Warm-up
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, [url] * total_requests))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for status, _ in results if status != 200)
+    return {
+        "endpoint": path,
+        "rps": total_requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure requests/sec per API endpoint under concurrency.")
+    parser.add_argument("--url", default="http://localhost:5000", help="Base URL of a running server")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Benchmarking {args.url} with {args.concurrency} clients, {args.requests} requests per endpoint")
+    print(f"{'endpoint':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for path in ENDPOINTS:
+        result = benchmark_endpoint(args.url, path, args.concurrency, args.requests)
+        print(f"{result['endpoint']:<28}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+              f"{result['p95_ms']:>10.1f}{result['errors']:>8}")
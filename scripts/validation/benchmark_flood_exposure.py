@@ -0,0 +1,52 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "feature_extraction"))
+from extract_flood_exposure import METRIC_CRS, compute_exposure, load_landuse_polygons  # noqa: E402
+
+LANDUSE_CLASSES = ["residential", "farmland", "forest", "industrial", "commercial", "grass"]
+
+def synthetic_landuse(n_polygons, bounds, seed=0):
+    """Random ~100 m square polygons over bounds, for when the store is empty."""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = bounds
+    xs = rng.uniform(minx, maxx, n_polygons)
+    ys = rng.uniform(miny, maxy, n_polygons)
+    gdf = gpd.GeoDataFrame(
+        {"landuse": rng.choice(LANDUSE_CLASSES, n_polygons)},
+        geometry=shapely.box(xs, ys, xs + 0.001, ys + 0.001),
+        crs="EPSG:4326"
+    )
+    return gdf.to_crs(METRIC_CRS)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the flood exposure overlay on synthetic events.")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--polygons", type=int, default=50000, help="Synthetic polygons if the store is empty")
+    parser.add_argument("--buffer-m", type=float, default=500.0)
+    args = parser.parse_args()
+
+    landuse = load_landuse_polygons()
+    if landuse.empty:
+        landuse = synthetic_landuse(args.polygons, (3.0, 6.3, 3.6, 6.8))
+        print(f"Store empty; using {len(landuse)} synthetic polygons")
+    else:
+        print(f"Using {len(landuse)} polygons from the land use store")
+
+    minx, miny, maxx, maxy = landuse.to_crs("EPSG:4326").total_bounds
+    rng = np.random.default_rng(1)
+    lons = rng.uniform(minx, maxx, args.events)
+    lats = rng.uniform(miny, maxy, args.events)
+
+    start = time.perf_counter()
+    exposure = compute_exposure(lons, lats, landuse, args.buffer_m)
+    elapsed = time.perf_counter() - start
+    print(f"{args.events} events, buffer {args.buffer_m:.0f} m: {elapsed:.2f}s "
+          f"({args.events / elapsed:,.0f} events/s), {exposure.shape[1]} feature columns")
+    print(f"Events inside a polygon: {exposure['landuse_at_point'].notna().sum()}")
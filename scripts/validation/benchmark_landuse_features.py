@@ -0,0 +1,56 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+current_file_path = Path(__file__).resolve()
+parent_path = current_file_path.parents[2]
+sys.path.insert(0, str(parent_path / "scripts"))
+sys.path.insert(0, str(parent_path / "scripts/feature_extraction"))
+from common import locations  # noqa: E402
+
+DEFAULT_STATES = locations.slugs()
+
+def run_mode(states, workers):
+    """Compute areas in this process and return timing and peak RSS (MiB)."""
+    from extract_landuse_features import compute_all_areas
+
+    start = time.perf_counter()
+    results = compute_all_areas(states, workers)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux; RUSAGE_CHILDREN covers the pool workers
+    return {
+        "seconds": elapsed,
+        "main_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_rss_mib": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "errors": {state: str(error) for state, _, error in results if error is not None}
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sequential and process-pool land use area computation.")
+    parser.add_argument("--states", nargs="+", default=DEFAULT_STATES)
+    parser.add_argument("--workers", type=int, default=None, help="Pool size for the parallel run")
+    parser.add_argument("--child", choices=["sequential", "parallel"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        workers = 1 if args.child == "sequential" else args.workers
+        print(json.dumps(run_mode(args.states, workers)))
+        sys.exit(0)
+
+    # Each mode runs in a fresh interpreter so peak RSS is not shared between them
+    print(f"States: {', '.join(args.states)}")
+    print(f"{'mode':<12}{'seconds':>10}{'main MiB':>12}{'worker MiB':>12}")
+    for mode in ["sequential", "parallel"]:
+        command = [sys.executable, __file__, "--child", mode, "--states", *args.states]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<12}{result['seconds']:>10.2f}{result['main_rss_mib']:>12.1f}{result['worker_rss_mib']:>12.1f}")
+        for state, error in result["errors"].items():
+            print(f"  {state}: {error}")
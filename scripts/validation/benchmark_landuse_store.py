@@ -0,0 +1,55 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import geopandas as gpd
+
+
+current_file_path = Path(__file__).resolve()
+parent_path = current_file_path.parents[2]
+sys.path.insert(0, str(parent_path / "scripts"))
+
+from common import landuse_store  # noqa: E402
+
+def timed(func, repeats):
+    """Return (best seconds over repeats, result of the last call)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def center_bbox(bounds, fraction):
+    """Bbox covering the given fraction of each side of bounds, centred."""
+    minx, miny, maxx, maxy = bounds
+    dx = (maxx - minx) * fraction / 2
+    dy = (maxy - miny) * fraction / 2
+    cx, cy = (minx + maxx) / 2, (miny + maxy) / 2
+    return (cx - dx, cy - dy, cx + dx, cy + dy)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare GeoJSON reads with the GeoParquet land use store.")
+    parser.add_argument("--geojson-pattern", default="data/{state}_landuse_cleaned_valid.geojson",
+                        help="Legacy GeoJSON path per state, for comparison")
+    parser.add_argument("--bbox-fraction", type=float, default=0.1)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'state':<10}{'format':<22}{'features':>10}{'seconds':>10}")
+    for state in landuse_store.available_states():
+        seconds, gdf = timed(lambda: landuse_store.read_state(state), args.repeats)
+        print(f"{state:<10}{'geoparquet':<22}{len(gdf):>10}{seconds:>10.3f}")
+
+        bbox = center_bbox(gdf.total_bounds, args.bbox_fraction)
+        seconds, subset = timed(lambda: landuse_store.read_state(state, bbox=bbox), args.repeats)
+        print(f"{state:<10}{'geoparquet bbox':<22}{len(subset):>10}{seconds:>10.3f}")
+
+        geojson_path = Path(args.geojson_pattern.format(state=state))
+        if geojson_path.exists():
+            seconds, gdf = timed(lambda: gpd.read_file(geojson_path), args.repeats)
+            print(f"{state:<10}{'geojson':<22}{len(gdf):>10}{seconds:>10.3f}")
+            seconds, subset = timed(lambda: gpd.read_file(geojson_path, bbox=bbox), args.repeats)
+            print(f"{state:<10}{'geojson bbox':<22}{len(subset):>10}{seconds:>10.3f}")
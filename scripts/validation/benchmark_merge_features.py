@@ -0,0 +1,62 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "preprocessing"))
+from common import feature_store  # noqa: E402
+from merge_features import WEATHER_COLUMNS, attach_sentinel_counts, attach_weather  # noqa: E402
+
+def synthetic_inputs(n_rows, n_locations, n_static, seed=0):
+    """Synthetic event rows, weekly weather windows, daily Sentinel totals and a static table."""
+    rng = np.random.default_rng(seed)
+    locations = [f"state_{i}" for i in range(n_locations)]
+    windows = pd.date_range("2015-01-01", "2025-01-01", freq="7D")
+    weather = pd.DataFrame({
+        "city": np.repeat(locations, len(windows)),
+        "window_start_date": np.tile(windows, n_locations)
+    })
+    for col in WEATHER_COLUMNS:
+        weather[col] = rng.random(len(weather))
+    events = pd.DataFrame({
+        "date": pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, n_rows), unit="D"),
+        "location": rng.choice(locations, n_rows),
+        "severity": rng.integers(1, 4, n_rows)
+    })
+    days = pd.date_range("2015-01-01", "2025-01-01", freq="D")
+    daily = pd.DataFrame({"region": np.repeat(locations, len(days)), "day": np.tile(days, n_locations)})
+    daily["cumulative_images"] = daily.groupby("region").cumcount() + 1
+    daily = daily.sort_values("day", ignore_index=True)
+    static = pd.DataFrame(rng.random((n_locations, n_static)), columns=[f"area_{i}" for i in range(n_static)])
+    static.insert(0, feature_store.KEY, locations)
+    return events, weather, daily, static
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time weather/Sentinel matching and compare stored vs materialized feature size.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--locations", type=int, default=37)
+    parser.add_argument("--static-features", type=int, default=60)
+    args = parser.parse_args()
+
+    events, weather, daily, static = synthetic_inputs(args.rows, args.locations, args.static_features)
+
+    start = time.perf_counter()
+    events = attach_weather(events, weather)
+    print(f"attach_weather: {args.rows} rows x {len(weather)} windows in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    events = attach_sentinel_counts(events, daily)
+    print(f"attach_sentinel_counts: {args.rows} rows x {len(daily)} region-days in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    matrix = feature_store.join_static(events, static)
+    print(f"join_static: {time.perf_counter() - start:.2f}s")
+
+    stored = events.memory_usage(deep=True).sum() + static.memory_usage(deep=True).sum()
+    materialized = matrix.memory_usage(deep=True).sum()
+    print(f"Stored {stored / 2**20:.1f} MiB vs materialized {materialized / 2**20:.1f} MiB "
+          f"({materialized / stored:.1f}x)")
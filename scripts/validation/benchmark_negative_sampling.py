@@ -0,0 +1,49 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "preprocessing"))
+from preprocess_data import sample_negative_days, to_day_numbers  # noqa: E402
+
+def synthetic_inputs(n_locations, years, floods_per_year, seed=0):
+    """A calendar of `years` years per location and random flood days inside it."""
+    rng = np.random.default_rng(seed)
+    first_day = to_day_numbers(["2000-01-01"])[0]
+    last_day = first_day + int(years * 365.25) - 1
+    locations = [f"location_{i}" for i in range(n_locations)]
+    calendar = pd.DataFrame({"location": locations, "first_day": first_day, "last_day": last_day})
+    n_floods = n_locations * years * floods_per_year
+    flood_days = pd.DataFrame({
+        "location": rng.choice(locations, n_floods),
+        "day": rng.integers(first_day, last_day + 1, n_floods)
+    })
+    return calendar, flood_days
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time negative day sampling over a large synthetic calendar.")
+    parser.add_argument("--locations", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=40)
+    parser.add_argument("--floods-per-year", type=int, default=8)
+    parser.add_argument("--ratio", type=float, default=3.0)
+    parser.add_argument("--buffer-days", type=int, default=3)
+    args = parser.parse_args()
+
+    calendar, flood_days = synthetic_inputs(args.locations, args.years, args.floods_per_year)
+    candidate_days = int((calendar["last_day"] - calendar["first_day"] + 1).sum())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    sampled = 0
+    for samples in sample_negative_days(calendar, flood_days, args.ratio, args.buffer_days):
+        sampled += len(samples)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"{candidate_days:,} candidate days, {len(flood_days):,} flood days, {sampled:,} negatives sampled "
+          f"in {elapsed:.2f}s (peak traced memory {peak / 2**20:.1f} MiB)")
@@ -0,0 +1,153 @@
+"""
+Exercise fetch_historical_weather's resumable backfill against an in-memory
+stand-in for meteostat: an interrupted run resumes from its checkpoint, a new
+city only fetches its own years, cities sharing stations each get one, empty
+chunks are not checkpointed, and re-runs never duplicate weather rows - also
+when upserting over a copy of the bundled database, whose older rows store
+date-only timestamps.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import types
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data_collection"))
+
+class FakeMeteostat:
+    """Two stations per city; the nearest has no data before 2016. Chunks can be made to fail or come back empty."""
+
+    def __init__(self):
+        self.daily_calls = 0
+        self.nearby_calls = 0
+        self.fail = set()
+        self.empty = set()
+        self.lock = threading.Lock()
+
+    def module(self):
+        fake = self
+        meteostat = types.ModuleType("meteostat")
+
+        class Stations:
+            def nearby(self, lat, lon):
+                self.lat, self.lon = lat, lon
+                return self
+
+            def fetch(self, limit):
+                fake.nearby_calls += 1
+                tag = f"{self.lat:.2f}_{self.lon:.2f}"
+                return pd.DataFrame({"distance": [1000.0, 20000.0, 90000.0]},
+                                    index=[f"near_{tag}", f"far_{tag}", f"too_far_{tag}"])
+
+        class Daily:
+            def __init__(self, station_id, start, end):
+                self.station_id, self.start, self.end = station_id, start, end
+
+            def fetch(self):
+                with fake.lock:
+                    fake.daily_calls += 1
+                if (self.station_id, self.start.year) in fake.fail:
+                    raise ConnectionError("simulated outage")
+                if self.station_id.startswith("near_") and self.start.year < 2016:
+                    return pd.DataFrame()
+                if (self.station_id, self.start.year) in fake.empty:
+                    return pd.DataFrame()
+                days = pd.date_range(self.start, self.end, freq="D")
+                return pd.DataFrame({"tavg": np.full(len(days), 27.0), "prcp": np.ones(len(days))}, index=days)
+
+        meteostat.Stations = Stations
+        meteostat.Daily = Daily
+        return meteostat
+
+def stations_of(city):
+    tag = f"{city['lat']:.2f}_{city['lon']:.2f}"
+    return f"near_{tag}", f"far_{tag}"
+
+def weather_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    total, distinct = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT city || timestamp) FROM weather;"
+    ).fetchone()
+    conn.close()
+    return total, distinct
+
+if __name__ == "__main__":
+    fake = FakeMeteostat()
+    sys.modules["meteostat"] = fake.module()
+    import fetch_historical_weather as fhw
+    fhw.fetch_station_year.retry.wait = lambda *args, **kwargs: 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fhw.CACHE_DIR = tmp
+        fhw.STATIONS_CACHE = os.path.join(tmp, "stations.json")
+        fhw.CHECKPOINT_PATH = os.path.join(tmp, "checkpoint.json")
+        db_path = os.path.join(tmp, "flood_data.db")
+        two_cities = fhw.cities[:2]
+
+        # Run 1: one chunk fails, everything else lands
+        failing_station = f"near_{two_cities[0]['lat']:.2f}_{two_cities[0]['lon']:.2f}"
+        fake.fail = {(failing_station, 2018)}
+        assert fhw.backfill(two_cities, 2014, 2019, db_path=db_path) == 1
+        total, distinct = weather_counts(db_path)
+        assert total == distinct
+
+        # Run 2: only the failed chunk is fetched again
+        fake.fail = set()
+        calls_before = fake.daily_calls
+        assert fhw.backfill(two_cities, 2014, 2019, db_path=db_path) == 0
+        assert fake.daily_calls - calls_before == 1, fake.daily_calls - calls_before
+        total, distinct = weather_counts(db_path)
+        assert total == distinct == 2 * len(pd.date_range("2014-01-01", "2019-12-31"))
+
+        # Run 3: adding a city fetches only its years and reuses cached station lookups
+        nearby_before, calls_before = fake.nearby_calls, fake.daily_calls
+        assert fhw.backfill(fhw.cities[:3], 2014, 2019, db_path=db_path) == 0
+        assert fake.nearby_calls - nearby_before == 1
+        assert fake.daily_calls - calls_before == 6 + 2  # 6 years, 2014-2015 fall back to the far station
+        total, distinct = weather_counts(db_path)
+        assert total == distinct == 3 * len(pd.date_range("2014-01-01", "2019-12-31"))
+
+        # Cities sharing candidates: the second city only loses the station the first one used
+        results = fhw.fetch_year(2018, ["A", "B"], {"A": ["s1", "s2"], "B": ["s1", "s2"]}, set())
+        assert [(name, station_id) for name, station_id, _, _ in results] == [("A", "s1"), ("B", "s2")]
+
+        # Run 4: a chunk with no station data is not checkpointed and is fetched again next run
+        fourth = fhw.cities[3]
+        fake.empty = {(station, 2019) for station in stations_of(fourth)}
+        assert fhw.backfill([fourth], 2018, 2019, db_path=db_path) == 0
+        checkpoint = fhw.load_json(fhw.CHECKPOINT_PATH, {})
+        assert f"{fourth['name']}|2018" in checkpoint and f"{fourth['name']}|2019" not in checkpoint
+        fake.empty = set()
+        calls_before = fake.daily_calls
+        assert fhw.backfill([fourth], 2018, 2019, db_path=db_path) == 0
+        assert fake.daily_calls - calls_before == 1
+        assert f"{fourth['name']}|2019" in fhw.load_json(fhw.CHECKPOINT_PATH, {})
+        print(f"OK: {total} unique weather rows, {fake.daily_calls} Daily fetches, "
+              f"{fake.nearby_calls} station lookups")
+
+        # Upserting the bundled rows over the bundled database must not add any
+        bundled = Path(__file__).resolve().parents[2] / "data/processed/flood_data.db"
+        if bundled.exists():
+            copy_path = os.path.join(tmp, "bundled.db")
+            shutil.copy(bundled, copy_path)
+            conn = sqlite3.connect(copy_path)
+            rows_before = conn.execute("SELECT COUNT(*) FROM weather;").fetchone()[0]
+            existing = pd.read_sql("SELECT city, timestamp, temperature, humidity, precipitation FROM weather;", conn)
+            assert fhw.weather_store.migrate_timestamps(conn) > 0
+            assert fhw.weather_store.migrate_timestamps(conn) == 0
+            fhw.weather_store.upsert_weather(conn, existing)
+            fhw.weather_store.upsert_weather(conn, existing.assign(humidity=None))
+            rows_after = conn.execute("SELECT COUNT(*) FROM weather;").fetchone()[0]
+            unchanged = conn.execute(
+                "SELECT COUNT(*) FROM weather WHERE humidity IS NOT NULL;"
+            ).fetchone()[0] == existing["humidity"].notna().sum()
+            conn.close()
+            assert rows_after == rows_before, (rows_before, rows_after)
+            assert unchanged
+            print(f"OK: upserting {len(existing)} bundled rows kept the table at {rows_after} rows")
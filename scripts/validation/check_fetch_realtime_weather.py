@@ -0,0 +1,86 @@
+"""
+Poll fetch_realtime_weather against a stand-in for OpenWeatherMap, ingesting
+into a migrated copy of the bundled database: polling twice before the next
+observation, or re-reporting an observation the table already stores (including
+a historical date-only day), must not add rows. A poll on an unmigrated copy
+leaves its timestamps alone; normalizing them is the migration's job.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data_collection"))
+
+BUNDLED_DB = Path(__file__).resolve().parents[2] / "data/processed/flood_data.db"
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """Answers every city with the observation time set in observed_at."""
+
+    def __init__(self):
+        self.observed_at = {}
+
+    def get(self, url, timeout=None):
+        query = url.split("q=")[1].split("&")[0]
+        return FakeResponse({"dt": int(self.observed_at[query].timestamp()),
+                             "main": {"temp": 28.0, "humidity": 70}})
+
+def row_count(db_path):
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM weather;").fetchone()[0]
+    conn.close()
+    return count
+
+if __name__ == "__main__":
+    import fetch_realtime_weather as frw
+    frw.time.sleep = lambda seconds: None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "flood_data.db")
+        shutil.copy(BUNDLED_DB, db_path)
+        conn = sqlite3.connect(db_path)
+        latest = pd.read_sql("SELECT city, MAX(timestamp) AS timestamp FROM weather GROUP BY city;", conn)
+        daily = pd.read_sql("SELECT city, MIN(timestamp) AS timestamp FROM weather GROUP BY city;", conn)
+        assert daily["timestamp"].str.len().eq(10).all(), "expected date-only historical rows"
+        frw.weather_store.migrate_timestamps(conn)
+        conn.close()
+        queries = {city["db_name"]: city["api_name"] for city in frw.cities}
+        session = FakeSession()
+        rows_before = row_count(db_path)
+
+        # The last real-time observation and the first date-only day, each polled twice
+        for observations in [latest, daily]:
+            session.observed_at = {queries[row.city]: pd.Timestamp(row.timestamp) for row in observations.itertuples()}
+            for _ in range(2):
+                readings = frw.fetch_current_weather(session, "key")
+                assert frw.ingest(readings, db_path) == len(frw.cities)
+            assert row_count(db_path) == rows_before, (rows_before, row_count(db_path))
+
+        # A new observation adds exactly one row per city
+        session.observed_at = {query: pd.Timestamp("2030-01-01 12:00:00") for query in queries.values()}
+        frw.ingest(frw.fetch_current_weather(session, "key"), db_path)
+        frw.ingest(frw.fetch_current_weather(session, "key"), db_path)
+        assert row_count(db_path) == rows_before + len(frw.cities)
+
+        unmigrated_path = os.path.join(tmp, "unmigrated.db")
+        shutil.copy(BUNDLED_DB, unmigrated_path)
+        frw.ingest(frw.fetch_current_weather(session, "key"), unmigrated_path)
+        conn = sqlite3.connect(unmigrated_path)
+        date_only = conn.execute("SELECT COUNT(*) FROM weather WHERE length(timestamp) = 10;").fetchone()[0]
+        conn.close()
+        assert date_only > 0, "a poll rewrote stored timestamps"
+        print(f"OK: repeated polls kept {rows_before} bundled rows, a new observation added {len(frw.cities)}")
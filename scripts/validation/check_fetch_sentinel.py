@@ -0,0 +1,122 @@
+"""
+Exercise fetch_sentinel's backfill path against an in-memory stand-in for the
+Earth Engine client, so caching, chunking and (image_id, region) deduplication
+can be checked without credentials or network access.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import types
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data_collection"))
+
+class FakeEarthEngine:
+    """Minimal ee stand-in: one image per region every 6 days, one counted getInfo per query."""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def module(self):
+        fake = self
+        ee = types.ModuleType("ee")
+
+        class Query:
+            def __init__(self, bbox=None, start=None, end=None):
+                self.bbox, self.start, self.end = bbox, start, end
+
+            def filterBounds(self, geometry):
+                return Query(geometry, self.start, self.end)
+
+            def filterDate(self, start, end):
+                return Query(self.bbox, start, end)
+
+            def filter(self, _):
+                return self
+
+            def reduceColumns(self, reducer, selectors):
+                return {"list": self}
+
+            def getInfo(self):
+                with fake.lock:
+                    fake.calls += 1
+                days = pd.date_range("2020-01-01", "2021-12-31", freq="6D")
+                days = days[(days >= self.start) & (days < self.end)]
+                tag = "_".join(f"{v:g}" for v in self.bbox)
+                return [[f"S1_{tag}_{day:%Y%m%d}", int(day.value // 10**6)] for day in days]
+
+        ee.ImageCollection = lambda name: Query()
+        ee.Geometry = types.SimpleNamespace(Rectangle=lambda bbox: tuple(bbox))
+        ee.Filter = types.SimpleNamespace(eq=lambda key, value: (key, value))
+        ee.Reducer = types.SimpleNamespace(toList=lambda n: n)
+        ee.Initialize = lambda **kwargs: None
+        return ee
+
+if __name__ == "__main__":
+    fake = FakeEarthEngine()
+    sys.modules["ee"] = fake.module()
+    import fetch_sentinel
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fetch_sentinel.CACHE_DIR = os.path.join(tmp, "cache")
+        db_path = os.path.join(tmp, "flood_data.db")
+        csv_path = os.path.join(tmp, "sentinel_metadata.csv")
+        start, end = datetime(2020, 1, 1), datetime(2021, 1, 1)
+        n_chunks = len(fetch_sentinel.date_chunks(start, end))
+        n_regions = len(fetch_sentinel.REGIONS)
+
+        # First run: one query per (region, chunk), all images new
+        df = fetch_sentinel.fetch_metadata(start, end)
+        appended = fetch_sentinel.append_new_images(df, db_path, csv_path)
+        assert fake.calls == n_regions * n_chunks, fake.calls
+        assert appended == len(df) > 0
+
+        # Second run: served from cache, nothing appended
+        df = fetch_sentinel.fetch_metadata(start, end)
+        assert fake.calls == n_regions * n_chunks, fake.calls
+        assert fetch_sentinel.append_new_images(df, db_path, csv_path) == 0
+
+        # Extended range: only the new chunks are queried, only unseen images appended
+        calls_before = fake.calls
+        df = fetch_sentinel.fetch_metadata(start, datetime(2021, 7, 1))
+        new_chunks = len(fetch_sentinel.date_chunks(start, datetime(2021, 7, 1))) - n_chunks
+        assert fake.calls - calls_before <= n_regions * (new_chunks + 1)
+        appended_more = fetch_sentinel.append_new_images(df, db_path, csv_path)
+        assert appended_more > 0
+
+        conn = sqlite3.connect(db_path)
+        total, distinct = conn.execute("SELECT COUNT(*), COUNT(DISTINCT image_id) FROM sentinel_metadata;").fetchone()
+        conn.close()
+        csv_rows = len(pd.read_csv(csv_path))
+        assert total == distinct == csv_rows == appended + appended_more
+
+        # A scene covering two search boxes is kept for both regions, also when appended to
+        # a table created before images were keyed per region
+        bbox = fetch_sentinel.REGIONS["Rivers"]
+        shared = fetch_sentinel.fetch_metadata(start, datetime(2020, 2, 1), regions={"Rivers": bbox, "Bayelsa": bbox},
+                                               use_cache=False)
+        per_region = shared.groupby("region").size()
+        assert per_region["Rivers"] == per_region["Bayelsa"] > 0, per_region
+        legacy_db = os.path.join(tmp, "legacy.db")
+        conn = sqlite3.connect(legacy_db)
+        conn.execute("CREATE TABLE sentinel_metadata (image_id TEXT PRIMARY KEY, date INTEGER, region TEXT);")
+        conn.executemany("INSERT INTO sentinel_metadata VALUES (?, ?, ?);",
+                         shared[shared["region"] == "Rivers"].itertuples(index=False, name=None))
+        conn.commit()
+        conn.close()
+        legacy_csv = os.path.join(tmp, "legacy.csv")
+        assert fetch_sentinel.append_new_images(shared, legacy_db, legacy_csv) == per_region["Bayelsa"]
+        assert fetch_sentinel.append_new_images(shared, legacy_db, legacy_csv) == 0
+        conn = sqlite3.connect(legacy_db)
+        stored = conn.execute("SELECT region, COUNT(*) FROM sentinel_metadata GROUP BY region;").fetchall()
+        conn.close()
+        assert dict(stored) == per_region.to_dict(), stored
+
+        print(f"OK: {fake.calls} Earth Engine queries, {total} unique images in table and CSV, "
+              f"{per_region['Rivers']} shared scenes kept for both regions")
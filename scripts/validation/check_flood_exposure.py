@@ -0,0 +1,34 @@
+"""
+Overlay flood points on two small land use polygons: a point inside one, a point
+near both and a point with no polygon within the buffer must each get one row,
+the last with zero exposure in every class.
+"""
+import sys
+from pathlib import Path
+
+import geopandas as gpd
+import shapely
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "feature_extraction"))
+from extract_flood_exposure import METRIC_CRS, compute_exposure  # noqa: E402
+
+if __name__ == "__main__":
+    landuse = gpd.GeoDataFrame(
+        {"landuse": ["residential", "farm land"]},
+        geometry=[shapely.box(3.30, 6.40, 3.31, 6.41), shapely.box(3.32, 6.40, 3.33, 6.41)],
+        crs="EPSG:4326"
+    ).to_crs(METRIC_CRS)
+    expected_columns = ["exposure_farm_land_sqm", "exposure_residential_sqm",
+                        "exposure_farm_land_count", "exposure_residential_count"]
+
+    exposure = compute_exposure([3.305, 3.315, 3.9], [6.405, 6.405, 6.9], landuse, buffer_m=600)
+    assert len(exposure) == 3 and list(exposure.columns[1:]) == expected_columns, exposure.columns
+    assert exposure.loc[0, "landuse_at_point"] == "residential"
+    assert exposure.loc[1, ["exposure_farm_land_count", "exposure_residential_count"]].tolist() == [1, 1]
+    assert (exposure.loc[2, expected_columns] == 0).all() and exposure.loc[2, "landuse_at_point"] is None
+
+    # No event has a polygon within the buffer
+    far = compute_exposure([3.9], [6.9], landuse)
+    assert len(far) == 1 and list(far.columns[1:]) == expected_columns, far.columns
+    assert (far[expected_columns] == 0).all(axis=None)
+    print("OK: events without a polygon within the buffer get zero exposure in every class")
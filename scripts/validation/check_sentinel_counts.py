@@ -0,0 +1,52 @@
+"""
+Count Sentinel-1 images per state through merge_features on a migrated copy of
+the bundled database: an event dated just after the stored images must see
+them in its 7-day window in every registered state, including the image that
+Rivers and Bayelsa share. Without the migration, the aliased regions must be
+reported by merge_features rather than silently counted as zero.
+"""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "preprocessing"))
+from common import locations  # noqa: E402
+
+BUNDLED_DB = Path(__file__).resolve().parents[2] / "data/processed/flood_data.db"
+
+if __name__ == "__main__":
+    from merge_features import attach_sentinel_counts, load_sentinel_images
+    from migrate_location_names import migrate_location_names
+
+    warnings = []
+    handler = logging.Handler()
+    handler.emit = warnings.append
+    logging.getLogger("merge_features").addHandler(handler)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "flood_data.db")
+        shutil.copy(BUNDLED_DB, db_path)
+        engine = create_engine(f"sqlite:///{db_path}")
+        load_sentinel_images(engine)
+        assert any("port harcourt" in record.getMessage() for record in warnings), "aliases not reported"
+
+        warnings.clear()
+        migrate_location_names(db_path)
+        daily = load_sentinel_images(engine)
+        engine.dispose()
+        assert not warnings, [record.getMessage() for record in warnings]
+
+    assert daily["day"].notna().all() and len(daily), "stored image dates did not parse"
+    events = pd.DataFrame({"location": locations.slugs(),
+                           "date": daily["day"].max() + pd.Timedelta(days=1)})
+    counts = attach_sentinel_counts(events, daily).set_index("location")["images_7d"]
+    assert (counts > 0).all(), counts.to_dict()
+    print(f"OK: images in the 7 days before {events['date'].iloc[0]:%Y-%m-%d}: "
+          + ", ".join(f"{state} {int(count)}" for state, count in counts.items()))
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import shapely
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import spatialite  # noqa: E402
+
+def check_spatialite_queries():
+    """
+    Load three polygons into a scratch land_use table and check the SQL queries against them.
+    Skips (exit 0) when mod_spatialite is unavailable.
+    """
+    if not spatialite.spatialite_available():
+        print("SKIPPED: mod_spatialite is not available in this environment.")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = spatialite.connect(os.path.join(tmp_dir, "check.db"))
+        spatialite.create_land_use_table(conn)
+        polygons = [
+            ("residential", 100.0, shapely.to_wkb(shapely.box(3.30, 6.40, 3.31, 6.41))),
+            ("farmland", 200.0, shapely.to_wkb(shapely.box(3.40, 6.50, 3.42, 6.52))),
+            ("residential", 50.0, shapely.to_wkb(shapely.box(3.50, 6.60, 3.51, 6.61))),
+        ]
+        inserted = spatialite.replace_state_features(conn, "Lagos", polygons)
+        conn.commit()
+        assert inserted == 3, f"expected 3 rows, inserted {inserted}"
+
+        areas = spatialite.area_by_landuse(conn, "Lagos").set_index("landuse")["area_sqm"]
+        assert areas["residential"] == 150.0 and areas["farmland"] == 200.0, areas
+        print("Area per landuse: OK")
+
+        in_bbox = spatialite.features_in_bbox(conn, (3.35, 6.45, 3.45, 6.55))
+        assert in_bbox["landuse"].tolist() == ["farmland"], in_bbox
+        collection = spatialite.to_feature_collection(in_bbox)
+        assert collection["features"][0]["geometry"]["type"] == "MultiPolygon", collection
+        print("Features in bbox: OK")
+
+        inside = spatialite.features_near_point(conn, 3.305, 6.405)
+        assert inside["landuse"].tolist() == ["residential"], inside
+        near = spatialite.features_near_point(conn, 3.43, 6.51, radius_m=2000)
+        assert "farmland" in near["landuse"].tolist(), near
+        print("Features at/near point: OK")
+
+        # Reloading a state replaces its rows rather than appending
+        spatialite.replace_state_features(conn, "Lagos", polygons[:1])
+        conn.commit()
+        count = conn.execute("SELECT COUNT(*) FROM land_use;").fetchone()[0]
+        assert count == 1, count
+        print("State reload: OK")
+        conn.close()
+
+if __name__ == "__main__":
+    check_spatialite_queries()
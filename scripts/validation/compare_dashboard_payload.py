@@ -0,0 +1,52 @@
+import sys
+import time
+from pathlib import Path
+
+
+current_file_path = Path(__file__).resolve()
+parent_path = current_file_path.parents[2]
+sys.path.insert(0, str(parent_path / "backend/src"))
+
+from app import app  # noqa: E402
+
+def measure(client, url, repeats=20):
+    """
+    Request an endpoint repeatedly and report payload size and mean latency.
+    Args:
+        client: Flask test client.
+        url (str): Endpoint path.
+        repeats (int): Number of requests to average over.
+    Returns:
+        tuple: (status code, payload bytes, mean milliseconds per request).
+    """
+    response = client.get(url)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        response = client.get(url)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeats
+    return response.status_code, len(response.data), elapsed_ms
+
+if __name__ == "__main__":
+    client = app.test_client()
+    legacy_endpoints = [
+        "/api/socioeconomic",
+        "/api/sentinel_features",
+        "/api/weather_features",
+        "/api/landuse/lagos"
+    ]
+
+    total_bytes = 0
+    total_ms = 0.0
+    print(f"{'endpoint':<28}{'status':>8}{'bytes':>12}{'ms/req':>10}")
+    for url in legacy_endpoints:
+        status, size, ms = measure(client, url)
+        if status == 200:
+            total_bytes += size
+            total_ms += ms
+        print(f"{url:<28}{status:>8}{size:>12}{ms:>10.2f}")
+    print(f"{'legacy total (200 only)':<28}{'':>8}{total_bytes:>12}{total_ms:>10.2f}")
+
+    status, size, ms = measure(client, "/api/dashboard")
+    print(f"{'/api/dashboard':<28}{status:>8}{size:>12}{ms:>10.2f}")
+    if total_bytes:
+        print(f"Payload ratio (dashboard / legacy): {size / total_bytes:.2f}")
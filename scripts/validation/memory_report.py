@@ -0,0 +1,40 @@
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import schemas  # noqa: E402
+
+def column_report(default_df, schema_df):
+    """Per-column deep memory (MiB) and dtype of the default and schema loads."""
+    report = pd.DataFrame({
+        "default_dtype": default_df.dtypes.astype(str),
+        "default_mib": default_df.memory_usage(deep=True, index=False) / 2**20,
+        "schema_dtype": schema_df.dtypes.astype(str),
+        "schema_mib": schema_df.memory_usage(deep=True, index=False) / 2**20
+    })
+    report.loc["total"] = ["", report["default_mib"].sum(), "", report["schema_mib"].sum()]
+    report["reduction"] = 1 - report["schema_mib"] / report["default_mib"]
+    return report
+
+def print_report(title, default_df, schema_df):
+    report = column_report(default_df, schema_df)
+    print(f"\n{title}: {len(default_df):,} rows")
+    print(report.to_string(float_format=lambda value: f"{value:.2f}",
+                           formatters={"reduction": "{:.1%}".format}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory of the weather table and GFM CSV with default vs schema dtypes.")
+    parser.add_argument("--db", default="data/flood_data.db")
+    parser.add_argument("--gfm", default="data/global_flood_monitor.csv")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    query = "SELECT city, timestamp, temperature, humidity, precipitation FROM weather;"
+    print_report("weather", pd.read_sql(query, conn), schemas.read_sql(query, conn, "weather"))
+    conn.close()
+
+    print_report("GFM", pd.read_csv(args.gfm, low_memory=False), schemas.read_csv(args.gfm, "gfm", low_memory=False))
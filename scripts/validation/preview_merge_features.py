@@ -1,13 +1,18 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import feature_store  # noqa: E402
 
 try:
-    train = pd.read_csv("data/train_data_with_features.csv")
-    test = pd.read_csv("data/test_data_with_features.csv")
+    static = feature_store.read_static()
+    train = feature_store.read_events("train")
+    test = feature_store.read_events("test")
 
-    print("Train Data Preview:\n", train.head())
-    print("Test Data Preview:\n", test.head())
-    print("Train Columns:", train.columns.tolist())
-    print("Test Columns:", test.columns.tolist())
+    print("Static Features Preview:\n", static.head())
+    print("Train Events Preview:\n", train.head())
+    print("Test Events Preview:\n", test.head())
+    print("Static Columns:", static.columns.tolist())
+    print("Event Columns:", train.columns.tolist())
 except Exception as e:
     print(f"Error: {e}")
-
@@ -1,10 +1,15 @@
-import pandas as pd
-train_df = pd.read_csv("data/train_data_with_features.csv")
-test_df = pd.read_csv("data/test_data_with_features.csv")
-print("Train Shape:", train_df.shape)  # Expected: (281, 50)
-print("Test Shape:", test_df.shape)   # Expected: (71, 50)
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import feature_store  # noqa: E402
+
+train_df = feature_store.load_matrix("train")
+test_df = feature_store.load_matrix("test")
+print("Train Shape:", train_df.shape)
+print("Test Shape:", test_df.shape)
 print("Train Columns:", train_df.columns.tolist())
 print("Socioeconomic Sample:\n", train_df[["area_residential", "area_farmland"]].head())
-print("Sentinel Sample:\n", train_df[["images_2025-06-02"]].head())
+print("Sentinel Sample:\n", train_df[[col for col in train_df.columns if col.startswith("images_")]].head())
 print("Weather Sample:\n", train_df[["avg_precipitation_7d", "avg_precipitation_30d"]].describe())
-print("Severity:\n",train_df["severity"].value_counts())
\ No newline at end of file
+print("Severity:\n",train_df["severity"].value_counts())